@@ -11,18 +11,67 @@
 # express or implied. See the License for the specific language governing
 # permissions and limitations under the License.
 
-# Keep the default boto3 session in sync with credentials that the test
-# harness rotates on disk during long-running e2e suites. This is a guarded
-# no-op outside of that scenario (see acktest.aws.credentials for details).
-try:
-    from .aws.credentials import install_refreshing_shared_credentials
-
-    install_refreshing_shared_credentials()
-except Exception:  # pragma: no cover - never block test imports on this
-    import logging
-
-    logging.getLogger(__name__).warning(
-        "acktest: could not install rotating credential provider; "
-        "falling back to default boto3 credential behavior",
-        exc_info=True,
-    )
\ No newline at end of file
+import importlib
+import importlib.util
+import logging
+import sys
+
+# Submodules are imported on first access (PEP 562), so that importing one of
+# them does not import the heavy dependencies (boto3, kubernetes) of the others.
+_SUBMODULES = ("adoption", "aws", "bootstrapping", "k8s", "resources", "tags", "wait")
+
+
+def _install_refreshing_shared_credentials():
+    """Imports acktest.aws, which installs the rotating credential provider
+    on the default boto3 session (see acktest.aws.credentials)."""
+    # Already imported, or being imported, in which case it installs the
+    # provider itself once acktest.aws.credentials is loaded
+    if f"{__name__}.aws" in sys.modules:
+        return
+    try:
+        importlib.import_module(".aws", __name__)
+    except Exception:  # pragma: no cover - never block test imports on this
+        logging.getLogger(__name__).warning(
+            "acktest: could not install rotating credential provider; "
+            "falling back to default boto3 credential behavior",
+            exc_info=True,
+        )
+
+
+class _Boto3ImportHook:
+    """Installs the rotating credential provider once boto3 is imported, so
+    that suites creating boto3 clients before using acktest.aws still follow
+    the rotation, while `import acktest` itself does not import boto3."""
+
+    def find_spec(self, fullname, path, target=None):
+        if fullname != "boto3":
+            return None
+        sys.meta_path.remove(self)
+        spec = importlib.util.find_spec(fullname)
+        if spec is None or spec.loader is None:
+            return spec
+
+        exec_module = spec.loader.exec_module
+
+        def _exec_module(module):
+            exec_module(module)
+            _install_refreshing_shared_credentials()
+
+        spec.loader.exec_module = _exec_module
+        return spec
+
+
+if "boto3" in sys.modules:
+    _install_refreshing_shared_credentials()
+else:
+    sys.meta_path.insert(0, _Boto3ImportHook())
+
+
+def __getattr__(name: str):
+    if name in _SUBMODULES:
+        return importlib.import_module(f".{name}", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_SUBMODULES))
@@ -9,4 +9,34 @@
 # or in the "license" file accompanying this file. This file is distributed
 # on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
 # express or implied. See the License for the specific language governing
-# permissions and limitations under the License.
\ No newline at end of file
+# permissions and limitations under the License.
+
+import importlib
+
+# Keep the default boto3 session in sync with credentials that the test
+# harness rotates on disk during long-running e2e suites. This is a guarded
+# no-op outside of that scenario (see acktest.aws.credentials for details).
+# Installed when boto3 or the AWS helpers are first imported rather than on
+# `import acktest` (see acktest/__init__.py), so that suites which do not talk
+# to AWS do not import boto3.
+try:
+    from .credentials import install_refreshing_shared_credentials
+
+    install_refreshing_shared_credentials()
+except Exception:  # pragma: no cover - never block test imports on this
+    import logging
+
+    logging.getLogger(__name__).warning(
+        "acktest: could not install rotating credential provider; "
+        "falling back to default boto3 credential behavior",
+        exc_info=True,
+    )
+
+# Submodules are imported on first access (PEP 562)
+_SUBMODULES = ("clients", "credentials", "identity", "s3")
+
+
+def __getattr__(name: str):
+    if name in _SUBMODULES:
+        return importlib.import_module(f".{name}", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
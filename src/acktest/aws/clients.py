@@ -0,0 +1,163 @@
+# Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may
+# not use this file except in compliance with the License. A copy of the
+# License is located at
+#
+#	 http://aws.amazon.com/apache2.0/
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+"""Shared boto3 clients and resources.
+
+Creating a boto3 client loads the service model and builds a new connection
+pool, which is a measurable share of bootstrap time when done on every
+property access. Clients are instead created once per (service, region,
+credentials) and shared by every thread, as boto3 clients are thread-safe.
+Resources are not, so they are cached per thread.
+
+Every client and resource is created with `CLIENT_CONFIG`, which uses adaptive
+retries (client-side rate limiting on throttling) and a connection pool large
+enough for concurrent bootstrapping.
+
+Cached clients are dropped when the credentials of the default session change
+(see `acktest.aws.credentials.credentials_key`).
+
+Handlers of botocore events (e.g. "before-call", emitted once per API call)
+registered with `register_event_handler` are attached to every client and
+resource of the registry, including those created later.
+
+Usage:
+    from acktest.aws import clients
+
+    ec2 = clients.client("ec2", region_name="us-west-2")
+"""
+
+import threading
+import weakref
+from typing import Callable, Dict, List, Optional, Tuple
+
+import boto3
+from botocore.config import Config
+
+from . import credentials
+
+# Enough for every concurrently bootstrapped subresource (see
+# acktest.bootstrapping.BOOTSTRAP_WORKERS) to share a client
+MAX_POOL_CONNECTIONS = 50
+
+RETRY_MAX_ATTEMPTS = 10
+
+CLIENT_CONFIG = Config(
+    retries={"mode": "adaptive", "max_attempts": RETRY_MAX_ATTEMPTS},
+    max_pool_connections=MAX_POOL_CONNECTIONS,
+)
+
+# Keys are (service, region)
+ClientKey = Tuple[str, Optional[str]]
+
+_lock = threading.Lock()
+_credentials_key: Optional[tuple] = None
+_clients: Dict[ClientKey, object] = {}
+_thread_local = threading.local()
+
+_event_handlers: List[Tuple[str, Callable, bool]] = []
+# Clients of the resources cached by every thread
+_resource_clients: "weakref.WeakSet" = weakref.WeakSet()
+
+
+def _register_event_handlers(client):
+    """Must be called with `_lock` held."""
+    for event_name, handler, first in _event_handlers:
+        _register(client, event_name, handler, first)
+
+
+def _register(client, event_name: str, handler: Callable, first: bool):
+    if first:
+        client.meta.events.register_first(event_name, handler)
+    else:
+        client.meta.events.register(event_name, handler)
+
+
+def register_event_handler(event_name: str, handler: Callable, first: bool = False):
+    """Registers a botocore event handler on every client and resource,
+    including those created later. Registering the same handler twice has
+    no effect.
+
+    Args:
+        first: Whether to call the handler before those registered normally,
+            e.g. to observe every call even when another handler (such as a
+            botocore Stubber) returns a response.
+    """
+    with _lock:
+        if any(h[:2] == (event_name, handler) for h in _event_handlers):
+            return
+        _event_handlers.append((event_name, handler, first))
+        for client in [*_clients.values(), *_resource_clients]:
+            _register(client, event_name, handler, first)
+
+
+def unregister_event_handler(event_name: str, handler: Callable):
+    with _lock:
+        registered = [h for h in _event_handlers if h[:2] == (event_name, handler)]
+        if not registered:
+            return
+        _event_handlers.remove(registered[0])
+        for client in [*_clients.values(), *_resource_clients]:
+            client.meta.events.unregister(event_name, handler)
+
+
+def _check_credentials():
+    """Drops the cached clients if the credentials changed since they were
+    created. Must be called with `_lock` held."""
+    global _credentials_key
+    # Created first, as the key includes the identity of the default session
+    boto3._get_default_session()
+    key = credentials.credentials_key()
+    if key != _credentials_key:
+        _clients.clear()
+        _credentials_key = key
+
+
+def client(service_name: str, region_name: Optional[str] = None):
+    """Returns the shared client of a service in a region."""
+    key = (service_name, region_name)
+    with _lock:
+        _check_credentials()
+        cached = _clients.get(key)
+        if cached is None:
+            # Creating clients from the same session is not thread-safe
+            cached = _clients[key] = boto3.client(service_name, region_name=region_name, config=CLIENT_CONFIG)
+            _register_event_handlers(cached)
+        return cached
+
+
+def resource(service_name: str, region_name: Optional[str] = None):
+    """Returns this thread's resource of a service in a region."""
+    key = (service_name, region_name)
+    with _lock:
+        _check_credentials()
+        credentials_key = _credentials_key
+    cache = getattr(_thread_local, "resources", None)
+    if cache is None or _thread_local.credentials_key != credentials_key:
+        cache = _thread_local.resources = {}
+        _thread_local.credentials_key = credentials_key
+
+    cached = cache.get(key)
+    if cached is None:
+        with _lock:
+            cached = cache[key] = boto3.resource(service_name, region_name=region_name, config=CLIENT_CONFIG)
+            _register_event_handlers(cached.meta.client)
+            _resource_clients.add(cached.meta.client)
+    return cached
+
+
+def clear_cache():
+    """Drops every cached client, and this thread's cached resources."""
+    global _credentials_key
+    with _lock:
+        _clients.clear()
+        _credentials_key = None
+    _thread_local.__dict__.clear()
@@ -56,6 +56,35 @@ _DISABLE_ENV_VAR = "ACKTEST_DISABLE_CREDENTIAL_REFRESH"
 _install_lock = threading.Lock()
 _installed = False
 
+# Incremented every time the credentials used by the default session change,
+# so caches derived from them (see acktest.aws.identity and acktest.aws.clients)
+# can be invalidated.
+_generation_lock = threading.Lock()
+_generation = 0
+
+
+def credentials_generation() -> int:
+    """Returns a counter which changes whenever the rotating provider installs
+    or re-reads credentials with a different access key."""
+    return _generation
+
+
+def credentials_key() -> tuple:
+    """Returns a key identifying the credentials used by boto3's default
+    session, which changes whenever they may have changed."""
+    return (
+        credentials_generation(),
+        id(boto3.DEFAULT_SESSION),
+        os.environ.get("AWS_PROFILE"),
+        os.environ.get("AWS_DEFAULT_PROFILE"),
+    )
+
+
+def _bump_generation():
+    global _generation
+    with _generation_lock:
+        _generation += 1
+
 
 def _shared_credentials_path() -> str:
     return os.environ.get(
@@ -116,6 +145,8 @@ def install_refreshing_shared_credentials(
             # web-identity profile, both of which botocore already refreshes.
             return False
 
+        last_access_key = [initial["access_key"]]
+
         def _build_metadata() -> dict:
             keys = _read_static_profile(creds_file, profile)
             if not keys:
@@ -125,6 +156,9 @@ def install_refreshing_shared_credentials(
                     f"could not read static credentials for profile "
                     f"'{profile}' from '{creds_file}'"
                 )
+            if keys["access_key"] != last_access_key[0]:
+                last_access_key[0] = keys["access_key"]
+                _bump_generation()
             expiry = datetime.datetime.now(
                 datetime.timezone.utc
             ) + datetime.timedelta(seconds=refresh_ttl_seconds)
@@ -150,6 +184,7 @@ def install_refreshing_shared_credentials(
         )
 
         _installed = True
+        _bump_generation()
         logging.info(
             "acktest: installed rotating credential provider for profile "
             "'%s' (re-reading '%s' every ~%ds)",
@@ -11,14 +11,118 @@
 # express or implied. See the License for the specific language governing
 # permissions and limitations under the License.
 """Supports a number of common AWS STS and IAM tasks.
+
+The account ID and region are looked up once per process and cached until
+the credentials of the default boto3 session change (see
+`acktest.aws.credentials.credentials_generation`). When the
+ACKTEST_IDENTITY_CACHE_FILE environment variable names a file, the account ID
+is also cached there, keyed by a hash of the access key, so that
+pytest-xdist workers share a single STS call.
 """
 
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
 import boto3
 
+from . import credentials
+
+IDENTITY_CACHE_FILE_ENV_VAR = "ACKTEST_IDENTITY_CACHE_FILE"
+
+# How long an account ID cached on disk is trusted
+IDENTITY_CACHE_FILE_TTL_SECONDS = 60 * 60
+
+_cache_lock = threading.Lock()
+_account_ids: Dict[Tuple, str] = {}
+_regions: Dict[Tuple, Optional[str]] = {}
+
+
+def clear_cache():
+    """Forgets the cached account ID and region of this process."""
+    with _cache_lock:
+        _account_ids.clear()
+        _regions.clear()
+
+
+def _credentials_key() -> tuple:
+    # Created first, as the key includes the identity of the default session,
+    # which would otherwise be created by the lookup and change the key
+    boto3._get_default_session()
+    return credentials.credentials_key()
+
 
 def get_account_id() -> int:
-    return boto3.client('sts').get_caller_identity().get('Account')
+    key = _credentials_key()
+    with _cache_lock:
+        account_id = _account_ids.get(key)
+        if account_id is None:
+            account_id = _lookup_account_id()
+            _account_ids.clear()
+            _account_ids[key] = account_id
+        return account_id
 
 
 def get_region(default: str = "us-west-2") -> str:
-    return boto3.session.Session().region_name or default
+    key = _credentials_key() + (os.environ.get("AWS_DEFAULT_REGION"), os.environ.get("AWS_REGION"))
+    with _cache_lock:
+        if key not in _regions:
+            _regions.clear()
+            _regions[key] = boto3.session.Session().region_name
+        return _regions[key] or default
+
+
+def _lookup_account_id() -> str:
+    cache_file = os.environ.get(IDENTITY_CACHE_FILE_ENV_VAR)
+    fingerprint = _credentials_fingerprint() if cache_file else None
+    if fingerprint is not None:
+        account_id = _read_cache_file(cache_file, fingerprint)
+        if account_id is not None:
+            return account_id
+
+    account_id = boto3.client('sts').get_caller_identity().get('Account')
+
+    if fingerprint is not None:
+        _write_cache_file(cache_file, fingerprint, account_id)
+    return account_id
+
+
+def _credentials_fingerprint() -> Optional[str]:
+    creds = boto3._get_default_session().get_credentials()
+    if creds is None:
+        return None
+    return hashlib.sha256(creds.access_key.encode()).hexdigest()
+
+
+def _read_cache_file(path: str, fingerprint: str) -> Optional[str]:
+    try:
+        with open(path) as f:
+            entry = json.load(f).get(fingerprint)
+    except (OSError, ValueError):
+        return None
+    if not entry or time.time() - entry.get("cached_at", 0) > IDENTITY_CACHE_FILE_TTL_SECONDS:
+        return None
+    return entry.get("account_id")
+
+
+def _write_cache_file(path: str, fingerprint: str, account_id: str):
+    try:
+        with open(path) as f:
+            entries = json.load(f)
+    except (OSError, ValueError):
+        entries = {}
+    entries[fingerprint] = {"account_id": account_id, "cached_at": time.time()}
+
+    # Written to a temporary file and renamed, so concurrent workers never
+    # read a partially written file
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "w") as f:
+            json.dump(entries, f)
+        os.replace(tmp_path, path)
+    except OSError as ex:
+        logging.warning(f"Could not write identity cache file {path}: {ex}")
@@ -13,9 +13,7 @@
 """Supports a number of common S3 tasks.
 """
 
-import boto3
-
-from . import identity
+from . import clients, identity
 
 
 def duplicate_bucket_contents(source_bucket: object, destination_bucket: object):
@@ -33,7 +31,7 @@ def copy_object(bucket_name: str, copy_source: object, key: str):
     https://boto3.amazonaws.com/v1/documentation/api/latest/reference/services/s3.html#S3.Bucket.copy
     """
     region = identity.get_region()
-    bucket = boto3.resource("s3", region_name=region).Bucket(bucket_name)
+    bucket = clients.resource("s3", region_name=region).Bucket(bucket_name)
     bucket.copy(copy_source, key)
 
 def delete_object(bucket_name: str, key: str):
@@ -42,7 +40,7 @@ def delete_object(bucket_name: str, key: str):
     https://boto3.amazonaws.com/v1/documentation/api/latest/reference/services/s3.html#S3.Client.delete_objects
     """
     region = identity.get_region()
-    bucket = boto3.resource("s3", region_name=region).Bucket(bucket_name)
+    bucket = clients.resource("s3", region_name=region).Bucket(bucket_name)
     bucket.delete_objects(
         Delete={
             "Objects": [
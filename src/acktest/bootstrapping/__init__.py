@@ -1,21 +1,52 @@
 from __future__ import annotations
 
 import abc
+import contextvars
+import importlib
+import os
 import pickle
 import logging
-import time
+import threading
 
+from contextlib import nullcontext
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from pathlib import Path
-from dataclasses import dataclass, fields, asdict
-from typing import Iterable, Iterator
+from dataclasses import Field, dataclass, fields, asdict
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
 
-from ..aws.identity import get_region, get_account_id
+from . import journal as _journal
+from . import retry as _retry
+from . import trace as _trace
 
 BOOTSTRAP_RETRIES = 3
 BOOTSTRAP_INTERVAL_SEC = 0
 CLEANUP_RETRIES = 3
 CLEANUP_INTERVAL_SEC = 0
 
+# Maximum number of sibling subresources bootstrapped concurrently. Setting
+# ACKTEST_BOOTSTRAP_WORKERS=1 bootstraps them one at a time in field order.
+BOOTSTRAP_WORKERS_ENV_VAR = "ACKTEST_BOOTSTRAP_WORKERS"
+BOOTSTRAP_WORKERS = 8
+
+# Key of the dataclass field metadata listing the names of the sibling fields
+# a subresource must be bootstrapped after, e.g.
+#   queue: Queue = field(init=False, default=None, metadata={DEPENDS_ON: ("role",)})
+DEPENDS_ON = "depends_on"
+
+# Service modules, imported on first access (PEP 562) as each one imports boto3
+_SUBMODULES = (
+    "benchmark", "cloudformation", "cloudwatch", "cognito_identity", "dynamodb", "eks", "elbv2",
+    "firehose", "function", "iam", "journal", "kms", "pool", "quicksight", "retry", "route53", "s3",
+    "secretsmanager", "signer", "sns", "sqs", "trace", "vpc", "vpc_endpoint_service",
+)
+
+
+def __getattr__(name: str):
+    if name in _SUBMODULES:
+        return importlib.import_module(f".{name}", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 class Serializable:
     """Represents a list of all bootstrappable resources required for a given
     service's tests.
@@ -52,6 +83,40 @@ class Serializable:
 class BootstrapFailureException(Exception):
     pass
 
+
+@dataclass
+class DanglingResource:
+    """A resource which could not be cleaned up."""
+
+    resource_name: str
+    details: dict
+    reason: str
+
+    def __str__(self):
+        return f"{self.resource_name} ({self.reason}): {self.details}"
+
+
+# Every resource which could not be cleaned up by this process
+_dangling: List[DanglingResource] = []
+_dangling_lock = threading.Lock()
+
+
+def _register_dangling(resources: Iterable[DanglingResource]):
+    with _dangling_lock:
+        _dangling.extend(resources)
+
+
+def dangling_resources() -> List[DanglingResource]:
+    """Returns every resource this process failed to clean up, in the order
+    the failures occurred."""
+    with _dangling_lock:
+        return list(_dangling)
+
+def _entered(path: Optional[str]):
+    """Makes `path` the parent path of the subresources bootstrapped or
+    cleaned up within the block, if there is one."""
+    return _journal.entered(path) if path is not None else nullcontext()
+
 @dataclass
 class Bootstrappable(abc.ABC):
     """Represents a single bootstrappable resource.
@@ -59,10 +124,13 @@ class Bootstrappable(abc.ABC):
 
     @property
     def region(self):
+        # Imported lazily, so the journal can be used without boto3
+        from ..aws.identity import get_region
         return get_region()
 
     @property
     def account_id(self):
+        from ..aws.identity import get_account_id
         return str(get_account_id())
 
     @abc.abstractmethod
@@ -77,14 +145,33 @@ class Bootstrappable(abc.ABC):
     def bootstrap_interval_sec(self):
         return BOOTSTRAP_INTERVAL_SEC
 
+    @property
+    def bootstrap_workers(self):
+        return int(os.environ.get(BOOTSTRAP_WORKERS_ENV_VAR, BOOTSTRAP_WORKERS))
+
     @property
     def cleanup_retries(self):
         return CLEANUP_RETRIES
 
+    @property
+    def cleanup_workers(self):
+        return self.bootstrap_workers
+
     @property
     def cleanup_interval_sec(self):
         return CLEANUP_INTERVAL_SEC
 
+    @property
+    def retry_policy(self) -> _retry.RetryPolicy:
+        """The backoff of each class of error raised while bootstrapping or
+        cleaning up this resource (see `acktest.bootstrapping.retry`).
+
+        Unclassified errors are retried `bootstrap_retries` or
+        `cleanup_retries` times of the parent resource, unless the policy
+        sets a backoff for them.
+        """
+        return _retry.DEFAULT_RETRY_POLICY
+
     @abc.abstractmethod
     def cleanup(self):
         self._cleanup_subresources()
@@ -97,6 +184,13 @@ class Bootstrappable(abc.ABC):
         Yields:
             Iterator[BootstrappableResource]: A field value.
         """
+        for _, attr in self._iter_bootstrappable_fields():
+            yield attr
+
+    def _iter_bootstrappable_fields(self) -> Iterator[Tuple[Field, Bootstrappable]]:
+        """Iterates over each field that extends the `Bootstrappable` type,
+            along with its (non-None) value.
+        """
         for field in fields(self):
             if not isinstance(field.type, type) or not issubclass(field.type, Bootstrappable):
                 continue
@@ -105,86 +199,368 @@ class Bootstrappable(abc.ABC):
             if attr is None:
                 continue
 
-            yield attr
+            yield field, attr
+
+    def _bootstrap_dependencies(self) -> Dict[str, Set[str]]:
+        """Returns the names of the sibling subresources each subresource
+            field depends on, as declared by its `DEPENDS_ON` metadata.
+
+        Raises:
+            ValueError: If a field depends on an unknown field or the
+                dependencies are circular.
+        """
+        names = {f.name for f in fields(self)}
+        present = {field.name for field, _ in self._iter_bootstrappable_fields()}
+        dependencies = {}
+        for field, _ in self._iter_bootstrappable_fields():
+            declared = set(field.metadata.get(DEPENDS_ON, ()))
+            unknown = declared - names
+            if unknown:
+                raise ValueError(f"{type(self).__name__}.{field.name} depends on unknown fields {sorted(unknown)}")
+            # Dependencies on unset subresources are trivially satisfied
+            dependencies[field.name] = declared & present
+
+        # Detect cycles, which would otherwise never be scheduled
+        resolved: Set[str] = set()
+        while len(resolved) < len(dependencies):
+            ready = {name for name, deps in dependencies.items() if name not in resolved and deps <= resolved}
+            if not ready:
+                raise ValueError(f"Circular subresource dependencies in {type(self).__name__}: "
+                                 f"{sorted(set(dependencies) - resolved)}")
+            resolved |= ready
+        return dependencies
+
+    def _bootstrap_resource(self, resource: Bootstrappable, name: Optional[str] = None) -> bool:
+        """Attempts to bootstrap a single subresource for a given number of
+            retries, cleaning up after each failed attempt.
+
+        While a journal is active (see `acktest.bootstrapping.journal`), the
+        subresource stored in the field `name` is recorded in it, and skipped
+        if the journal already records it as bootstrapped.
+
+        Returns:
+            bool: Whether the subresource was bootstrapped.
+
+        Raises:
+            BootstrapFailureException: If the subresource's own subresources
+                could not be bootstrapped.
+        """
+        resource_name = type(resource).__name__
+        path = _journal.child_path(name) if name is not None else None
+        with _trace.span(resource_name, path or resource_name, _trace.PHASE_BOOTSTRAP) as span:
+            journal = _journal.active_journal() if path is not None else None
+            if journal is not None:
+                if journal.is_bootstrapped(path):
+                    journal.restore(path, resource)
+                    logging.info(f"Skipping bootstrap of {resource_name}, already bootstrapped according to journal")
+                    span.outcome = _trace.OUTCOME_SKIPPED
+                    return True
+                if journal.get(path) is not None:
+                    # Interrupted midway through a previous run
+                    error = self._cleanup_interrupted(resource, path)
+                    if error is not None:
+                        raise BootstrapFailureException(f"Could not bootstrap {resource_name} again: {error}")
+                journal.record(path, resource, _journal.STATE_BOOTSTRAPPING)
+
+            logging.info(f"Attempting bootstrap {resource_name}")
+            retries = _retry.Retries(
+                resource.retry_policy, _retry.Backoff.fixed(self.bootstrap_retries, self.bootstrap_interval_sec))
+            with _entered(path):
+                while True:
+                    span.attempts += 1
+                    try:
+                        resource.bootstrap()
+                        logging.info(f"Successfully bootstrapped {resource_name}")
+                        if journal is not None:
+                            journal.record(path, resource, _journal.STATE_BOOTSTRAPPED)
+                        span.outcome = _trace.OUTCOME_SUCCEEDED
+                        return True
+                    except BootstrapFailureException as ex:
+                        # Don't attempt to retry if we reached maximum retries beneath
+                        raise ex
+                    except Exception as ex:
+                        logging.error(f"Exception while bootstrapping {resource_name}")
+                        logging.exception(ex)
+                        span.errors.append(f"{type(ex).__name__}: {ex}")
+                        delay = retries.next_delay(ex)
+                        # Clean up any dependencies the first attempt made
+                        logging.info(f"Cleaning up dependencies created by {resource_name}")
+                        resource.cleanup()
+                        if delay is None:
+                            break
+                        logging.info(f"Retrying bootstrapping {resource_name} in {delay:.1f}s "
+                                     f"({retries.last_error_class} error)")
+                        _trace.sleep(delay)
+
+            if journal is not None:
+                journal.remove(path)
+            span.outcome = _trace.OUTCOME_FAILED
+            logging.error(f"🚫 Giving up bootstrapping {resource_name} after {span.attempts} attempt(s) "
+                          f"({retries.last_error_class} error)")
+            return False
+
+    def _cleanup_interrupted(self, resource: Bootstrappable, path: str) -> Optional[str]:
+        """Cleans up the journaled subresources of a resource whose bootstrap
+            was interrupted in a previous run, and removes it from the journal.
+
+        The resource's own outputs may not have been recorded, so anything it
+        created itself is reported as possibly dangling.
+
+        Returns:
+            Optional[str]: None if the subresources were cleaned up, otherwise
+                the reason they were not.
+        """
+        resource_name = type(resource).__name__
+        journal = _journal.active_journal()
+        entry = journal.get(path)
+        logging.warning(f"Bootstrap of {resource_name} was interrupted, cleaning up its journaled subresources")
+        journal.restore(path, resource)
+        with _journal.entered(path):
+            if resource._cleanup_subresources():
+                return "subresources of an interrupted bootstrap were not cleaned up"
+        journal.remove(path)
+        _register_dangling([DanglingResource(resource_name, entry["outputs"], "bootstrap was interrupted")])
+        return None
 
     def _bootstrap_subresources(self):
-        """Iterates through every `Bootstrappable` field and attempts to
-            bootstrap it for a given number of retries.
+        """Bootstraps every `Bootstrappable` field, attempting each one for a
+            given number of retries.
+
+        Subresources are bootstrapped concurrently, each one as soon as the
+        sibling fields it depends on (see `DEPENDS_ON`) are bootstrapped. With
+        a single worker they are bootstrapped one at a time in field order.
 
         If the bootstrapping fails, it will attempt to cleanup the previous
         attempt's subresources and try again. After reaching the maximum number
-        of retries, it will clean up any resources that were successfully
-        bootstrapped and then fail with a `BootstrapFailureException`.
+        of retries, it will wait for the subresources still being bootstrapped,
+        clean up any resources that were successfully bootstrapped and then
+        fail with a `BootstrapFailureException`.
 
         Raises:
             BootstrapFailureException: If bootstrapping attempts reached the
                 maximum number of retries.
         """
-        bootstrapped = []
-        for resource in self.iter_bootstrappable:
-            should_cleanup = True
-
-            resource_name = type(resource).__name__
-            logging.info(f"Attempting bootstrap {resource_name}")
-            for _ in range(self.bootstrap_retries):
-                try:
-                    # Bootstrap and add to list of successes
-                    resource.bootstrap()
-                    logging.info(f"Successfully bootstrapped {resource_name}")
-                    bootstrapped.append(resource)
-                    should_cleanup = False
+        dependencies = self._bootstrap_dependencies()
+        pending = {field.name: attr for field, attr in self._iter_bootstrappable_fields()}
+        workers = min(self.bootstrap_workers, len(pending))
+        if workers <= 1:
+            # Field order, unless a field depends on one declared after it
+            ordered = []
+            while pending:
+                name = next(n for n in pending if dependencies[n] <= set(ordered))
+                ordered.append(name)
+                pending.pop(name)
+            self._bootstrap_serially([(name, getattr(self, name)) for name in ordered])
+            return
+
+        # In order of completion, so that dependents are cleaned up first
+        bootstrapped: List[Bootstrappable] = []
+        done: Set[str] = set()
+        failed_name = None
+        failure = None
+        running: Dict[Future, str] = {}
+
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"bootstrap-{type(self).__name__}") as executor:
+            while True:
+                if failed_name is None and failure is None:
+                    for name in [n for n in pending if dependencies[n] <= done]:
+                        running[executor.submit(
+                            contextvars.copy_context().run, self._bootstrap_resource, pending.pop(name), name)] = name
+                if not running:
                     break
-                except BootstrapFailureException as ex:
-                    # Don't attempt to retry if we reached maximum retries beneath
-                    raise ex
-                except Exception as ex:
-                    logging.error(f"Exception while bootstrapping {resource_name}")
-                    logging.exception(ex)
-                    # Clean up any dependencies the first attempt made
-                    logging.info(f"Cleaning up dependencies created by {resource_name}")
-                    resource.cleanup()
-                    logging.info(f"Retrying bootstrapping {resource_name}")
-                    time.sleep(self.bootstrap_interval_sec)
-                    continue
-            else:
-                logging.error(f"🚫 Exceeded maximum retries ({self.bootstrap_retries}) for bootstrapping {resource_name}")
 
-            if should_cleanup:
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name = running.pop(future)
+                    try:
+                        succeeded = future.result()
+                    except Exception as ex:
+                        # Re-raised once the running subresources finish
+                        failure = failure or ex
+                        continue
+                    if succeeded:
+                        done.add(name)
+                        bootstrapped.append(getattr(self, name))
+                    elif failed_name is None:
+                        failed_name = name
+
+        if failure is not None:
+            raise failure
+        if failed_name is not None:
+            # Attempt to clean up successfully bootstrapped elements
+            self._cleanup_resources(bootstrapped)
+            raise BootstrapFailureException(
+                f"Bootstrapping failed for resource type '{type(getattr(self, failed_name)).__name__}'")
+
+    def _bootstrap_serially(self, resources: Iterable[Tuple[str, Bootstrappable]]):
+        bootstrapped = []
+        for name, resource in resources:
+            if not self._bootstrap_resource(resource, name):
                 # Attempt to clean up successfully bootstrapped elements
                 self._cleanup_resources(bootstrapped)
-                raise BootstrapFailureException(f"Bootstrapping failed for resource type '{resource_name}'")
+                raise BootstrapFailureException(f"Bootstrapping failed for resource type '{type(resource).__name__}'")
+            bootstrapped.append(resource)
+
+    def _cleanup_subresources(self) -> List[DanglingResource]:
+        return self._cleanup_resources(self.iter_bootstrappable)
 
-    def _cleanup_subresources(self):
-        self._cleanup_resources(self.iter_bootstrappable)
+    def _cleanup_resource(self, resource: Bootstrappable, name: Optional[str] = None) -> Optional[str]:
+        """Attempts to clean up a single resource for a given number of
+            retries.
 
-    def _cleanup_resources(self, resources: Iterable[Bootstrappable]):
-        """Iterates through the given list of resources and attempts to clean
-            them up for a given number of retries.
+        While a journal is active, the subresource stored in the field `name`
+        is only cleaned up if the journal records it, and its entry is removed
+        once it is cleaned up. Of a resource whose bootstrap was interrupted,
+        only the journaled subresources are cleaned up.
+
+        A not found error means the resource is already gone: it is not
+        retried, and only the subresources are cleaned up.
+
+        Returns:
+            Optional[str]: None if the resource was cleaned up, otherwise the
+                last error.
+        """
+        resource_name = type(resource).__name__
+        path = _journal.child_path(name) if name is not None else None
+        with _trace.span(resource_name, path or resource_name, _trace.PHASE_CLEANUP) as span:
+            journal = _journal.active_journal() if path is not None else None
+            if journal is not None:
+                entry = journal.get(path)
+                if entry is None:
+                    logging.info(f"Skipping cleanup of {resource_name}, not bootstrapped according to journal")
+                    span.outcome = _trace.OUTCOME_SKIPPED
+                    return None
+                if entry["state"] == _journal.STATE_BOOTSTRAPPING:
+                    error = self._cleanup_interrupted(resource, path)
+                    span.outcome = _trace.OUTCOME_SUCCEEDED if error is None else _trace.OUTCOME_FAILED
+                    return error
+
+            error = None
+            retries = _retry.Retries(
+                resource.retry_policy, _retry.Backoff.fixed(self.cleanup_retries, self.cleanup_interval_sec))
+            with _entered(path):
+                while True:
+                    span.attempts += 1
+                    try:
+                        # Clean up and add to list of successes
+                        logging.info(f"Attempting cleanup {resource_name}")
+                        resource.cleanup()
+                        logging.info(f"Successfully cleaned up {resource_name}")
+                        if journal is not None:
+                            journal.remove(path)
+                        span.outcome = _trace.OUTCOME_SUCCEEDED
+                        return None
+                    except Exception as ex:
+                        if _retry.is_not_found(ex):
+                            # Already deleted, e.g. by an earlier attempt which
+                            # failed afterwards. Its subresources may not be.
+                            logging.info(f"{resource_name} already deleted ({_retry.error_code(ex)}), "
+                                         f"cleaning up its subresources")
+                            resource._cleanup_subresources()
+                            if journal is not None:
+                                journal.remove(path)
+                            span.outcome = _trace.OUTCOME_SUCCEEDED
+                            return None
+                        logging.error(f"Exception while cleaning up {resource_name}")
+                        logging.exception(ex)
+                        error = f"{type(ex).__name__}: {ex}"
+                        span.errors.append(error)
+                        delay = retries.next_delay(ex)
+                        if delay is None:
+                            break
+                        logging.info(f"Retrying cleanup of {resource_name} in {delay:.1f}s "
+                                     f"({retries.last_error_class} error)")
+                        _trace.sleep(delay)
+
+            # Hit retry limit
+            span.outcome = _trace.OUTCOME_FAILED
+            logging.error(f"🚫 Giving up cleaning up {resource_name} after {span.attempts} attempt(s) "
+                          f"({retries.last_error_class} error)")
+            logging.error(f"Possibly dangling resource ({resource_name}): {asdict(resource)}")
+            return error
+
+    def _cleanup_resources(self, resources: Iterable[Bootstrappable]) -> List[DanglingResource]:
+        """Attempts to clean up the given resources, each for a given number
+            of retries.
+
+        Resources are cleaned up in reverse dependency order: a resource is
+        cleaned up once every sibling that depends on it (see `DEPENDS_ON`) is
+        gone, and independent resources are cleaned up concurrently. Among the
+        resources ready at the same time, those later in `resources` (i.e.
+        created last) are started first. When a resource cannot be cleaned up,
+        the resources it depends on are skipped, as deleting them would fail,
+        while other branches carry on.
 
         Args:
             resources (Iterable[Bootstrappable]): The resources to attempt to
                 clean up.
+
+        Returns:
+            List[DanglingResource]: The resources which could not be cleaned up.
         """
-        # Iterate through list in reverse order, so that resources created last
-        # (with the most dependencies) are the first to be deleted
-        for resource in reversed(list(resources)):
-            resource_name = type(resource).__name__
-            for _ in range(self.cleanup_retries):
-                try:
-                    # Clean up and add to list of successes
-                    logging.info(f"Attempting cleanup {resource_name}")
-                    resource.cleanup()
-                    logging.info(f"Successfully cleaned up {resource_name}")
-                    break
-                except Exception as ex:
-                    logging.error(f"Exception while cleaning up {resource_name}")
-                    logging.exception(ex)
-                    time.sleep(self.cleanup_interval_sec)
+        resources = list(resources)
+        field_names = {id(attr): field.name for field, attr in self._iter_bootstrappable_fields()}
+        dependencies = self._bootstrap_dependencies() if field_names else {}
+
+        # Index of the resources each resource must be cleaned up after
+        dependents: Dict[int, Set[int]] = {i: set() for i in range(len(resources))}
+        index_by_name = {field_names.get(id(r)): i for i, r in enumerate(resources)}
+        for i, resource in enumerate(resources):
+            for dependency in dependencies.get(field_names.get(id(resource)), ()):
+                if dependency in index_by_name:
+                    dependents[index_by_name[dependency]].add(i)
+
+        dangling: List[DanglingResource] = []
+        pending = set(range(len(resources)))
+        finished: Set[int] = set()
+        failed: Set[int] = set()
+        running: Dict[Future, int] = {}
+
+        def _record(i: int, reason: str):
+            resource = resources[i]
+            dangling.append(DanglingResource(type(resource).__name__, asdict(resource), reason))
+
+        workers = max(1, min(self.cleanup_workers, len(resources)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"cleanup-{type(self).__name__}") as executor:
+            while pending or running:
+                for i in sorted(pending, reverse=True):
+                    if not dependents[i] <= finished:
+                        continue
+                    blocked_by = dependents[i] & failed
+                    if blocked_by:
+                        pending.discard(i)
+                        failed.add(i)
+                        finished.add(i)
+                        names = ", ".join(sorted({type(resources[j]).__name__ for j in blocked_by}))
+                        _record(i, f"skipped, as dependent resources were not cleaned up: {names}")
+                        continue
+                    if workers == 1 and running:
+                        break
+                    pending.discard(i)
+                    running[executor.submit(
+                        contextvars.copy_context().run, self._cleanup_resource, resources[i],
+                        field_names.get(id(resources[i])))] = i
+                if not running:
                     continue
-            else:
-                # Hit retry limit
-                logging.error(f"🚫 Exceeded maximum retries ({self.cleanup_retries}) for cleaning up {resource_name}")
-                logging.error(f"Possibly dangling resource ({resource_name}): {asdict(resource)}")
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    i = running.pop(future)
+                    finished.add(i)
+                    try:
+                        error = future.result()
+                    except Exception as ex:
+                        error = f"{type(ex).__name__}: {ex}"
+                    if error is not None:
+                        failed.add(i)
+                        _record(i, error)
+
+        if dangling:
+            _register_dangling(dangling)
+            logging.error(f"🚫 {len(dangling)} possibly dangling resource(s) after cleaning up {type(self).__name__}:")
+            for resource in dangling:
+                logging.error(f"  {resource}")
+        return dangling
 
 @dataclass
 class Resources(Serializable, Bootstrappable):
@@ -200,4 +576,14 @@ class Resources(Serializable, Bootstrappable):
             subclass in the bootstrap dictionary.
         """
         logging.info("🧹 Cleaning up resources ...")
+        first = len(dangling_resources())
         self._cleanup_subresources()
+
+        # Includes resources left behind by nested cleanups
+        dangling = dangling_resources()[first:]
+        if dangling:
+            logging.error(f"🚫 Cleanup summary: {len(dangling)} possibly dangling resource(s):")
+            for resource in dangling:
+                logging.error(f"  {resource}")
+        else:
+            logging.info("Cleanup summary: all resources cleaned up")
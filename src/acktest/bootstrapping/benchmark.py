@@ -0,0 +1,451 @@
+# Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may
+# not use this file except in compliance with the License. A copy of the
+# License is located at
+#
+#	 http://aws.amazon.com/apache2.0/
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+"""Offline benchmarks of bootstrap and cleanup.
+
+Representative resource graphs (see `GRAPHS`) are bootstrapped and cleaned up
+against `StandIn`, an in-process stand-in for the AWS APIs they call. It
+answers every API call from a "before-call" botocore handler, after an
+injected latency, so no request leaves the process and no credentials are
+needed. Each run reports its wall time, API calls and thread utilization,
+which measures the framework itself (scheduling, retries, client reuse,
+propagation waits) rather than AWS.
+
+Usage:
+    python -m acktest.bootstrapping.benchmark --graph all --workers 1 8 --latency-ms 50
+"""
+
+import argparse
+import contextlib
+import itertools
+import json
+import os
+import random
+import threading
+import time
+from collections import Counter
+from dataclasses import asdict, dataclass, field
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+import boto3
+from botocore.awsrequest import AWSResponse
+
+from . import BOOTSTRAP_WORKERS, BOOTSTRAP_WORKERS_ENV_VAR, Resources, trace
+from ..aws import clients, identity
+from .iam import Role, UserPolicies
+from .s3 import Bucket
+from .vpc import VPC
+
+# Latency of an API call, before applying `LATENCY_FACTORS`
+DEFAULT_LATENCY_SECONDS = 0.05
+
+# Relative latency of the slower APIs, by operation or service. IAM is a
+# global service whose calls are noticeably slower than regional ones.
+LATENCY_FACTORS = {
+    "iam": 2.0,
+    "ec2.CreateVpc": 3.0,
+    "ec2.DeleteVpc": 3.0,
+    "ec2.CreateInternetGateway": 2.0,
+    "s3.CreateBucket": 2.0,
+    "s3.DeleteBucket": 2.0,
+}
+
+STAND_IN_ACCOUNT_ID = "123456789012"
+STAND_IN_REGION = "us-west-2"
+
+# Key of the botocore request context holding the API call parameters
+_PARAMS_CONTEXT_KEY = "acktest_benchmark_params"
+
+_POLICY_DOCUMENT = json.dumps({
+    "Version": "2012-10-17",
+    "Statement": [{"Effect": "Allow", "Action": "s3:GetObject", "Resource": "*"}],
+})
+
+
+@dataclass
+class CallStats:
+    """The API calls answered by a `StandIn`."""
+
+    calls: Dict[str, int] = field(default_factory=dict)
+    # Time spent in API calls, summed over every thread
+    api_seconds: float = 0
+    threads: Set[int] = field(default_factory=set)
+    peak_in_flight: int = 0
+
+
+class StandIn:
+    """Answers the AWS API calls of the bootstrappable resources in-process.
+
+    While active, boto3's default session is replaced by one with placeholder
+    credentials, so every client (including those of `acktest.aws.clients`
+    and `acktest.aws.identity`) is created with the stand-in's handlers. Calls
+    return canned responses, keeping just enough state (roles, policies,
+    object versions) for the resources to bootstrap and clean up. Operations
+    without a canned response return an empty response.
+
+    Args:
+        latency_seconds: latency of an API call, scaled by `LATENCY_FACTORS`.
+        jitter: relative amount by which latencies vary, drawn from a random
+            generator seeded with `seed` so runs are reproducible.
+    """
+
+    def __init__(self, latency_seconds: float = DEFAULT_LATENCY_SECONDS, jitter: float = 0.1,
+                 seed: int = 0, latency_factors: Optional[Dict[str, float]] = None):
+        self.latency_seconds = latency_seconds
+        self.jitter = jitter
+        self.latency_factors = LATENCY_FACTORS if latency_factors is None else latency_factors
+        self.stats = CallStats()
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._ids = itertools.count(1)
+        self._roles: Dict[str, Set[str]] = {}
+        self._object_versions: Dict[str, List[Tuple[str, str]]] = {}
+        self._previous_session = None
+
+    def __enter__(self) -> "StandIn":
+        self._previous_session = boto3.DEFAULT_SESSION
+        boto3.setup_default_session(
+            aws_access_key_id="benchmark", aws_secret_access_key="benchmark", region_name=STAND_IN_REGION)
+        # Copied into every client created from the session
+        boto3.DEFAULT_SESSION.events.register("before-parameter-build.*.*", self._capture_params)
+        boto3.DEFAULT_SESSION.events.register_first("before-call.*.*", self._respond)
+        clients.clear_cache()
+        identity.clear_cache()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        boto3.DEFAULT_SESSION = self._previous_session
+        clients.clear_cache()
+        identity.clear_cache()
+        return False
+
+    def reset_stats(self):
+        with self._lock:
+            self.stats = CallStats()
+
+    def latency(self, operation: str) -> float:
+        service = operation.split(".")[0]
+        factor = self.latency_factors.get(operation, self.latency_factors.get(service, 1.0))
+        with self._lock:
+            noise = self._random.uniform(-self.jitter, self.jitter)
+        return max(0.0, self.latency_seconds * factor * (1 + noise))
+
+    def _capture_params(self, params, context, **kwargs):
+        context[_PARAMS_CONTEXT_KEY] = dict(params)
+
+    def _respond(self, model, context, **kwargs):
+        operation = f"{model.service_model.service_name}.{model.name}"
+        params = context.get(_PARAMS_CONTEXT_KEY, {})
+        with self._lock:
+            self._in_flight += 1
+            self.stats.peak_in_flight = max(self.stats.peak_in_flight, self._in_flight)
+            self.stats.threads.add(threading.get_ident())
+        start = time.perf_counter()
+        try:
+            time.sleep(self.latency(operation))
+            with self._lock:
+                status, parsed = self._handle(operation, params)
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+                self.stats.calls[operation] = self.stats.calls.get(operation, 0) + 1
+                self.stats.api_seconds += time.perf_counter() - start
+        parsed.setdefault("ResponseMetadata", {})["HTTPStatusCode"] = status
+        return AWSResponse(f"https://{operation}.stand-in", status, {}, None), parsed
+
+    def _new_id(self, prefix: str) -> str:
+        return f"{prefix}-{next(self._ids):017x}"
+
+    def _handle(self, operation: str, params: dict) -> Tuple[int, dict]:
+        """Returns the HTTP status and parsed response of a call. Must be
+        called with `_lock` held."""
+        handler = self._HANDLERS.get(operation)
+        if handler is None:
+            return 200, {}
+        return handler(self, params)
+
+    # EC2
+
+    def _create_vpc(self, params):
+        return 200, {"Vpc": {"VpcId": self._new_id("vpc"), "CidrBlock": params.get("CidrBlock"), "State": "pending"}}
+
+    def _describe_vpcs(self, params):
+        return 200, {"Vpcs": [{"VpcId": vpc_id, "State": "available"} for vpc_id in params.get("VpcIds", [])]}
+
+    def _describe_availability_zones(self, params):
+        return 200, {"AvailabilityZones": [
+            {"ZoneName": f"{STAND_IN_REGION}{zone}", "State": "available"} for zone in "abc"
+        ]}
+
+    def _create_subnet(self, params):
+        return 200, {"Subnet": {"SubnetId": self._new_id("subnet"), "VpcId": params.get("VpcId")}}
+
+    def _create_route_table(self, params):
+        return 200, {"RouteTable": {"RouteTableId": self._new_id("rtb"), "VpcId": params.get("VpcId")}}
+
+    def _associate_route_table(self, params):
+        return 200, {"AssociationId": self._new_id("rtbassoc")}
+
+    def _create_internet_gateway(self, params):
+        return 200, {"InternetGateway": {"InternetGatewayId": self._new_id("igw")}}
+
+    def _create_security_group(self, params):
+        return 200, {"GroupId": self._new_id("sg")}
+
+    # IAM
+
+    def _create_policy(self, params):
+        name = params["PolicyName"]
+        return 200, {"Policy": {"PolicyName": name, "Arn": f"arn:aws:iam::{STAND_IN_ACCOUNT_ID}:policy/{name}"}}
+
+    def _create_role(self, params):
+        self._roles[params["RoleName"]] = set()
+        return self._get_role(params)
+
+    def _get_role(self, params):
+        name = params["RoleName"]
+        if name not in self._roles:
+            return 404, {"Error": {"Code": "NoSuchEntity", "Message": f"The role {name} cannot be found."}}
+        return 200, {"Role": {"RoleName": name, "Arn": f"arn:aws:iam::{STAND_IN_ACCOUNT_ID}:role/{name}"}}
+
+    def _delete_role(self, params):
+        self._roles.pop(params["RoleName"], None)
+        return 200, {}
+
+    def _attach_role_policy(self, params):
+        self._roles.setdefault(params["RoleName"], set()).add(params["PolicyArn"])
+        return 200, {}
+
+    def _detach_role_policy(self, params):
+        self._roles.get(params["RoleName"], set()).discard(params["PolicyArn"])
+        return 200, {}
+
+    def _list_attached_role_policies(self, params):
+        arns = sorted(self._roles.get(params["RoleName"], ()))
+        return 200, {"AttachedPolicies": [{"PolicyArn": arn} for arn in arns], "IsTruncated": False}
+
+    def _list_role_policies(self, params):
+        return 200, {"PolicyNames": [], "IsTruncated": False}
+
+    def _list_instance_profiles_for_role(self, params):
+        return 200, {"InstanceProfiles": [], "IsTruncated": False}
+
+    # S3
+
+    def _put_object(self, params):
+        version_id = self._new_id("version")
+        self._object_versions.setdefault(params["Bucket"], []).append((params["Key"], version_id))
+        return 200, {"VersionId": version_id}
+
+    def _list_object_versions(self, params):
+        versions = self._object_versions.get(params["Bucket"], [])
+        return 200, {
+            "Versions": [{"Key": key, "VersionId": version_id} for key, version_id in versions],
+            "IsTruncated": False,
+        }
+
+    def _delete_objects(self, params):
+        deleted = {(o["Key"], o.get("VersionId")) for o in params["Delete"]["Objects"]}
+        bucket = params["Bucket"]
+        self._object_versions[bucket] = [v for v in self._object_versions.get(bucket, []) if v not in deleted]
+        return 200, {}
+
+    # STS
+
+    def _get_caller_identity(self, params):
+        return 200, {
+            "Account": STAND_IN_ACCOUNT_ID,
+            "Arn": f"arn:aws:iam::{STAND_IN_ACCOUNT_ID}:user/benchmark",
+            "UserId": "AIDABENCHMARK",
+        }
+
+    _HANDLERS: Dict[str, Callable[["StandIn", dict], Tuple[int, dict]]] = {
+        "ec2.CreateVpc": _create_vpc,
+        "ec2.DescribeVpcs": _describe_vpcs,
+        "ec2.DescribeAvailabilityZones": _describe_availability_zones,
+        "ec2.CreateSubnet": _create_subnet,
+        "ec2.CreateRouteTable": _create_route_table,
+        "ec2.AssociateRouteTable": _associate_route_table,
+        "ec2.CreateInternetGateway": _create_internet_gateway,
+        "ec2.CreateSecurityGroup": _create_security_group,
+        "iam.CreatePolicy": _create_policy,
+        "iam.CreateRole": _create_role,
+        "iam.GetRole": _get_role,
+        "iam.DeleteRole": _delete_role,
+        "iam.AttachRolePolicy": _attach_role_policy,
+        "iam.DetachRolePolicy": _detach_role_policy,
+        "iam.ListAttachedRolePolicies": _list_attached_role_policies,
+        "iam.ListRolePolicies": _list_role_policies,
+        "iam.ListInstanceProfilesForRole": _list_instance_profiles_for_role,
+        "s3.PutObject": _put_object,
+        "s3.ListObjectVersions": _list_object_versions,
+        "s3.DeleteObjects": _delete_objects,
+        "sts.GetCallerIdentity": _get_caller_identity,
+    }
+
+
+@dataclass
+class BenchmarkResources(Resources):
+    # Field types are not postponed annotations, as only fields whose type is
+    # a Bootstrappable class are bootstrapped
+    vpc: VPC = None
+    role: Role = None
+    bucket: Bucket = None
+
+
+def _vpc() -> VPC:
+    return VPC(name_prefix="benchmark", num_public_subnet=2, num_private_subnet=2,
+               security_group_self_referencing_ingress=True)
+
+
+def _role() -> Role:
+    return Role(
+        "benchmark", "ec2.amazonaws.com",
+        managed_policies=["arn:aws:iam::aws:policy/AmazonS3ReadOnlyAccess"],
+        user_policies=UserPolicies("benchmark", [_POLICY_DOCUMENT] * 3),
+    )
+
+
+def _bucket() -> Bucket:
+    return Bucket("benchmark", enable_versioning=True, empty_objects=[f"object-{i}" for i in range(10)])
+
+
+GRAPHS: Dict[str, Callable[[], BenchmarkResources]] = {
+    "vpc": lambda: BenchmarkResources(vpc=_vpc()),
+    "role": lambda: BenchmarkResources(role=_role()),
+    "bucket": lambda: BenchmarkResources(bucket=_bucket()),
+    "all": lambda: BenchmarkResources(vpc=_vpc(), role=_role(), bucket=_bucket()),
+}
+
+
+@dataclass
+class BenchmarkResult:
+    graph: str
+    workers: int
+    phase: str
+    wall_seconds: float
+    api_calls: Dict[str, int]
+    api_seconds: float
+    threads: int
+    peak_in_flight: int
+    critical_path: List[str]
+
+    @property
+    def api_call_count(self) -> int:
+        return sum(self.api_calls.values())
+
+    @property
+    def mean_in_flight(self) -> float:
+        """The average number of concurrent API calls."""
+        return self.api_seconds / self.wall_seconds if self.wall_seconds > 0 else 0.0
+
+    @property
+    def thread_utilization(self) -> float:
+        """The share of the wall time of the threads making API calls spent
+        in API calls. Lower values mean time lost to the framework itself,
+        e.g. waiting on a serial dependency or sleeping between retries."""
+        if self.wall_seconds <= 0 or self.threads == 0:
+            return 0.0
+        return self.api_seconds / (self.wall_seconds * self.threads)
+
+    def to_dict(self) -> dict:
+        return {**asdict(self), "api_call_count": self.api_call_count, "mean_in_flight": self.mean_in_flight,
+                "thread_utilization": self.thread_utilization}
+
+
+@contextlib.contextmanager
+def _bootstrap_workers(workers: int) -> Iterator[None]:
+    previous = os.environ.get(BOOTSTRAP_WORKERS_ENV_VAR)
+    os.environ[BOOTSTRAP_WORKERS_ENV_VAR] = str(workers)
+    try:
+        yield
+    finally:
+        if previous is None:
+            del os.environ[BOOTSTRAP_WORKERS_ENV_VAR]
+        else:
+            os.environ[BOOTSTRAP_WORKERS_ENV_VAR] = previous
+
+
+def run(graph: str, workers: int = BOOTSTRAP_WORKERS, latency_seconds: float = DEFAULT_LATENCY_SECONDS,
+        **stand_in_args) -> List[BenchmarkResult]:
+    """Bootstraps then cleans up a graph of `GRAPHS` against a `StandIn`.
+
+    Returns:
+        List[BenchmarkResult]: The results of the bootstrap and the cleanup.
+    """
+    results = []
+    with _bootstrap_workers(workers), StandIn(latency_seconds, **stand_in_args) as stand_in:
+        resources = GRAPHS[graph]()
+        for phase, method in ((trace.PHASE_BOOTSTRAP, resources.bootstrap), (trace.PHASE_CLEANUP, resources.cleanup)):
+            stand_in.reset_stats()
+            with trace.tracing() as tracer:
+                start = time.perf_counter()
+                method()
+                wall_seconds = time.perf_counter() - start
+            stats = stand_in.stats
+            results.append(BenchmarkResult(
+                graph=graph,
+                workers=workers,
+                phase=phase,
+                wall_seconds=wall_seconds,
+                api_calls=dict(sorted(stats.calls.items())),
+                api_seconds=stats.api_seconds,
+                threads=len(stats.threads),
+                peak_in_flight=stats.peak_in_flight,
+                critical_path=[s.path for s in tracer.critical_path(phase)],
+            ))
+    return results
+
+
+def format_results(results: List[BenchmarkResult]) -> str:
+    """Returns a table of the results, one row per run and phase."""
+    header = ("graph", "workers", "phase", "seconds", "api calls", "threads", "mean in-flight", "peak in-flight",
+              "utilization",
+              "critical path")
+    rows = [
+        (r.graph, str(r.workers), r.phase, f"{r.wall_seconds:.2f}", str(r.api_call_count), str(r.threads),
+         f"{r.mean_in_flight:.2f}", str(r.peak_in_flight), f"{r.thread_utilization:.0%}", " -> ".join(r.critical_path))
+        for r in results
+    ]
+    widths = [max(len(row[i]) for row in [header, *rows]) for i in range(len(header))]
+    return "\n".join("  ".join(cell.ljust(width) for cell, width in zip(row, widths)).rstrip() for row in [header, *rows])
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--graph", nargs="+", choices=sorted(GRAPHS), default=["all"])
+    parser.add_argument("--workers", nargs="+", type=int, default=[1, BOOTSTRAP_WORKERS])
+    parser.add_argument("--latency-ms", type=float, default=DEFAULT_LATENCY_SECONDS * 1000)
+    parser.add_argument("--jitter", type=float, default=0.1)
+    parser.add_argument("--api-calls", action="store_true", help="also print the API calls of each run")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args(argv)
+
+    results = []
+    for graph in args.graph:
+        for workers in args.workers:
+            results.extend(run(graph, workers, args.latency_ms / 1000, jitter=args.jitter))
+
+    print(format_results(results))
+    if args.api_calls:
+        for r in results:
+            print(f"\n{r.graph} ({r.workers} workers, {r.phase}):")
+            for operation, count in Counter(r.api_calls).most_common():
+                print(f"  {operation}: {count}")
+    if args.json:
+        with open(args.json, "w") as stream:
+            json.dump([r.to_dict() for r in results], stream, indent=2)
+
+
+if __name__ == "__main__":
+    main()
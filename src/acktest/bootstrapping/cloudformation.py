@@ -11,13 +11,13 @@
 # express or implied. See the License for the specific language governing
 # permissions and limitations under the License.
 
-import boto3
 import json
 
 from dataclasses import dataclass, field
 
 from .. import resources
 from . import Bootstrappable, BootstrapFailureException
+from ..aws import clients
 
 
 @dataclass
@@ -28,11 +28,11 @@ class Stack(Bootstrappable):
 
     @property
     def cf_client(self):
-        return boto3.client("cloudformation", region_name=self.region)
+        return clients.client("cloudformation", region_name=self.region)
     
     @property
     def cf_resource(self):
-        return boto3.resource("cloudformation", region_name=self.region)
+        return clients.resource("cloudformation", region_name=self.region)
     
     def bootstrap(self):
         """Create a Cloudformation stack with an auto-generated name with a provided template.
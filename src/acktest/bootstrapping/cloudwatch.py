@@ -11,12 +11,11 @@
 # express or implied. See the License for the specific language governing
 # permissions and limitations under the License.
 
-import boto3
-
 from dataclasses import dataclass, field
 
 from . import Bootstrappable
 from .. import resources
+from ..aws import clients
 
 @dataclass
 class LogGroup(Bootstrappable):
@@ -32,11 +31,11 @@ class LogGroup(Bootstrappable):
 
     @property
     def logs_client(self):
-        return boto3.client("logs", region_name=self.region)
+        return clients.client("logs", region_name=self.region)
     
     @property
     def logs_resource(self):
-        return boto3.resource("logs", region_name=self.region)
+        return clients.resource("logs", region_name=self.region)
     
     def bootstrap(self):
         """Creates a CW Log group with an auto-generated name.
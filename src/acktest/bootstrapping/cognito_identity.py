@@ -11,12 +11,11 @@
 # express or implied. See the License for the specific language governing
 # permissions and limitations under the License.
 
-import boto3
-
 from dataclasses import dataclass, field
 
 from . import Bootstrappable
 from .. import resources
+from ..aws import clients
 
 
 @dataclass
@@ -35,7 +34,7 @@ class UserPool(Bootstrappable):
 
     @property
     def cognito_idp_client(self):
-        return boto3.client("cognito-idp", region_name=self.region)
+        return clients.client("cognito-idp", region_name=self.region)
 
     def bootstrap(self):
         """Creates a Cognito User Pool with an auto-generated name."""
@@ -1,10 +1,9 @@
-import boto3
-
 from dataclasses import dataclass, field
 from typing import List
 
 from . import Bootstrappable
 from .. import resources
+from ..aws import clients
 
 @dataclass
 class Table(Bootstrappable):
@@ -21,11 +20,11 @@ class Table(Bootstrappable):
     
     @property
     def dynamodb_client(self):
-        return boto3.client("dynamodb", region_name=self.region)
+        return clients.client("dynamodb", region_name=self.region)
 
     @property
     def dynamodb_resource(self):
-        return boto3.resource("dynamodb", region_name=self.region)
+        return clients.resource("dynamodb", region_name=self.region)
 
     def bootstrap(self):
         """Creates a Dynamodb table with an auto-generated name.
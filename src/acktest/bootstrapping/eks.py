@@ -11,8 +11,6 @@
 # express or implied. See the License for the specific language governing
 # permissions and limitations under the License.
 
-import boto3
-
 from dataclasses import dataclass, field
 from typing import Union
 
@@ -20,6 +18,7 @@ from .. import resources
 from . import Bootstrappable, BootstrapFailureException
 from .vpc import VPC
 from .iam import Role
+from ..aws import clients
 
 
 @dataclass
@@ -49,11 +48,11 @@ class Cluster(Bootstrappable):
 
     @property
     def eks_client(self):
-        return boto3.client("eks", region_name=self.region)
+        return clients.client("eks", region_name=self.region)
 
     @property
     def eks_resource(self):
-        return boto3.resource("eks", region_name=self.region)
+        return clients.resource("eks", region_name=self.region)
 
     def bootstrap(self):
         """Creates an EKS cluster with an auto-generated name on a separate VPC.
@@ -11,13 +11,12 @@
 # express or implied. See the License for the specific language governing
 # permissions and limitations under the License.
 
-import boto3
-
 from dataclasses import dataclass, field
 
 from .. import resources
 from . import Bootstrappable
 from .vpc import VPC
+from ..aws import clients
 
 
 @dataclass
@@ -46,11 +45,11 @@ class NetworkLoadBalancer(Bootstrappable):
 
   @property
   def elbv2_client(self):
-    return boto3.client("elbv2", region_name=self.region)
+    return clients.client("elbv2", region_name=self.region)
 
   @property
   def elbv2_resource(self):
-    return boto3.resource("elbv2", region_name=self.region)
+    return clients.resource("elbv2", region_name=self.region)
 
   def bootstrap(self):
     """Creates a Network Load Balancer cluster with an auto-generated name.
@@ -1,4 +1,3 @@
-import boto3
 import json
 from dataclasses import dataclass, field
 
@@ -6,6 +5,7 @@ from . import Bootstrappable
 from .iam import Role, UserPolicies
 from .s3 import Bucket
 from .. import resources
+from ..aws import clients
 
 @dataclass
 class DeliveryStream(Bootstrappable):
@@ -62,7 +62,7 @@ class DeliveryStream(Bootstrappable):
 
     @property
     def firehose_client(self):
-        return boto3.client("firehose", region_name=self.region)
+        return clients.client("firehose", region_name=self.region)
 
     def bootstrap(self):
         """Creates a Kinesis Data Firehose delivery stream with S3 destination.
@@ -1,10 +1,8 @@
-import boto3
-
 from dataclasses import dataclass, field
 
 from . import Bootstrappable
 from .. import resources
-from ..aws import identity
+from ..aws import clients, identity
 from .iam import Role
 
 @dataclass
@@ -30,7 +28,7 @@ class Function(Bootstrappable):
 
     @property
     def lambda_client(self):
-        return boto3.client("lambda", region_name=self.region)
+        return clients.client("lambda", region_name=self.region)
 
     def bootstrap(self):
         """Creates a Lambda Function with an auto-generated name.
@@ -1,27 +1,92 @@
-import boto3
 import logging
 import json
 import re
 import time
 
+from botocore.exceptions import ClientError, WaiterError
 from dataclasses import dataclass, field
-from typing import List
+from typing import Callable, List
 
-from . import Bootstrappable
+from . import Bootstrappable, trace
 from .. import resources
+from ..wait import WaitStrategy
+from ..aws import clients
 
 # Regex to match the role name from a role ARN
 ROLE_ARN_REGEX = r"^arn:aws:iam::\d{12}:(?:root|user|role\/([A-Za-z0-9-]+))$"
 
-# Time to wait (in seconds) after a role is created.
+# Maximum time to wait (in seconds) after a role is created.
 # Sometimes role propagation takes few seconds, specially
-# ServiceLinkedRoles. Waiting after role creation reduces
-# the chances of tests getting affected by propagation delay
+# ServiceLinkedRoles. The role is probed until it is usable,
+# reducing the chances of tests getting affected by propagation
+# delay without always paying the full wait
 ROLE_CREATE_WAIT_IN_SECONDS = 30
 
-# Time to wait (in seconds) after a role is deleted
+# Minimum time to wait (in seconds) after a role is created, even once the
+# probes pass. The probes read IAM itself, while the services assuming the
+# role (e.g. Lambda) may still reject it for a few seconds afterwards
+ROLE_CREATE_SETTLE_IN_SECONDS = 10
+
+# Maximum time to wait (in seconds) after a role is deleted
 ROLE_DELETE_WAIT_IN_SECONDS = 3
 
+# Time between the first two propagation probes, backing off up to the maximum
+ROLE_PROBE_INTERVAL_IN_SECONDS = 1
+ROLE_PROBE_MAX_INTERVAL_IN_SECONDS = 5
+
+
+def wait_for_propagation(probe: Callable[[], bool], timeout_seconds: float, description: str,
+                         settle_seconds: float = 0) -> bool:
+    """Calls `probe` until it returns True, for at most `timeout_seconds`.
+
+    Client and waiter errors raised by the probe (e.g. NoSuchEntity while the
+    role is not visible yet) count as a negative probe. Once the probe passes,
+    waits until at least `settle_seconds` have elapsed since the first call.
+
+    Returns:
+        bool: Whether the probe succeeded before the timeout.
+    """
+    attempts = WaitStrategy(
+        timeout_seconds=timeout_seconds,
+        interval_seconds=ROLE_PROBE_INTERVAL_IN_SECONDS,
+        max_interval_seconds=ROLE_PROBE_MAX_INTERVAL_IN_SECONDS,
+    ).attempts()
+    probing_seconds = 0
+    try:
+        for _ in attempts:
+            probe_start = time.perf_counter()
+            try:
+                if probe():
+                    settle = min(settle_seconds, timeout_seconds) - attempts.elapsed_seconds
+                    if settle > 0:
+                        time.sleep(settle)
+                    logging.info(f"Waited {attempts.elapsed_seconds:.1f}s for {description}")
+                    return True
+            except (ClientError, WaiterError) as ex:
+                logging.debug(f"Propagation probe failed: {ex}")
+            finally:
+                probing_seconds += time.perf_counter() - probe_start
+    finally:
+        # Time between probes, for bootstrap traces
+        trace.record_sleep(max(0, attempts.elapsed_seconds - probing_seconds))
+
+    logging.warning(f"Timed out after {timeout_seconds}s waiting for {description}, continuing")
+    return False
+
+
+def _role_exists(iam_client, role_name: str) -> bool:
+    # A single check, as the schedule is driven by `wait_for_propagation`
+    iam_client.get_waiter("role_exists").wait(RoleName=role_name, WaiterConfig={"MaxAttempts": 1})
+    return True
+
+
+def _role_deleted(iam_client, role_name: str) -> bool:
+    try:
+        iam_client.get_role(RoleName=role_name)
+    except iam_client.exceptions.NoSuchEntityException:
+        return True
+    return False
+
 @dataclass
 class UserPolicies(Bootstrappable):
     # Inputs
@@ -34,7 +99,7 @@ class UserPolicies(Bootstrappable):
 
     @property
     def iam_client(self):
-        return boto3.client("iam", region_name=self.region)
+        return clients.client("iam", region_name=self.region)
 
     def bootstrap(self):
         """Creates a number of IAM policies with auto-generated names.
@@ -77,7 +142,7 @@ class Role(Bootstrappable):
 
     @property
     def iam_client(self):
-        return boto3.client("iam", region_name=self.region)
+        return clients.client("iam", region_name=self.region)
 
     def _trust_policy_services(self):
         """Returns the list of service principals for the trust policy.
@@ -130,12 +195,36 @@ class Role(Bootstrappable):
         resource_arn = iam_resource["Role"]["Arn"]
 
         # There appears to be a delay in role availability after role creation
-        # resulting in failure that role is not present. So adding a delay
-        # to allow for the role to become available
-        time.sleep(ROLE_CREATE_WAIT_IN_SECONDS)
+        # resulting in failure that role is not present. So wait for the role
+        # to become available
+        wait_for_propagation(
+            lambda: _role_exists(self.iam_client, self.name) and self.verify_propagation(),
+            ROLE_CREATE_WAIT_IN_SECONDS,
+            f"role {self.name} to become available",
+            settle_seconds=ROLE_CREATE_SETTLE_IN_SECONDS,
+        )
 
         self.arn = resource_arn
 
+    def verify_propagation(self) -> bool:
+        """Returns whether the created role is usable, once IAM reports that
+        it exists.
+
+        Checks that every policy attached during bootstrap is visible. Override
+        to probe with a service-specific call instead.
+        """
+        expected = set(self.managed_policies)
+        if self.user_policies is not None:
+            expected.update(self.user_policies.arns)
+        if not expected:
+            return True
+
+        attached = set()
+        paginator = self.iam_client.get_paginator("list_attached_role_policies")
+        for page in paginator.paginate(RoleName=self.name):
+            attached.update(p["PolicyArn"] for p in page["AttachedPolicies"])
+        return expected <= attached
+
     def cleanup(self):
         """Deletes an IAM role.
         """
@@ -155,7 +244,11 @@ class Role(Bootstrappable):
                 )
             self.iam_client.delete_role(RoleName=self.name)
 
-            time.sleep(ROLE_DELETE_WAIT_IN_SECONDS)
+            wait_for_propagation(
+                lambda: _role_deleted(self.iam_client, self.name),
+                ROLE_DELETE_WAIT_IN_SECONDS,
+                f"role {self.name} to be deleted",
+            )
 
         # Policies need to be deleted after they have been detached
         super().cleanup()
@@ -172,7 +265,7 @@ class ServiceLinkedRole(Bootstrappable):
 
     @property
     def iam_client(self):
-        return boto3.client("iam", region_name=self.region)
+        return clients.client("iam", region_name=self.region)
 
     def bootstrap(self):
         """Creates a service-linked role.
@@ -191,12 +284,23 @@ class ServiceLinkedRole(Bootstrappable):
                 return
             raise e
 
+        self.role_name = resp["Role"]["RoleName"]
+
         # There appears to be a delay in role availability after role creation
-        # resulting in failure that role is not present. So adding a delay
-        # to allow for the role to become available
-        time.sleep(ROLE_CREATE_WAIT_IN_SECONDS)
+        # resulting in failure that role is not present. So wait for the role
+        # to become available
+        wait_for_propagation(
+            self.verify_propagation,
+            ROLE_CREATE_WAIT_IN_SECONDS,
+            f"service-linked role {self.role_name} to become available",
+            settle_seconds=ROLE_CREATE_SETTLE_IN_SECONDS,
+        )
 
-        self.role_name = resp["Role"]["RoleName"]
+    def verify_propagation(self) -> bool:
+        """Returns whether the created service-linked role is usable.
+        Override to probe with a service-specific call.
+        """
+        return _role_exists(self.iam_client, self.role_name)
 
     def cleanup(self):
         """Deletes a service-linked role.
@@ -0,0 +1,251 @@
+# Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may
+# not use this file except in compliance with the License. A copy of the
+# License is located at
+#
+#	 http://aws.amazon.com/apache2.0/
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+"""Incremental, resumable bootstrap journal.
+
+`Serializable.serialize` only writes the bootstrap once every resource has
+been created. While a journal is active, every subresource is instead recorded
+in a JSON file as soon as its bootstrap starts and again, with its outputs,
+once it finishes. If the process dies midway:
+
+- bootstrapping again with the same journal skips the resources recorded as
+  bootstrapped, restoring their fields from the journal;
+- `cleanup` restores every recorded resource and cleans up only those, so the
+  resources created before the failure are not lost.
+
+Entries are keyed by the dotted path of the subresource field from the root
+resources (e.g. "vpc.public_subnets"). Only JSON-serializable fields are
+recorded. The file is versioned and written atomically after every change.
+This module only depends on the standard library, and the file can be read
+with any JSON parser.
+
+Usage:
+    from acktest.bootstrapping import journal
+
+    resources = BootstrapResources(...)
+    journal.bootstrap(resources, Path("bootstrap.journal.json"))
+    ...
+    journal.cleanup(BootstrapResources(...), Path("bootstrap.journal.json"))
+"""
+
+from __future__ import annotations
+
+import contextvars
+import importlib
+import json
+import logging
+import os
+import threading
+from contextlib import contextmanager
+from dataclasses import fields
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+JOURNAL_VERSION = 1
+
+STATE_BOOTSTRAPPING = "bootstrapping"
+STATE_BOOTSTRAPPED = "bootstrapped"
+
+
+class JournalVersionError(ValueError):
+    pass
+
+
+def load(path: Path) -> dict:
+    """Reads and validates a journal file.
+
+    Returns:
+        dict: The journal document, with its "version" and "entries".
+    """
+    with open(path) as stream:
+        document = json.load(stream)
+    version = document.get("version")
+    if version != JOURNAL_VERSION:
+        raise JournalVersionError(
+            f"Unsupported bootstrap journal version {version!r} in {path} (expected {JOURNAL_VERSION})")
+    return document
+
+
+def _type_name(resource: Any) -> str:
+    return f"{type(resource).__module__}.{type(resource).__qualname__}"
+
+
+def _import_type(name: str) -> type:
+    module_name, _, qualname = name.rpartition(".")
+    return getattr(importlib.import_module(module_name), qualname)
+
+
+def _is_bootstrappable(value: Any) -> bool:
+    # Duck-typed, so this module does not import the bootstrapping package
+    return hasattr(value, "_iter_bootstrappable_fields")
+
+
+def _outputs(resource: Any) -> dict:
+    """Returns every set, JSON-serializable field of `resource` which is not
+    itself a subresource."""
+    outputs = {}
+    for field in fields(resource):
+        if not hasattr(resource, field.name):
+            # e.g. an `init=False` output which is not set yet
+            continue
+        value = getattr(resource, field.name)
+        if _is_bootstrappable(value):
+            continue
+        try:
+            json.dumps(value)
+        except (TypeError, ValueError):
+            logging.debug(f"Not journaling {type(resource).__name__}.{field.name}: not JSON-serializable")
+            continue
+        outputs[field.name] = value
+    return outputs
+
+
+class Journal:
+    """The entries of a journal file, saved after every change.
+
+    Safe to use from the threads bootstrapping sibling resources concurrently.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self.entries: Dict[str, dict] = load(self.path)["entries"] if self.path.exists() else {}
+
+    def get(self, path: str) -> Optional[dict]:
+        with self._lock:
+            return self.entries.get(path)
+
+    def is_bootstrapped(self, path: str) -> bool:
+        entry = self.get(path)
+        return entry is not None and entry["state"] == STATE_BOOTSTRAPPED
+
+    def record(self, path: str, resource: Any, state: str):
+        entry = {
+            "type": _type_name(resource),
+            "state": state,
+            "outputs": _outputs(resource),
+            "updated_at": datetime.now(timezone.utc).isoformat(),
+        }
+        with self._lock:
+            self.entries[path] = entry
+            self._save()
+
+    def remove(self, path: str):
+        """Removes the entry at `path` along with those of its subresources."""
+        prefix = f"{path}."
+        with self._lock:
+            removed = [p for p in self.entries if p == path or p.startswith(prefix)]
+            for p in removed:
+                del self.entries[p]
+            if removed:
+                self._save()
+
+    def restore(self, path: str, resource: Any):
+        """Sets the recorded outputs of `path` and its subresources on
+        `resource`, creating the subresources which do not exist yet."""
+        entry = self.get(path)
+        if entry is not None:
+            for name, value in entry["outputs"].items():
+                setattr(resource, name, value)
+
+        prefix = f"{path}." if path else ""
+        with self._lock:
+            children = {
+                p[len(prefix):]: e for p, e in self.entries.items()
+                if p.startswith(prefix) and "." not in p[len(prefix):]
+            }
+        for name, child_entry in children.items():
+            child = getattr(resource, name, None)
+            if child is None:
+                # Created during the parent's bootstrap, e.g. `VPC.public_subnets`
+                cls = _import_type(child_entry["type"])
+                child = cls.__new__(cls)
+                for field in fields(child):
+                    setattr(child, field.name, None)
+                setattr(resource, name, child)
+            self.restore(f"{prefix}{name}", child)
+
+    def _save(self):
+        # Atomically, so a crash never leaves a truncated journal behind
+        tmp_path = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, "w") as stream:
+            json.dump({"version": JOURNAL_VERSION, "entries": self.entries}, stream, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+
+_active_journal: contextvars.ContextVar[Optional[Journal]] = contextvars.ContextVar(
+    "acktest_bootstrap_journal", default=None)
+# Dotted path of the resource currently being bootstrapped or cleaned up
+_current_path: contextvars.ContextVar[str] = contextvars.ContextVar("acktest_bootstrap_path", default="")
+
+
+def active_journal() -> Optional[Journal]:
+    return _active_journal.get()
+
+
+def child_path(name: str) -> str:
+    parent = _current_path.get()
+    return f"{parent}.{name}" if parent else name
+
+
+@contextmanager
+def entered(path: str) -> Iterator[None]:
+    """Makes `path` the parent of the subresources bootstrapped or cleaned up
+    within the block."""
+    token = _current_path.set(path)
+    try:
+        yield
+    finally:
+        _current_path.reset(token)
+
+
+@contextmanager
+def journaling(path: Path) -> Iterator[Journal]:
+    """Records the bootstraps and cleanups made within the block in the
+    journal at `path`, resuming from its existing entries."""
+    journal = Journal(path)
+    token = _active_journal.set(journal)
+    path_token = _current_path.set("")
+    try:
+        yield journal
+    finally:
+        _current_path.reset(path_token)
+        _active_journal.reset(token)
+
+
+def bootstrap(resources: Any, path: Path) -> Any:
+    """Bootstraps `resources`, skipping the subresources which the journal at
+    `path` records as bootstrapped.
+
+    Returns:
+        The bootstrapped resources.
+    """
+    with journaling(path) as journal:
+        completed = sum(e["state"] == STATE_BOOTSTRAPPED for e in journal.entries.values())
+        if completed:
+            logging.info(f"Resuming bootstrap from {path} ({completed} resource(s) already bootstrapped)")
+        resources.bootstrap()
+    return resources
+
+
+def cleanup(resources: Any, path: Path) -> Any:
+    """Cleans up the subresources recorded in the journal at `path`,
+    including those of a bootstrap which did not complete.
+
+    Returns:
+        The resources, with their journaled outputs restored.
+    """
+    with journaling(path) as journal:
+        journal.restore("", resources)
+        resources.cleanup()
+    return resources
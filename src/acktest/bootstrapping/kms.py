@@ -1,8 +1,7 @@
-import boto3
-
 from dataclasses import dataclass, field
 
 from . import Bootstrappable
+from ..aws import clients
 
 
 @dataclass
@@ -13,7 +12,7 @@ class Key(Bootstrappable):
 
     @property
     def kms_client(self):
-        return boto3.client("kms", region_name=self.region)
+        return clients.client("kms", region_name=self.region)
 
     def bootstrap(self):
         """Creates a key."""
@@ -0,0 +1,423 @@
+# Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may
+# not use this file except in compliance with the License. A copy of the
+# License is located at
+#
+#	 http://aws.amazon.com/apache2.0/
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+"""Warm pool of pre-bootstrapped resources.
+
+Some bootstrappable resources (e.g. `eks.Cluster`) take tens of minutes to
+create. A `ResourcePool` keeps bootstrapped instances around between runs,
+keyed by a hash of the resource's input fields, and leases each one
+exclusively to a single run at a time. Instances are recycled (cleaned up and
+replaced) once they are older than the pool's TTL.
+
+The pool state, including the pickled instances, lives in a local SQLite
+database, which may be shared by the processes of one host.
+
+Usage:
+    from acktest.bootstrapping.eks import Cluster
+    from acktest.bootstrapping.pool import ResourcePool
+
+    pool = ResourcePool(Path("/var/lib/acktest/pool.db"), size=2)
+    with pool.lease(Cluster("ack-test")) as cluster:
+        run_tests(cluster.name)
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import pickle
+import socket
+import sqlite3
+import time
+import uuid
+from contextlib import closing, contextmanager
+from dataclasses import dataclass, fields
+from pathlib import Path
+from typing import Iterator, List, Optional
+
+from . import Bootstrappable
+
+# Age after which pooled instances are recycled
+POOL_TTL_SECONDS = 24 * 60 * 60
+
+# Time after which a lease not released (e.g. by a crashed run) is revoked
+LEASE_TIMEOUT_SECONDS = 4 * 60 * 60
+
+# Time to wait for another process holding the pool database lock
+DATABASE_TIMEOUT_SECONDS = 60
+
+STATE_AVAILABLE = "available"
+STATE_LEASED = "leased"
+# Cleanup failed; the instance is cleaned up again by `recycle_expired`
+STATE_FAILED = "failed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS instances (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    spec_hash TEXT NOT NULL,
+    resource_type TEXT NOT NULL,
+    state TEXT NOT NULL,
+    payload BLOB,
+    created_at REAL NOT NULL,
+    lease_owner TEXT,
+    lease_expires_at REAL
+)
+"""
+
+
+class LeaseRevokedError(Exception):
+    """Raised when the row reserved for a new instance was revoked or
+    recycled while the instance was bootstrapping."""
+
+
+def spec_hash(resource: Bootstrappable) -> str:
+    """Returns a hash of the type and input (init) fields of a resource.
+
+    Instances with the same hash are interchangeable, as they were bootstrapped
+    from the same inputs.
+    """
+    spec = {
+        "type": f"{type(resource).__module__}.{type(resource).__qualname__}",
+        "inputs": {f.name: getattr(resource, f.name) for f in fields(resource) if f.init},
+    }
+    encoded = json.dumps(spec, sort_keys=True, default=repr)
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+def _default_owner() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+@dataclass
+class Lease:
+    """An instance of the pool leased exclusively by this run.
+
+    Use as a context manager to release the instance when done, or call
+    `release` (or `discard`, if the tests left it unusable) explicitly.
+    """
+
+    pool: ResourcePool
+    instance_id: int
+    resource: Bootstrappable
+    # Recorded as the instance's lease_owner, unique to this lease
+    owner: str
+    released: bool = False
+
+    def release(self):
+        if not self.released:
+            self.pool._release(self)
+            self.released = True
+
+    def discard(self):
+        """Cleans up the instance instead of returning it to the pool."""
+        if not self.released:
+            self.pool._discard(self)
+            self.released = True
+
+    def __enter__(self) -> Bootstrappable:
+        return self.resource
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
+        return False
+
+
+class ResourcePool:
+    """Keeps up to `size` bootstrapped instances per resource spec.
+
+    Args:
+        path: SQLite database holding the pool state.
+        size: number of available instances kept per spec. Extra instances
+            are cleaned up when they are released.
+        ttl_seconds: age after which instances are recycled.
+        lease_timeout_seconds: time after which an unreleased lease is
+            revoked and the instance made available again. Releasing or
+            discarding a revoked lease has no effect.
+        owner: identifies this process in the `lease_owner` of its leases.
+    """
+
+    def __init__(self, path: Path, size: int = 1,
+                 ttl_seconds: float = POOL_TTL_SECONDS,
+                 lease_timeout_seconds: float = LEASE_TIMEOUT_SECONDS,
+                 owner: Optional[str] = None):
+        self.path = Path(path)
+        self.size = size
+        self.ttl_seconds = ttl_seconds
+        self.lease_timeout_seconds = lease_timeout_seconds
+        self.owner = owner or _default_owner()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as db:
+            db.execute(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        # Autocommit mode; transactions are opened explicitly with
+        # BEGIN IMMEDIATE so that concurrent leases are serialized
+        return sqlite3.connect(self.path, timeout=DATABASE_TIMEOUT_SECONDS, isolation_level=None)
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """Runs the block in a transaction holding the database write lock."""
+        db = self._connect()
+        try:
+            db.execute("BEGIN IMMEDIATE")
+            yield db
+            db.execute("COMMIT")
+        except BaseException:
+            if db.in_transaction:
+                db.execute("ROLLBACK")
+            raise
+        finally:
+            db.close()
+
+    def _is_expired(self, created_at: float, now: float) -> bool:
+        return now - created_at >= self.ttl_seconds
+
+    def lease(self, spec: Bootstrappable) -> Lease:
+        """Leases an available instance matching `spec`, bootstrapping a new
+        one (with `spec` itself) if there is none.
+
+        Returns:
+            Lease: the leased instance, deserialized from the pool.
+        """
+        key = spec_hash(spec)
+        now = time.time()
+        owner = self._lease_owner()
+        with self._transaction() as db:
+            self._revoke_expired_leases(db, now)
+            row = db.execute(
+                "SELECT id, payload FROM instances "
+                "WHERE spec_hash = ? AND state = ? AND created_at > ? "
+                "ORDER BY created_at DESC LIMIT 1",
+                (key, STATE_AVAILABLE, now - self.ttl_seconds),
+            ).fetchone()
+            if row is None:
+                # Reserve a row while bootstrapping, without holding the lock
+                instance_id = self._reserve(db, key, spec, owner, now)
+            else:
+                db.execute(
+                    "UPDATE instances SET state = ?, lease_owner = ?, lease_expires_at = ? WHERE id = ? AND state = ?",
+                    (STATE_LEASED, owner, now + self.lease_timeout_seconds, row[0], STATE_AVAILABLE),
+                )
+
+        if row is not None:
+            logging.info(f"Leased pooled {type(spec).__name__} instance {row[0]}")
+            return Lease(self, row[0], pickle.loads(row[1]), owner)
+
+        logging.info(f"No pooled {type(spec).__name__} instance available, bootstrapping instance {instance_id}")
+        self._bootstrap(instance_id, spec, owner)
+        return Lease(self, instance_id, spec, owner)
+
+    def replenish(self, spec: Bootstrappable) -> int:
+        """Recycles expired instances matching `spec` and bootstraps new ones
+        until `size` instances are available.
+
+        Returns:
+            int: the number of instances bootstrapped.
+        """
+        self.recycle_expired()
+        key = spec_hash(spec)
+        with closing(self._connect()) as db:
+            (available,) = db.execute(
+                "SELECT COUNT(*) FROM instances WHERE spec_hash = ? AND state = ?",
+                (key, STATE_AVAILABLE),
+            ).fetchone()
+
+        created = 0
+        for _ in range(self.size - available):
+            instance = pickle.loads(pickle.dumps(spec))
+            owner = self._lease_owner()
+            with self._transaction() as db:
+                instance_id = self._reserve(db, key, instance, owner, time.time())
+            logging.info(f"Replenishing pool with {type(instance).__name__} instance {instance_id}")
+            self._bootstrap(instance_id, instance, owner, STATE_AVAILABLE)
+            created += 1
+        return created
+
+    def recycle_expired(self) -> int:
+        """Cleans up every available instance older than the TTL, and every
+        instance whose cleanup failed before.
+
+        An instance which fails to clean up is logged and kept in the pool, in
+        the failed state, so it is retried by the next call.
+
+        Returns:
+            int: the number of instances cleaned up.
+        """
+        now = time.time()
+        with self._transaction() as db:
+            self._revoke_expired_leases(db, now)
+            rows = [
+                (instance_id, state, payload, self._lease_owner()) for instance_id, state, payload in db.execute(
+                    "SELECT id, state, payload FROM instances WHERE (state = ? AND created_at <= ?) OR state = ?",
+                    (STATE_AVAILABLE, now - self.ttl_seconds, STATE_FAILED),
+                )
+            ]
+            # Leased to this process, so no other run picks them up meanwhile
+            db.executemany(
+                "UPDATE instances SET state = ?, lease_owner = ?, lease_expires_at = ? WHERE id = ? AND state = ?",
+                [(STATE_LEASED, owner, now + self.lease_timeout_seconds, instance_id, state)
+                 for instance_id, state, _, owner in rows],
+            )
+
+        cleaned_up = 0
+        for instance_id, _, payload, owner in rows:
+            try:
+                self._cleanup(instance_id, pickle.loads(payload), owner)
+            except Exception:
+                logging.exception(f"Failed to clean up pooled instance {instance_id}, retrying on next recycle")
+                continue
+            cleaned_up += 1
+        return cleaned_up
+
+    def instances(self) -> List[dict]:
+        """Returns the state of every instance in the pool."""
+        with closing(self._connect()) as db:
+            db.row_factory = sqlite3.Row
+            return [
+                dict(row) for row in db.execute(
+                    "SELECT id, spec_hash, resource_type, state, created_at, lease_owner, lease_expires_at "
+                    "FROM instances ORDER BY id")
+            ]
+
+    def _revoke_expired_leases(self, db: sqlite3.Connection, now: float):
+        revoked = db.execute(
+            "UPDATE instances SET state = ?, lease_owner = NULL, lease_expires_at = NULL "
+            "WHERE state = ? AND lease_expires_at < ? AND payload IS NOT NULL",
+            (STATE_AVAILABLE, STATE_LEASED, now),
+        ).rowcount
+        if revoked:
+            logging.warning(f"Revoked {revoked} expired pool lease(s)")
+        # Instances whose bootstrap never completed cannot be recovered
+        db.execute(
+            "DELETE FROM instances WHERE state = ? AND lease_expires_at < ? AND payload IS NULL",
+            (STATE_LEASED, now),
+        )
+
+    def _reserve(self, db: sqlite3.Connection, key: str, spec: Bootstrappable, owner: str, now: float) -> int:
+        """Inserts a row leased by `owner`, without payload, for an instance
+        about to be bootstrapped.
+
+        Returns:
+            int: the id of the instance.
+        """
+        cursor = db.execute(
+            "INSERT INTO instances (spec_hash, resource_type, state, created_at, lease_owner, lease_expires_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (key, type(spec).__name__, STATE_LEASED, now, owner, now + self.lease_timeout_seconds),
+        )
+        return cursor.lastrowid
+
+    def _bootstrap(self, instance_id: int, spec: Bootstrappable, owner: str, state: Optional[str] = None):
+        """Bootstraps `spec` into the row reserved by `owner`, ending its
+        lease if `state` is given. The row is deleted if the bootstrap fails.
+
+        Raises:
+            LeaseRevokedError: the row was revoked or recycled meanwhile (e.g.
+                the bootstrap outlasted the lease timeout). The new instance,
+                which the pool no longer tracks, is cleaned up first.
+        """
+        try:
+            spec.bootstrap()
+        except BaseException:
+            self._delete(instance_id, owner)
+            raise
+        if not self._store(instance_id, spec, owner, state):
+            logging.error(f"Pooled instance {instance_id} was revoked while bootstrapping, cleaning it up")
+            spec.cleanup()
+            raise LeaseRevokedError(f"Pooled instance {instance_id} was revoked while bootstrapping")
+
+    def _lease_owner(self) -> str:
+        return f"{self.owner}/{uuid.uuid4().hex[:12]}"
+
+    def _store(self, instance_id: int, resource: Bootstrappable, owner: str, state: Optional[str] = None) -> bool:
+        """Stores the instance, ending its lease if `state` is given.
+
+        Returns:
+            bool: False if nothing was stored, as the lease of `owner` was
+                revoked.
+        """
+        with closing(self._connect()) as db:
+            if state is None:
+                cursor = db.execute(
+                    "UPDATE instances SET payload = ? WHERE id = ? AND lease_owner = ?",
+                    (pickle.dumps(resource), instance_id, owner),
+                )
+            else:
+                cursor = db.execute(
+                    "UPDATE instances SET payload = ?, state = ?, lease_owner = NULL, lease_expires_at = NULL "
+                    "WHERE id = ? AND lease_owner = ?",
+                    (pickle.dumps(resource), state, instance_id, owner),
+                )
+            return cursor.rowcount > 0
+
+    def _delete(self, instance_id: int, owner: str):
+        with closing(self._connect()) as db:
+            db.execute("DELETE FROM instances WHERE id = ? AND lease_owner = ?", (instance_id, owner))
+
+    def _cleanup(self, instance_id: int, resource: Bootstrappable, owner: str):
+        """Cleans up an instance leased by `owner`, then removes it from the
+        pool. If the cleanup fails, the instance is kept in the failed state
+        so the resources it holds are not forgotten."""
+        logging.info(f"Cleaning up pooled {type(resource).__name__} instance {instance_id}")
+        try:
+            resource.cleanup()
+        except BaseException:
+            if not self._store(instance_id, resource, owner, STATE_FAILED):
+                logging.error(f"Pooled instance {instance_id} was revoked while cleaning up, "
+                              f"possibly dangling resource: {resource}")
+            raise
+        self._delete(instance_id, owner)
+
+    def _is_leased(self, db: sqlite3.Connection, lease: Lease) -> bool:
+        # False once the lease was revoked, even if the instance was leased
+        # again since
+        row = db.execute(
+            "SELECT 1 FROM instances WHERE id = ? AND state = ? AND lease_owner = ?",
+            (lease.instance_id, STATE_LEASED, lease.owner),
+        ).fetchone()
+        if row is None:
+            logging.warning(f"Pooled instance {lease.instance_id} is no longer leased by {lease.owner}, skipping")
+        return row is not None
+
+    def _release(self, lease: Lease):
+        now = time.time()
+        with self._transaction() as db:
+            if not self._is_leased(db, lease):
+                return
+            key, created_at = db.execute(
+                "SELECT spec_hash, created_at FROM instances WHERE id = ?", (lease.instance_id,)).fetchone()
+            (available,) = db.execute(
+                "SELECT COUNT(*) FROM instances WHERE spec_hash = ? AND state = ?",
+                (key, STATE_AVAILABLE),
+            ).fetchone()
+            keep = not self._is_expired(created_at, now) and available < self.size
+            if keep:
+                db.execute(
+                    "UPDATE instances SET payload = ?, state = ?, lease_owner = NULL, lease_expires_at = NULL "
+                    "WHERE id = ?",
+                    (pickle.dumps(lease.resource), STATE_AVAILABLE, lease.instance_id),
+                )
+
+        if keep:
+            logging.info(f"Returned {type(lease.resource).__name__} instance {lease.instance_id} to the pool")
+        else:
+            # Still leased, so no other run picks it up while cleaning up
+            self._cleanup(lease.instance_id, lease.resource, lease.owner)
+
+    def _discard(self, lease: Lease):
+        with self._transaction() as db:
+            leased = self._is_leased(db, lease)
+        if leased:
+            self._cleanup(lease.instance_id, lease.resource, lease.owner)
@@ -13,7 +13,6 @@
 
 """QuickSight bootstrapping utilities for e2e tests."""
 
-import boto3
 import datetime
 import logging
 import time
@@ -22,6 +21,7 @@ from dataclasses import dataclass, field
 
 from . import Bootstrappable
 from .s3 import Bucket
+from ..aws import clients
 
 # Wait configuration for subscription activation
 DEFAULT_WAIT_TIMEOUT_SECONDS = 300
@@ -55,7 +55,7 @@ class Subscription(Bootstrappable):
 
     @property
     def quicksight_client(self):
-        return boto3.client("quicksight", region_name=self.region)
+        return clients.client("quicksight", region_name=self.region)
 
     def _get_subscription_status(self) -> dict:
         """Returns the QuickSight subscription info, or None if not found."""
@@ -173,7 +173,7 @@ class S3DataSource(Bootstrappable):
 
     @property
     def s3_client(self):
-        return boto3.client("s3", region_name=self.region)
+        return clients.client("s3", region_name=self.region)
 
     def bootstrap(self):
         """Creates the S3 bucket and uploads sample data."""
@@ -0,0 +1,252 @@
+# Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may
+# not use this file except in compliance with the License. A copy of the
+# License is located at
+#
+#	 http://aws.amazon.com/apache2.0/
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+"""Retry policies of bootstrap and cleanup.
+
+Errors raised while bootstrapping or cleaning up a resource are classified by
+their AWS error code, and each class is retried with its own backoff:
+
+- throttling: retried with jittered exponential backoff;
+- not_found: eventual consistency (e.g. a just-created VPC not being visible
+  yet), retried for a couple of minutes;
+- dependency_violation: a dependent resource is still being deleted (e.g. a
+  network interface of a VPC), retried for several minutes;
+- propagation: invalid parameter, malformed policy and access denied errors,
+  which are also how services reject a just-created IAM role or policy that
+  has not propagated yet (e.g. "The role defined for the function cannot be
+  assumed by Lambda"), retried a few times over a minute and a half;
+- non_retryable: validation and credential errors, which fail immediately;
+- other: any other error, retried `bootstrap_retries` / `cleanup_retries`
+  times `bootstrap_interval_sec` / `cleanup_interval_sec` apart, unless the
+  policy sets a backoff.
+
+A resource overrides its policy with its `retry_policy` property, e.g.
+
+    @property
+    def retry_policy(self):
+        return dataclasses.replace(DEFAULT_RETRY_POLICY, throttling=Backoff(...))
+
+During cleanup, a not_found error means that the resource is already gone
+(e.g. deleted by an earlier attempt), so it is not retried: the resource
+counts as cleaned up once its subresources are. A cleanup which deletes
+several resources also wraps each delete call in `ignore_not_found`, so that
+it carries on with the others.
+
+This module does not import botocore: errors are classified by the
+`response["Error"]["Code"]` of botocore's ClientError.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Dict, Iterator, Optional
+
+from ..wait import WaitStrategy
+
+ERROR_CLASS_THROTTLING = "throttling"
+ERROR_CLASS_NOT_FOUND = "not_found"
+ERROR_CLASS_DEPENDENCY_VIOLATION = "dependency_violation"
+ERROR_CLASS_PROPAGATION = "propagation"
+ERROR_CLASS_NON_RETRYABLE = "non_retryable"
+ERROR_CLASS_OTHER = "other"
+
+THROTTLING_ERROR_CODES = frozenset((
+    "Throttling",
+    "ThrottlingException",
+    "ThrottledException",
+    "RequestThrottled",
+    "RequestThrottledException",
+    "RequestLimitExceeded",
+    "TooManyRequestsException",
+    "ProvisionedThroughputExceededException",
+    "SlowDown",
+    "PriorRequestNotComplete",
+))
+
+DEPENDENCY_VIOLATION_ERROR_CODES = frozenset((
+    "DependencyViolation",
+    "DeleteConflict",
+    "ResourceInUse",
+    "ResourceInUseException",
+    "InvalidGroup.InUse",
+))
+
+# e.g. Lambda or EKS rejecting a role that cannot be assumed yet, KMS
+# rejecting a key policy with "invalid principals", or AccessDenied until the
+# policies of a role are in effect
+PROPAGATION_ERROR_CODES = frozenset((
+    "InvalidParameter",
+    "InvalidParameterValue",
+    "InvalidParameterValueException",
+    "InvalidParameterException",
+    "MalformedPolicyDocument",
+    "MalformedPolicyDocumentException",
+    "AccessDenied",
+    "AccessDeniedException",
+    "UnauthorizedOperation",
+))
+
+NON_RETRYABLE_ERROR_CODES = frozenset((
+    "ValidationError",
+    "ValidationException",
+    "InvalidParameterCombination",
+    "InvalidInput",
+    "InvalidInputException",
+    "UnrecognizedClientException",
+    "InvalidClientTokenId",
+))
+
+
+def error_code(exception: BaseException) -> Optional[str]:
+    """Returns the AWS error code of a botocore ClientError, if any."""
+    response = getattr(exception, "response", None)
+    if not isinstance(response, dict):
+        return None
+    return response.get("Error", {}).get("Code")
+
+
+def classify(exception: BaseException) -> str:
+    """Returns the error class (one of the ERROR_CLASS_* constants) of an
+    exception raised while bootstrapping or cleaning up a resource."""
+    if type(exception).__name__ == "ParamValidationError":
+        # Raised by botocore before making the request
+        return ERROR_CLASS_NON_RETRYABLE
+
+    code = error_code(exception)
+    if code is None:
+        return ERROR_CLASS_OTHER
+    if code in THROTTLING_ERROR_CODES:
+        return ERROR_CLASS_THROTTLING
+    if code in DEPENDENCY_VIOLATION_ERROR_CODES:
+        return ERROR_CLASS_DEPENDENCY_VIOLATION
+    if code in PROPAGATION_ERROR_CODES:
+        return ERROR_CLASS_PROPAGATION
+    if code in NON_RETRYABLE_ERROR_CODES:
+        return ERROR_CLASS_NON_RETRYABLE
+    if is_not_found(exception):
+        return ERROR_CLASS_NOT_FOUND
+    return ERROR_CLASS_OTHER
+
+
+def is_not_found(exception: BaseException) -> bool:
+    """Returns whether an exception is an AWS not found error, e.g.
+    InvalidVpcID.NotFound, ResourceNotFoundException or NoSuchEntity."""
+    code = error_code(exception)
+    if code is None:
+        return False
+    return code.endswith("NotFound") or code.endswith("NotFoundException") or code.startswith("NoSuch")
+
+
+@contextmanager
+def ignore_not_found(description: str) -> Iterator[None]:
+    """Ignores the not found errors raised by the block.
+
+    Used when deleting a resource during cleanup: if an earlier attempt
+    deleted it but failed afterwards, the retry finds it already gone.
+    """
+    try:
+        yield
+    except Exception as ex:
+        if not is_not_found(ex):
+            raise
+        logging.info(f"{description} already deleted ({error_code(ex)})")
+
+
+@dataclass(frozen=True)
+class Backoff:
+    """How the errors of one class are retried.
+
+    Attributes:
+        max_attempts: maximum number of attempts failing with this class of
+            error, including the first one.
+        wait: intervals between attempts. Its timeout bounds the time since
+            the first attempt after which errors of this class are no longer
+            retried.
+    """
+
+    max_attempts: int
+    wait: WaitStrategy
+
+    @classmethod
+    def fixed(cls, max_attempts: int, interval_seconds: float) -> Backoff:
+        """Returns a backoff of `max_attempts` attempts a fixed interval apart."""
+        return cls(max_attempts, WaitStrategy(
+            timeout_seconds=math.inf, interval_seconds=interval_seconds, backoff_factor=1, jitter=0))
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """The backoff of each error class. Errors of a class without a backoff
+    are not retried, except for `other` (see the module documentation)."""
+
+    throttling: Optional[Backoff] = Backoff(8, WaitStrategy(
+        timeout_seconds=5 * 60, interval_seconds=1, max_interval_seconds=30, jitter=0.5))
+    not_found: Optional[Backoff] = Backoff(6, WaitStrategy(
+        timeout_seconds=2 * 60, interval_seconds=2, max_interval_seconds=20))
+    dependency_violation: Optional[Backoff] = Backoff(15, WaitStrategy(
+        timeout_seconds=10 * 60, interval_seconds=5, max_interval_seconds=60))
+    propagation: Optional[Backoff] = Backoff(5, WaitStrategy(
+        timeout_seconds=90, interval_seconds=5, max_interval_seconds=30))
+    non_retryable: Optional[Backoff] = None
+    other: Optional[Backoff] = None
+
+    def classify(self, exception: BaseException) -> str:
+        return classify(exception)
+
+    def backoff(self, error_class: str) -> Optional[Backoff]:
+        return getattr(self, error_class)
+
+
+DEFAULT_RETRY_POLICY = RetryPolicy()
+
+
+class Retries:
+    """Tracks the failed attempts of one bootstrap or cleanup under a policy.
+
+    Args:
+        policy: the retry policy of the resource.
+        other: backoff of unclassified errors, if the policy has none.
+    """
+
+    def __init__(self, policy: RetryPolicy, other: Backoff):
+        self.policy = policy
+        self.other = other
+        self.started_at = time.monotonic()
+        self.failures: Dict[str, int] = {}
+        self.last_error_class: Optional[str] = None
+        self._intervals: Dict[str, Iterator[float]] = {}
+
+    def next_delay(self, exception: BaseException) -> Optional[float]:
+        """Records a failed attempt.
+
+        Returns:
+            Optional[float]: The time to wait before the next attempt, or None
+                if `exception` should not be retried.
+        """
+        error_class = self.last_error_class = self.policy.classify(exception)
+        failures = self.failures[error_class] = self.failures.get(error_class, 0) + 1
+
+        backoff = self.policy.backoff(error_class)
+        if backoff is None and error_class == ERROR_CLASS_OTHER:
+            backoff = self.other
+        if backoff is None or failures >= backoff.max_attempts:
+            return None
+
+        remaining = backoff.wait.timeout_seconds - (time.monotonic() - self.started_at)
+        if remaining <= 0:
+            return None
+        intervals = self._intervals.setdefault(error_class, backoff.wait.intervals())
+        return min(next(intervals), remaining)
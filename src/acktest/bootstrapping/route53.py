@@ -11,12 +11,11 @@
 # express or implied. See the License for the specific language governing
 # permissions and limitations under the License.
 
-import boto3
-
 from dataclasses import dataclass, field
 
 from . import Bootstrappable
 from .. import resources
+from ..aws import clients
 
 @dataclass
 class HealthCheck(Bootstrappable):
@@ -30,7 +29,7 @@ class HealthCheck(Bootstrappable):
 
     @property
     def route53_client(self):
-        return boto3.client("route53", region_name=self.region)
+        return clients.client("route53", region_name=self.region)
 
     def bootstrap(self):
         """Creates a Route53 HealthCheck.
@@ -1,4 +1,3 @@
-import boto3
 import logging
 
 from dataclasses import dataclass, field
@@ -6,6 +5,7 @@ from typing import List
 
 from . import Bootstrappable
 from .. import resources
+from ..aws import clients
 
 @dataclass
 class Bucket(Bootstrappable):
@@ -26,11 +26,11 @@ class Bucket(Bootstrappable):
 
     @property
     def s3_client(self):
-        return boto3.client("s3", region_name=self.region)
+        return clients.client("s3", region_name=self.region)
 
     @property
     def s3_resource(self):
-        return boto3.resource("s3", region_name=self.region)
+        return clients.resource("s3", region_name=self.region)
 
     def bootstrap(self):
         """Creates an S3 bucket with an auto-generated name.
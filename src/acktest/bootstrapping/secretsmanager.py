@@ -1,11 +1,10 @@
-import boto3
-
 from dataclasses import dataclass, field
 from typing import Union
 
 from .. import resources
 from . import Bootstrappable
 from .kms import Key
+from ..aws import clients
 
 
 @dataclass
@@ -29,7 +28,7 @@ class Secret(Bootstrappable):
 
     @property
     def secretsmanager_client(self):
-        return boto3.client("secretsmanager", region_name=self.region)
+        return clients.client("secretsmanager", region_name=self.region)
 
     def bootstrap(self):
         """Creates a secret and all subresources."""
@@ -11,12 +11,11 @@
 # express or implied. See the License for the specific language governing
 # permissions and limitations under the License.
 
-import boto3
-
 from dataclasses import dataclass, field
 
 from . import Bootstrappable
 from .. import resources
+from ..aws import clients
 
 @dataclass
 class SigningProfile(Bootstrappable):
@@ -29,7 +28,7 @@ class SigningProfile(Bootstrappable):
     
     @property
     def signer_client(self):
-        return boto3.client("signer", region_name=self.region)
+        return clients.client("signer", region_name=self.region)
 
     def bootstrap(self):
         """Creates a Signing profile with a generated name
@@ -1,9 +1,8 @@
-import boto3
-
 from dataclasses import dataclass, field
 
 from . import Bootstrappable
 from .. import resources
+from ..aws import clients
 
 @dataclass
 class Topic(Bootstrappable):
@@ -21,11 +20,11 @@ class Topic(Bootstrappable):
 
     @property
     def sns_client(self):
-        return boto3.client("sns", region_name=self.region)
+        return clients.client("sns", region_name=self.region)
 
     @property
     def sns_resource(self):
-        return boto3.resource("sns", region_name=self.region)
+        return clients.resource("sns", region_name=self.region)
 
     def bootstrap(self):
         """Creates an SNS topic with an auto-generated name.
@@ -11,12 +11,11 @@
 # express or implied. See the License for the specific language governing
 # permissions and limitations under the License.
 
-import boto3
-
 from dataclasses import dataclass, field
 
 from . import Bootstrappable
 from .. import resources
+from ..aws import clients
 
 @dataclass
 class Queue(Bootstrappable):
@@ -34,11 +33,11 @@ class Queue(Bootstrappable):
 
     @property
     def sqs_client(self):
-        return boto3.client("sqs", region_name=self.region)
+        return clients.client("sqs", region_name=self.region)
 
     @property
     def sqs_resource(self):
-        return boto3.resource("sqs", region_name=self.region)
+        return clients.resource("sqs", region_name=self.region)
 
     def bootstrap(self):
         """Creates an SQS queue with an auto-generated name.
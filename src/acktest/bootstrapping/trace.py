@@ -0,0 +1,249 @@
+# Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may
+# not use this file except in compliance with the License. A copy of the
+# License is located at
+#
+#	 http://aws.amazon.com/apache2.0/
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+"""Tracing of bootstrap and cleanup.
+
+While a `Tracer` is active, every subresource bootstrapped or cleaned up is
+recorded as a span, with its attempts, exceptions, time spent sleeping and the
+number of AWS API calls made by the resource itself (counted with a botocore
+"before-call" handler on the clients of acktest.aws.clients). Spans nest like
+the resources, so the trace shows which chain of resources bounds the total
+time (e.g. VPC -> Subnets -> RouteTable).
+
+The spans can be exported in the Chrome trace event format, which can be
+opened in chrome://tracing or https://ui.perfetto.dev, or printed as a flat
+summary table.
+
+Usage:
+    from acktest.bootstrapping import trace
+
+    with trace.tracing() as tracer:
+        resources.bootstrap()
+    tracer.write_chrome_trace(Path("bootstrap-trace.json"))
+    print(tracer.summary())
+"""
+
+from __future__ import annotations
+
+import contextvars
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+PHASE_BOOTSTRAP = "bootstrap"
+PHASE_CLEANUP = "cleanup"
+
+OUTCOME_SUCCEEDED = "succeeded"
+OUTCOME_FAILED = "failed"
+OUTCOME_SKIPPED = "skipped"
+
+# Emitted once per API call, e.g. before-call.ec2.CreateVpc
+API_CALL_EVENT = "before-call.*.*"
+
+
+@dataclass
+class Span:
+    """The bootstrap or cleanup of a single resource, including all of its
+    attempts."""
+
+    name: str
+    path: str
+    phase: str
+    parent: Optional[Span] = None
+    start: float = field(default_factory=time.perf_counter)
+    end: Optional[float] = None
+    thread_id: int = field(default_factory=threading.get_ident)
+    thread_name: str = field(default_factory=lambda: threading.current_thread().name)
+    attempts: int = 0
+    errors: List[str] = field(default_factory=list)
+    sleep_seconds: float = 0
+    # Made by the resource itself, excluding those of its subresources
+    api_calls: Dict[str, int] = field(default_factory=dict)
+    outcome: Optional[str] = None
+
+    @property
+    def duration_seconds(self) -> float:
+        end = self.end if self.end is not None else time.perf_counter()
+        return end - self.start
+
+    @property
+    def api_call_count(self) -> int:
+        return sum(self.api_calls.values())
+
+
+class Tracer:
+    """Collects the spans recorded while it is active (see `tracing`)."""
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.spans: List[Span] = []
+        self._lock = threading.Lock()
+
+    def _add(self, span: Span):
+        with self._lock:
+            self.spans.append(span)
+
+    def to_chrome_trace(self) -> dict:
+        """Returns the spans as Chrome trace events, one complete ("X")
+        event per span and one track per thread."""
+        pid = os.getpid()
+        events = []
+        threads = {}
+        for span in self.spans:
+            threads.setdefault(span.thread_id, span.thread_name)
+            events.append({
+                "name": span.name,
+                "cat": span.phase,
+                "ph": "X",
+                "pid": pid,
+                "tid": span.thread_id,
+                "ts": (span.start - self.started_at) * 1e6,
+                "dur": span.duration_seconds * 1e6,
+                "args": {
+                    "path": span.path,
+                    "outcome": span.outcome,
+                    "attempts": span.attempts,
+                    "errors": span.errors,
+                    "sleep_seconds": span.sleep_seconds,
+                    "api_calls": span.api_calls,
+                },
+            })
+        for thread_id, thread_name in threads.items():
+            events.append({
+                "name": "thread_name", "ph": "M", "pid": pid, "tid": thread_id, "args": {"name": thread_name},
+            })
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write_chrome_trace(self, path: Path):
+        with open(path, "w") as stream:
+            json.dump(self.to_chrome_trace(), stream)
+
+    def critical_path(self, phase: str = PHASE_BOOTSTRAP) -> List[Span]:
+        """Returns the chain of spans which finished last: the top-level span
+        which ended last, then its subresource span which ended last, and so
+        on."""
+        path = []
+        parent = None
+        while True:
+            children = [s for s in self.spans if s.phase == phase and s.parent is parent and s.end is not None]
+            if not children:
+                return path
+            parent = max(children, key=lambda s: s.end)
+            path.append(parent)
+
+    def summary(self) -> str:
+        """Returns a table of the spans, in order of start time, followed by
+        the critical path of the bootstrap."""
+        header = ("phase", "path", "resource", "outcome", "seconds", "attempts", "sleep", "api calls")
+        rows = [
+            (s.phase, s.path, s.name, s.outcome or "", f"{s.duration_seconds:.2f}", str(s.attempts),
+             f"{s.sleep_seconds:.2f}", str(s.api_call_count))
+            for s in sorted(self.spans, key=lambda s: s.start)
+        ]
+        widths = [max(len(row[i]) for row in [header, *rows]) for i in range(len(header))]
+        lines = ["  ".join(cell.ljust(width) for cell, width in zip(row, widths)).rstrip() for row in [header, *rows]]
+
+        critical = self.critical_path()
+        if critical:
+            chain = " -> ".join(f"{s.name} ({s.duration_seconds:.2f}s)" for s in critical)
+            lines.append(f"Critical path: {chain}")
+        return "\n".join(lines)
+
+
+_active_tracer: contextvars.ContextVar[Optional[Tracer]] = contextvars.ContextVar(
+    "acktest_bootstrap_tracer", default=None)
+_current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar(
+    "acktest_bootstrap_span", default=None)
+
+# Number of active `tracing` blocks, across threads, which need the API call
+# handler registered
+_handler_users = 0
+_handler_lock = threading.Lock()
+
+
+def _count_api_call(event_name: str, model=None, **kwargs):
+    # Called in the thread making the call, so in the context of its span
+    span = _current_span.get()
+    if span is not None and model is not None:
+        service = event_name.split(".")[1] if event_name.count(".") >= 2 else ""
+        operation = f"{service}.{model.name}"
+        span.api_calls[operation] = span.api_calls.get(operation, 0) + 1
+
+
+@contextmanager
+def tracing() -> Iterator[Tracer]:
+    """Records the bootstraps and cleanups made within the block."""
+    # Imported here, as the client registry imports boto3
+    from ..aws import clients
+
+    global _handler_users
+
+    tracer = Tracer()
+    with _handler_lock:
+        if _handler_users == 0:
+            clients.register_event_handler(API_CALL_EVENT, _count_api_call, first=True)
+        _handler_users += 1
+    token = _active_tracer.set(tracer)
+    span_token = _current_span.set(None)
+    try:
+        yield tracer
+    finally:
+        _current_span.reset(span_token)
+        _active_tracer.reset(token)
+        with _handler_lock:
+            _handler_users -= 1
+            if _handler_users == 0:
+                clients.unregister_event_handler(API_CALL_EVENT, _count_api_call)
+
+
+@contextmanager
+def span(name: str, path: str, phase: str) -> Iterator[Span]:
+    """Records a span for the block, if a tracer is active.
+
+    Yields:
+        Span: The span, which is discarded if no tracer is active.
+    """
+    tracer = _active_tracer.get()
+    current = Span(name, path, phase, parent=_current_span.get())
+    if tracer is None:
+        yield current
+        return
+
+    tracer._add(current)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as ex:
+        current.errors.append(f"{type(ex).__name__}: {ex}")
+        current.outcome = current.outcome or OUTCOME_FAILED
+        raise
+    finally:
+        current.end = time.perf_counter()
+        _current_span.reset(token)
+
+
+def sleep(seconds: float):
+    """Sleeps, accounting the time to the current span."""
+    record_sleep(seconds)
+    time.sleep(seconds)
+
+
+def record_sleep(seconds: float):
+    """Accounts time spent waiting (e.g. by a waiter) to the current span."""
+    current = _current_span.get()
+    if current is not None:
+        current.sleep_seconds += seconds
@@ -1,15 +1,23 @@
 from typing import List, Union
-import boto3
 import logging
 
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 
 from . import BootstrapFailureException, Bootstrappable
+from .retry import DEFAULT_RETRY_POLICY, Backoff, ignore_not_found
 from .. import resources
+from ..wait import WaitStrategy
+from ..aws import clients
 
 # Subnets inside the default VPC CIDR block will be of form 10.0.*.0/24
 VPC_CIDR_BLOCK = "10.0.0.0/16"
 
+# Deleting a VPC, its subnets or security group fails with DependencyViolation
+# until the network interfaces created in it (e.g. by load balancers or EKS)
+# are released, which can take up to half an hour
+VPC_RETRY_POLICY = replace(DEFAULT_RETRY_POLICY, dependency_violation=Backoff(30, WaitStrategy(
+    timeout_seconds=30 * 60, interval_seconds=5, max_interval_seconds=60)))
+
 @dataclass
 class TransitGateway(Bootstrappable):
 
@@ -18,11 +26,11 @@ class TransitGateway(Bootstrappable):
 
     @property
     def ec2_client(self):
-        return boto3.client("ec2", region_name=self.region)
+        return clients.client("ec2", region_name=self.region)
 
     @property
     def ec2_resource(self):
-        return boto3.resource("ec2", region_name=self.region)
+        return clients.resource("ec2", region_name=self.region)
 
     def bootstrap(self):
         """Creates a transit gateway.
@@ -47,11 +55,11 @@ class InternetGateway(Bootstrappable):
 
     @property
     def ec2_client(self):
-        return boto3.client("ec2", region_name=self.region)
+        return clients.client("ec2", region_name=self.region)
 
     @property
     def ec2_resource(self):
-        return boto3.resource("ec2", region_name=self.region)
+        return clients.resource("ec2", region_name=self.region)
 
     def bootstrap(self):
         """Creates an internet gateway.
@@ -89,11 +97,11 @@ class RouteTable(Bootstrappable):
 
     @property
     def ec2_client(self):
-        return boto3.client("ec2", region_name=self.region)
+        return clients.client("ec2", region_name=self.region)
 
     @property
     def ec2_resource(self):
-        return boto3.resource("ec2", region_name=self.region)
+        return clients.resource("ec2", region_name=self.region)
 
     def bootstrap(self):
         """Creates a route table.
@@ -113,7 +121,8 @@ class RouteTable(Bootstrappable):
         """
         super().cleanup()
 
-        self.ec2_client.delete_route_table(RouteTableId=self.route_table_id)
+        with ignore_not_found(f"Route table {self.route_table_id}"):
+            self.ec2_client.delete_route_table(RouteTableId=self.route_table_id)
 
 @dataclass
 class Subnets(Bootstrappable):
@@ -135,11 +144,11 @@ class Subnets(Bootstrappable):
 
     @property
     def ec2_client(self):
-        return boto3.client("ec2", region_name=self.region)
+        return clients.client("ec2", region_name=self.region)
 
     @property
     def ec2_resource(self):
-        return boto3.resource("ec2", region_name=self.region)
+        return clients.resource("ec2", region_name=self.region)
 
     def bootstrap(self):
         """Creates subnets.
@@ -165,10 +174,17 @@ class Subnets(Bootstrappable):
         """
         # You must delete the subnet before you can delete any of its dependencies
         for subnet in self.subnet_ids:
-            self.ec2_client.delete_subnet(SubnetId=subnet)
+            with ignore_not_found(f"Subnet {subnet}"):
+                self.ec2_client.delete_subnet(SubnetId=subnet)
 
         super().cleanup()
 
+    @property
+    def retry_policy(self):
+        # Deleting a subnet fails with DependencyViolation while network
+        # interfaces remain in it, like deleting the VPC
+        return VPC_RETRY_POLICY
+
     def get_availability_zone_names(self):
         zones = self.ec2_client.describe_availability_zones()
         return list(map(lambda x: x['ZoneName'], zones['AvailabilityZones']))
@@ -195,11 +211,11 @@ class SecurityGroup(Bootstrappable):
 
     @property
     def ec2_client(self):
-        return boto3.client("ec2", region_name=self.region)
+        return clients.client("ec2", region_name=self.region)
 
     @property
     def ec2_resource(self):
-        return boto3.resource("ec2", region_name=self.region)
+        return clients.resource("ec2", region_name=self.region)
 
     def bootstrap(self):
         """Creates security group with an auto-generated name and description.
@@ -242,11 +258,18 @@ class SecurityGroup(Bootstrappable):
         """Deletes the subnets.
         """
         # You must delete the securityGroup before you can delete any of its dependencies
-        self.ec2_client.delete_security_group(
-            GroupId=self.group_id,
-        )
+        with ignore_not_found(f"Security group {self.group_id}"):
+            self.ec2_client.delete_security_group(
+                GroupId=self.group_id,
+            )
         super().cleanup()
 
+    @property
+    def retry_policy(self):
+        # Deleting a security group fails with DependencyViolation while
+        # network interfaces use it, like deleting the VPC
+        return VPC_RETRY_POLICY
+
 @dataclass
 class VPC(Bootstrappable):
     # Inputs
@@ -280,11 +303,11 @@ class VPC(Bootstrappable):
 
     @property
     def ec2_client(self):
-        return boto3.client("ec2", region_name=self.region)
+        return clients.client("ec2", region_name=self.region)
 
     @property
     def ec2_resource(self):
-        return boto3.resource("ec2", region_name=self.region)
+        return clients.resource("ec2", region_name=self.region)
 
     def bootstrap(self):
         """Creates a VPC with an auto-generated name and any number of public
@@ -320,12 +343,8 @@ class VPC(Bootstrappable):
             raise ex
 
     @property
-    def cleanup_retries(self):
-        return 30
-
-    @property
-    def cleanup_interval_sec(self):
-        return 60 # one minute
+    def retry_policy(self):
+        return VPC_RETRY_POLICY
 
     def cleanup(self):
         """Deletes a VPC.
@@ -333,4 +352,5 @@ class VPC(Bootstrappable):
         super().cleanup()
 
         vpc = self.ec2_resource.Vpc(self.vpc_id)
-        vpc.delete()
+        with ignore_not_found(f"VPC {self.vpc_id}"):
+            vpc.delete()
@@ -1,9 +1,8 @@
-import boto3
-
 from dataclasses import dataclass, field
 from acktest.bootstrapping.elbv2 import NetworkLoadBalancer
 from . import Bootstrappable
 from .. import resources
+from ..aws import clients
 
 @dataclass
 class VpcEndpointServiceConfiguration(Bootstrappable):
@@ -23,11 +22,11 @@ class VpcEndpointServiceConfiguration(Bootstrappable):
 
     @property
     def ec2_client(self):
-        return boto3.client("ec2", region_name=self.region)
+        return clients.client("ec2", region_name=self.region)
 
     @property
     def ec2_resource(self):
-        return boto3.resource("ec2", region_name=self.region)
+        return clients.resource("ec2", region_name=self.region)
 
     def bootstrap(self):
         super().bootstrap()
@@ -9,4 +9,15 @@
 # or in the "license" file accompanying this file. This file is distributed
 # on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
 # express or implied. See the License for the specific language governing
-# permissions and limitations under the License.
\ No newline at end of file
+# permissions and limitations under the License.
+
+import importlib
+
+# Submodules are imported on first access (PEP 562)
+_SUBMODULES = ("aio", "condition", "informer", "metrics", "resource")
+
+
+def __getattr__(name: str):
+    if name in _SUBMODULES:
+        return importlib.import_module(f".{name}", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
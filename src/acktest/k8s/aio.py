@@ -0,0 +1,221 @@
+# Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may
+# not use this file except in compliance with the License. A copy of the
+# License is located at
+#
+#	 http://aws.amazon.com/apache2.0/
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+"""Asyncio variants of the acktest.k8s.resource helpers.
+
+The request helpers run the blocking kubernetes client calls on the event
+loop's default executor, so a thread is only held for the duration of a
+single request. When an informer is running for the resource kind (see
+acktest.k8s.informer), the waiters do not hold a thread at all: they subscribe
+to the informer and are woken up by its watch, so hundreds of resources can be
+awaited concurrently with one watch connection per kind. Informers are not
+started by the waiters, as they list and watch every object of the kind:
+start one with `informer.get_informer` or set ``ACKTEST_K8S_INFORMERS``.
+Otherwise, or if the informer has not synced, the waiters run the blocking
+waiters of acktest.k8s.resource on the default executor.
+
+Usage:
+    import asyncio
+    from acktest.k8s import aio
+
+    async def create_all(references, bodies):
+        await asyncio.gather(*(
+            aio.create_custom_resource(ref, body)
+            for ref, body in zip(references, bodies)))
+        return await asyncio.gather(*(
+            aio.wait_on_condition(ref, "ACK.ResourceSynced", "True")
+            for ref in references))
+"""
+
+import asyncio
+import dataclasses
+import functools
+import logging
+from typing import Callable, Optional, Tuple
+
+from . import informer as _informer
+from . import resource
+from .resource import CustomResourceReference
+from ..wait import WaitStrategy
+
+
+async def _run_blocking(func, *args, **kwargs):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, functools.partial(func, *args, **kwargs))
+
+
+async def _get_informer(reference: CustomResourceReference) -> Optional[_informer.Informer]:
+    # Blocks while an informer started by ACKTEST_K8S_INFORMERS syncs
+    return await _run_blocking(_informer.informer_for, reference)
+
+
+async def _wait_for_resource(reference: CustomResourceReference,
+                             predicate: Callable[[Optional[dict]], bool],
+                             wait_strategy: WaitStrategy) -> Tuple[bool, Optional[dict]]:
+    """Awaits until `predicate` holds for the object referenced by `reference`
+    (None while it does not exist), without blocking a thread.
+
+    With an informer, only the deadline and initial delay of `wait_strategy`
+    apply, as checks are driven by watch events rather than by a polling
+    schedule. Without one, this runs `resource._wait_for_resource` on the
+    default executor.
+
+    Returns:
+        bool, dict: Whether the predicate was satisfied before the timeout,
+            and the last observed version of the object.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + wait_strategy.timeout_seconds
+    if wait_strategy.initial_delay_seconds > 0:
+        await asyncio.sleep(min(wait_strategy.initial_delay_seconds, wait_strategy.timeout_seconds))
+
+    cache = await _get_informer(reference)
+    if cache is None:
+        remaining = max(0, deadline - loop.time())
+        return await _run_blocking(
+            resource._wait_for_resource, reference, predicate,
+            dataclasses.replace(wait_strategy, timeout_seconds=remaining, initial_delay_seconds=0))
+
+    changed = asyncio.Event()
+    name = reference.name.lower()
+
+    def _on_event(event_type: str, obj: dict):
+        if obj.get('metadata', {}).get('name') == name:
+            loop.call_soon_threadsafe(changed.set)
+
+    cache.add_listener(_on_event)
+    try:
+        obj = None
+        while True:
+            changed.clear()
+            # Objects written by this process are only evaluated once the
+            # informer has caught up with the write.
+            if cache.wait_for_own_writes(name, timeout_seconds=0):
+                obj = cache.get(name)
+                if predicate(obj):
+                    return True, obj
+
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return False, obj
+            try:
+                await asyncio.wait_for(changed.wait(), remaining)
+            except asyncio.TimeoutError:
+                pass
+    finally:
+        cache.remove_listener(_on_event)
+
+
+async def create_custom_resource(reference: CustomResourceReference, custom_resource: dict):
+    return await _run_blocking(resource.create_custom_resource, reference, custom_resource)
+
+
+async def get_resource(reference: CustomResourceReference):
+    return await _run_blocking(resource.get_resource, reference)
+
+
+async def get_resource_exists(reference: CustomResourceReference) -> bool:
+    return await _run_blocking(resource.get_resource_exists, reference)
+
+
+async def patch_custom_resource(reference: CustomResourceReference, custom_resource: dict,
+                                minimal: bool = False, field_manager: Optional[str] = None):
+    return await _run_blocking(
+        resource.patch_custom_resource, reference, custom_resource,
+        minimal=minimal, field_manager=field_manager)
+
+
+async def delete_custom_resource(
+    reference: CustomResourceReference, wait_periods: int = 1, period_length: int = 5,
+    wait_strategy: Optional[WaitStrategy] = None):
+    """Delete custom resource from cluster and wait for it to be removed by the server
+    for wait_periods * period_length seconds.
+
+    Returns:
+        response, bool:
+        response is APIserver response for the operation.
+        bool is true if resource was removed from the server and false otherwise
+    """
+    if wait_strategy is None:
+        wait_strategy = WaitStrategy.from_periods(wait_periods, period_length)
+
+    tracker = resource._DeletionTracker(reference)
+    _response = await _run_blocking(resource._request_custom_resource_deletion, reference)
+
+    deleted, obj = await _wait_for_resource(reference, tracker, wait_strategy)
+    if not deleted:
+        logging.error(tracker.result(deleted, obj).diagnostic)
+    return _response, deleted
+
+
+async def wait_resource_consumed_by_controller(
+        reference: CustomResourceReference, wait_periods: int = 3, period_length: int = 10,
+        wait_strategy: Optional[WaitStrategy] = None):
+    if wait_strategy is None:
+        wait_strategy = WaitStrategy.from_periods(wait_periods, period_length)
+
+    if not await get_resource_exists(reference):
+        logging.error(f"Resource {reference} does not exist")
+        return None
+
+    consumed, obj = await _wait_for_resource(
+        reference,
+        lambda obj: obj is not None and 'status' in obj,
+        wait_strategy,
+    )
+    if consumed:
+        return obj
+
+    logging.error(
+        f"Wait for resource {reference} to be consumed by controller timed out")
+    return None
+
+
+async def wait_on_condition(reference: CustomResourceReference,
+                            condition_name: str,
+                            desired_condition_status: str,
+                            wait_periods: int = 2,
+                            period_length: int = 60,
+                            wait_strategy: Optional[WaitStrategy] = None) -> bool:
+    """
+    Waits for the specified condition in .status.conditions to reach the desired value.
+
+    Precondition:
+        resource must be consumed by the controller (i.e. have a .status field)
+
+    Returns:
+        False if the resource doesn't exist, have .status.conditions at all, have the requested
+            condition type, or if the wait times out. True otherwise.
+    """
+    if wait_strategy is None:
+        wait_strategy = WaitStrategy.from_periods(wait_periods, period_length)
+
+    if not await get_resource_exists(reference):
+        logging.error(f"Resource {reference} does not exist")
+        return False
+
+    def _condition_met(obj: Optional[dict]) -> bool:
+        desired_condition = resource._find_condition(obj, condition_name)
+        return desired_condition is not None and \
+            desired_condition['status'] == desired_condition_status
+
+    met, obj = await _wait_for_resource(reference, _condition_met, wait_strategy)
+    if met:
+        logging.info(f"Condition {condition_name} has status {desired_condition_status}, continuing...")
+        return True
+
+    desired_condition = resource._find_condition(obj, condition_name)
+    if not desired_condition:
+        logging.error(f"Resource {reference} does not have a condition of type {condition_name}.")
+    else:
+        logging.error(f"Wait for condition {condition_name} to reach status {desired_condition_status} timed out. Condition has message '{desired_condition.get('message')}'")
+    return False
@@ -13,12 +13,11 @@
 
 """Utility functions to help processing Kubernetes resource conditions"""
 
-import pytest
-
 from datetime import datetime
-from typing import Optional
+from typing import Callable, Dict, Iterable, List, Optional, Union
 
 from . import resource
+from ..wait import WaitStrategy
 
 CONDITION_TYPE_ADOPTED = "ACK.Adopted"
 CONDITION_TYPE_RESOURCE_SYNCED = "ACK.ResourceSynced"
@@ -28,9 +27,27 @@ CONDITION_TYPE_ADVISORY = "ACK.Advisory"
 CONDITION_TYPE_LATE_INITIALIZED = "ACK.LateInitialized"
 CONDITION_TYPE_REFERENCES_RESOLVED = "ACK.ReferencesResolved"
 
+# Condition types which, once True, abort `wait_for_conditions` by default
+FAIL_FAST_CONDITION_TYPES = (CONDITION_TYPE_TERMINAL,)
+
+# Predicate over the .status.conditions of a resource, keyed by condition type
+ConditionsPredicate = Callable[[Dict[str, dict]], bool]
+
+# The assertion helpers accept either a reference, which is fetched, or an
+# already fetched snapshot of the resource
+ResourceOrSnapshot = Union[resource.CustomResourceReference, resource.ResourceSnapshot]
+
+
+def _fail(msg: str):
+    # pytest is imported on the first failure rather than with this module,
+    # as it is slow to import outside of a test session
+    import pytest
+
+    pytest.fail(msg)
+
 
 def assert_type_status(
-    ref: resource.CustomResourceReference,
+    ref: ResourceOrSnapshot,
     cond_type_match: str = CONDITION_TYPE_RESOURCE_SYNCED,
     cond_status_match: bool = True,
 ):
@@ -56,21 +73,31 @@ def assert_type_status(
         pytest.fail when condition of the specified type is not found or is not
         in the supplied status.
     """
-    cond = resource.get_resource_condition(ref, cond_type_match)
+    msg = _type_status_failure(
+        resource.as_snapshot(ref), cond_type_match, cond_status_match)
+    if msg is not None:
+        _fail(msg)
+
+
+def _type_status_failure(
+    snapshot: resource.ResourceSnapshot,
+    cond_type_match: str,
+    cond_status_match: bool,
+) -> Optional[str]:
+    cond = resource.get_snapshot_condition(snapshot, cond_type_match)
     if cond is None:
-        msg = (f"Failed to find {cond_type_match} condition in "
-               f"resource {ref}")
-        pytest.fail(msg)
+        return (f"Failed to find {cond_type_match} condition in "
+                f"resource {snapshot.reference}")
 
     cond_status = cond.get('status', None)
     if str(cond_status) != str(cond_status_match):
-        msg = (f"Expected {cond_type_match} condition to "
-               f"have status {cond_status_match} but found {cond_status}")
-        pytest.fail(msg)
+        return (f"Expected {cond_type_match} condition to "
+                f"have status {cond_status_match} but found {cond_status}")
+    return None
 
 
 def assert_synced_status(
-    ref: resource.CustomResourceReference,
+    ref: ResourceOrSnapshot,
     cond_status_match: bool,
 ):
     """Asserts that the supplied resource has a condition of type
@@ -95,7 +122,7 @@ def assert_synced_status(
     assert_type_status(ref, CONDITION_TYPE_RESOURCE_SYNCED, cond_status_match)
 
 
-def assert_synced(ref: resource.CustomResourceReference):
+def assert_synced(ref: ResourceOrSnapshot):
     """Asserts that the supplied resource has a condition of type
     ACK.ResourceSynced and that the Status of this condition is True.
 
@@ -119,7 +146,7 @@ def assert_synced(ref: resource.CustomResourceReference):
 
 
 def get_synced_last_transition_time(
-    ref: resource.CustomResourceReference,
+    ref: ResourceOrSnapshot,
 ) -> Optional[datetime]:
     """Returns the lastTransitionTime of the ACK.ResourceSynced condition.
 
@@ -136,7 +163,7 @@ def get_synced_last_transition_time(
     return resource.parse_condition_last_transition_time(cond)
 
 
-def assert_not_synced(ref: resource.CustomResourceReference):
+def assert_not_synced(ref: ResourceOrSnapshot):
     """Asserts that the supplied resource has a condition of type
     ACK.ResourceSynced and that the Status of this condition is False.
 
@@ -157,3 +184,219 @@ def assert_not_synced(ref: resource.CustomResourceReference):
         a False status.
     """
     return assert_synced_status(ref, False)
+
+
+def conditions_by_type(resource_data: Optional[dict]) -> Dict[str, dict]:
+    """Returns the .status.conditions of a resource keyed by condition type."""
+    if resource_data is None:
+        return {}
+    conditions = resource_data.get('status', {}).get('conditions', None) or []
+    return {cond.get('type'): cond for cond in conditions}
+
+
+def has_status(
+    conditions: Dict[str, dict],
+    cond_type: str,
+    cond_status: bool = True,
+) -> bool:
+    """Returns whether `conditions` has a condition of type `cond_type` in the
+    status `cond_status`."""
+    cond = conditions.get(cond_type)
+    return cond is not None and str(cond.get('status', None)) == str(cond_status)
+
+
+def wait_for_conditions(
+    ref: resource.CustomResourceReference,
+    predicate: ConditionsPredicate,
+    wait_periods: int = 2,
+    period_length: int = 60,
+    fail_on: Iterable[str] = FAIL_FAST_CONDITION_TYPES,
+    wait_strategy: Optional[WaitStrategy] = None,
+) -> dict:
+    """Waits until `predicate` holds for the conditions of the supplied
+    resource, failing as soon as one of the `fail_on` condition types is True.
+
+    The predicate receives the .status.conditions of every observed version
+    of the resource, keyed by condition type, so it can combine several
+    conditions. The resource is watched, so the wait returns (or fails) as
+    soon as the controller writes the deciding status.
+
+    Usage:
+        from acktest.k8s import condition
+
+        condition.wait_for_conditions(
+            ref,
+            lambda conds: condition.has_status(
+                conds, condition.CONDITION_TYPE_RESOURCE_SYNCED, True),
+            fail_on=(condition.CONDITION_TYPE_TERMINAL,
+                     condition.CONDITION_TYPE_RECOVERABLE),
+        )
+
+    Pass `fail_on=()` when waiting for the controller to clear a Terminal
+    condition, as the resource still carries it when the wait starts.
+
+    Returns:
+        dict: the resource once the predicate holds.
+
+    Raises:
+        pytest.fail when the resource does not exist or is deleted, a
+        `fail_on` condition becomes True, or the predicate does not hold
+        before the wait times out.
+    """
+    if wait_strategy is None:
+        wait_strategy = WaitStrategy.from_periods(wait_periods, period_length)
+    fail_on = tuple(fail_on)
+    failed = []
+
+    def _done(resource_data: Optional[dict]) -> bool:
+        if resource_data is None:
+            # Missing, or deleted while waiting, so the wait cannot succeed
+            return True
+        conditions = conditions_by_type(resource_data)
+        if predicate(conditions):
+            return True
+        for cond_type in fail_on:
+            if has_status(conditions, cond_type, True):
+                failed.append(conditions[cond_type])
+                return True
+        return False
+
+    done, resource_data = resource._wait_for_resource(ref, _done, wait_strategy)
+    if resource_data is None:
+        _fail(f"Resource {ref} not found")
+    if failed:
+        cond = failed[0]
+        _fail(f"Resource {ref} has condition {cond.get('type')}=True "
+              f"with message '{cond.get('message')}'")
+    if not done:
+        summary = ", ".join(
+            f"{cond_type}={cond.get('status')}"
+            for cond_type, cond in conditions_by_type(resource_data).items())
+        _fail(f"Wait for conditions of resource {ref} timed out after "
+              f"{wait_strategy.timeout_seconds}s. Conditions: [{summary}]")
+    return resource_data
+
+
+def wait_until_synced(
+    ref: resource.CustomResourceReference,
+    wait_periods: int = 2,
+    period_length: int = 60,
+    fail_on: Iterable[str] = FAIL_FAST_CONDITION_TYPES,
+    wait_strategy: Optional[WaitStrategy] = None,
+) -> dict:
+    """Waits until the ACK.ResourceSynced condition of the supplied resource
+    is True, failing as soon as one of the `fail_on` condition types is True.
+
+    See `wait_for_conditions`.
+    """
+    return wait_for_conditions(
+        ref,
+        lambda conds: has_status(conds, CONDITION_TYPE_RESOURCE_SYNCED, True),
+        wait_periods=wait_periods,
+        period_length=period_length,
+        fail_on=fail_on,
+        wait_strategy=wait_strategy,
+    )
+
+
+class ConditionSnapshot:
+    """Batched assertions against a single fetch of a resource.
+
+    Every assertion is evaluated against the same `resource.ResourceSnapshot`
+    and failures are collected rather than raised, so a test checking several
+    conditions and status fields costs one API call and reports every
+    mismatch at once. The collected failures are raised when the `with` block
+    exits, or by calling `verify`.
+
+    Usage:
+        from acktest.k8s import condition
+
+        with condition.snapshot(ref) as snap:
+            snap.assert_synced()
+            snap.assert_type_status(condition.CONDITION_TYPE_TERMINAL, False)
+            snap.assert_condition_state_message(
+                condition.CONDITION_TYPE_ADVISORY, "True", "expected message")
+            snap.assert_arn()
+        arn = snap.arn
+    """
+
+    def __init__(self, snapshot: resource.ResourceSnapshot):
+        self.snapshot = snapshot
+        self.failures: List[str] = []
+
+    @property
+    def resource(self) -> Optional[dict]:
+        return self.snapshot.resource
+
+    @property
+    def arn(self) -> Optional[str]:
+        return self.snapshot.arn
+
+    def get_condition(self, cond_type: str) -> Optional[dict]:
+        return self.snapshot.get_condition(cond_type)
+
+    def check(self, ok: bool, msg: str) -> bool:
+        """Records `msg` as a failure unless `ok`."""
+        if not ok:
+            self.failures.append(msg)
+        return ok
+
+    def _record(self, msg: Optional[str]) -> bool:
+        return self.check(msg is None, msg)
+
+    def assert_type_status(
+        self,
+        cond_type_match: str = CONDITION_TYPE_RESOURCE_SYNCED,
+        cond_status_match: bool = True,
+    ) -> bool:
+        return self._record(
+            _type_status_failure(self.snapshot, cond_type_match, cond_status_match))
+
+    def assert_synced_status(self, cond_status_match: bool) -> bool:
+        return self.assert_type_status(CONDITION_TYPE_RESOURCE_SYNCED, cond_status_match)
+
+    def assert_synced(self) -> bool:
+        return self.assert_synced_status(True)
+
+    def assert_not_synced(self) -> bool:
+        return self.assert_synced_status(False)
+
+    def assert_condition_state_message(
+        self,
+        cond_type_match: str,
+        cond_status_match: str,
+        cond_message_match: Optional[str],
+    ) -> bool:
+        return self._record(resource.condition_state_message_failure(
+            self.snapshot, cond_type_match, cond_status_match, cond_message_match))
+
+    def assert_arn(self, expected: Optional[str] = None) -> bool:
+        """Asserts that .status.ackResourceMetadata.arn is set (and equal to
+        `expected`, if given)."""
+        arn = self.arn
+        if arn is None:
+            return self.check(False, f"Resource {self.snapshot.reference} does not have an ARN")
+        return self.check(expected is None or arn == expected,
+                          f"Expected resource {self.snapshot.reference} to have ARN {expected} but found {arn}")
+
+    def verify(self):
+        """Raises pytest.fail listing every failed assertion, if any."""
+        if self.failures:
+            failures = self.failures
+            self.failures = []
+            _fail(f"{len(failures)} assertion(s) failed for resource "
+                  f"{self.snapshot.reference}:\n" + "\n".join(f"  - {f}" for f in failures))
+
+    def __enter__(self) -> "ConditionSnapshot":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.verify()
+        return False
+
+
+def snapshot(ref: ResourceOrSnapshot) -> ConditionSnapshot:
+    """Fetches the supplied resource once for batched assertions. See
+    `ConditionSnapshot`."""
+    return ConditionSnapshot(resource.as_snapshot(ref))
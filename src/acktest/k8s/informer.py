@@ -0,0 +1,397 @@
+# Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may
+# not use this file except in compliance with the License. A copy of the
+# License is located at
+#
+#	 http://aws.amazon.com/apache2.0/
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+"""Shared list-watch caches for ACK custom resources.
+
+An `Informer` lists every object of one custom resource kind (optionally in a
+single namespace) and then keeps a local copy up to date from a single
+background watch. When an informer is running for a kind, the read helpers in
+`acktest.k8s.resource` (`get_resource`, `get_resource_exists`, the condition
+helpers and the waiters) are served from the local copy instead of issuing a
+request per read, so many parallel tests polling resources of the same kind
+share one watch connection.
+
+Usage:
+    from acktest.k8s import informer
+
+    informer.get_informer(CRD_GROUP, CRD_VERSION, RESOURCE_PLURAL, "default")
+
+Informers can also be started on demand for every kind that is read by
+setting the ``ACKTEST_K8S_INFORMERS`` environment variable.
+
+Writes made through `acktest.k8s.resource` are registered with the informer
+for their kind, and subsequent reads of the same object wait (for up to
+`READ_BARRIER_TIMEOUT_SECONDS`) until the informer has observed the write.
+If it has not, the read falls back to a live GET, so reads never return an
+object older than the caller's own last write.
+"""
+
+import copy
+import logging
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from kubernetes import client, watch
+from kubernetes.client.rest import ApiException
+
+from . import metrics as _metrics
+from . import resource
+
+InformerKey = Tuple[str, str, str, Optional[str]]
+Listener = Callable[[str, dict], None]
+
+# Environment variable which starts an informer for every kind that is read
+AUTO_START_ENV_VAR = "ACKTEST_K8S_INFORMERS"
+
+# Server-side timeout of each watch request. The watch is re-opened from the
+# last seen resourceVersion after it expires.
+WATCH_TIMEOUT_SECONDS = 300
+
+# Time to wait before re-opening a watch that failed unexpectedly
+WATCH_RETRY_INTERVAL_SECONDS = 1
+
+# Time a read waits for the informer to observe the caller's own last write
+# before falling back to a live GET
+READ_BARRIER_TIMEOUT_SECONDS = 5
+
+# Time `get_informer` waits for the initial list of a new informer
+INITIAL_SYNC_TIMEOUT_SECONDS = 30
+
+HTTP_STATUS_GONE = 410
+
+
+def _resource_version_at_least(observed: Optional[str], expected: str) -> bool:
+    """Compares two resourceVersions.
+
+    resourceVersions are opaque strings, but the API server backs them with
+    the etcd revision, which increases monotonically across a resource kind.
+    Numeric versions are therefore compared by value; anything else can only
+    be compared for equality.
+    """
+    if observed is None:
+        return False
+    try:
+        return int(observed) >= int(expected)
+    except ValueError:
+        return observed == expected
+
+
+class Informer:
+    """Maintains a local copy of every object of a custom resource kind.
+
+    The informer performs an initial LIST and then follows a WATCH from the
+    returned resourceVersion on a daemon thread. Expired watches (410 Gone)
+    trigger a fresh LIST, after which DELETED/MODIFIED events are synthesized
+    for anything that changed while the informer was not watching.
+    """
+
+    def __init__(self, group: str, version: str, plural: str,
+                 namespace: Optional[str] = None):
+        self.group = group.lower()
+        self.version = version.lower()
+        self.plural = plural.lower()
+        self.namespace = namespace.lower() if namespace is not None else None
+
+        self._objects: Dict[str, dict] = {}
+        # Sequence number of the last event seen for each object name,
+        # including deletions
+        self._object_seq: Dict[str, int] = {}
+        # Writes which the informer has not yet observed, by object name, as
+        # (resourceVersion of the write or None, sequence number at write)
+        self._pending_writes: Dict[str, Tuple[Optional[str], int]] = {}
+        self._listeners: List[Listener] = []
+
+        self._resource_version: Optional[str] = None
+        self._seq = 0
+        self._synced = False
+        self._stopped = False
+        self._changed = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._watch: Optional[watch.Watch] = None
+
+    def __str__(self):
+        return f"{self.plural}.{self.version}.{self.group}/{self.namespace or 'cluster'}"
+
+    @property
+    def key(self) -> InformerKey:
+        return (self.group, self.version, self.plural, self.namespace)
+
+    @property
+    def resource_version(self) -> Optional[str]:
+        """The most recent resourceVersion observed by the informer."""
+        return self._resource_version
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(
+            target=self._run, name=f"informer-{self}", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        with self._changed:
+            self._stopped = True
+            self._changed.notify_all()
+        if self._watch is not None:
+            self._watch.stop()
+
+    def has_synced(self) -> bool:
+        return self._synced
+
+    def wait_for_sync(self, timeout_seconds: float = INITIAL_SYNC_TIMEOUT_SECONDS) -> bool:
+        """Blocks until the initial list has been loaded into the cache."""
+        with self._changed:
+            return self._changed.wait_for(
+                lambda: self._synced or self._stopped, timeout_seconds) and self._synced
+
+    def wait_for_resource_version(self, resource_version: str,
+                                  timeout_seconds: float = READ_BARRIER_TIMEOUT_SECONDS) -> bool:
+        """Sync barrier: blocks until the informer has observed every change up
+        to and including `resource_version` (e.g. the version returned by a
+        create or patch call).
+
+        Returns:
+            bool: True if the version was observed within the timeout.
+        """
+        with self._changed:
+            return self._changed.wait_for(
+                lambda: _resource_version_at_least(self._resource_version, resource_version),
+                timeout_seconds)
+
+    def note_write(self, name: str, response: Optional[dict]):
+        """Registers a write to the object `name` which reads must observe.
+
+        `response` is the API server response to the write. When it carries
+        no resourceVersion (e.g. a Status returned by a DELETE), any later
+        event for the object satisfies the barrier.
+        """
+        name = name.lower()
+        resource_version = None
+        if isinstance(response, dict):
+            resource_version = response.get('metadata', {}).get('resourceVersion')
+        with self._changed:
+            self._pending_writes[name] = (resource_version, self._seq)
+
+    def _write_observed(self, name: str) -> bool:
+        pending = self._pending_writes.get(name)
+        if pending is None:
+            return True
+        resource_version, seq = pending
+        if resource_version is not None:
+            observed = _resource_version_at_least(self._resource_version, resource_version)
+        else:
+            observed = self._object_seq.get(name, 0) > seq
+        if observed:
+            del self._pending_writes[name]
+        return observed
+
+    def wait_for_own_writes(self, name: str,
+                            timeout_seconds: float = READ_BARRIER_TIMEOUT_SECONDS) -> bool:
+        """Blocks until the last write to `name` registered with `note_write`
+        has been observed by the informer.
+        """
+        name = name.lower()
+        with self._changed:
+            return self._changed.wait_for(lambda: self._write_observed(name), timeout_seconds)
+
+    def get(self, name: str) -> Optional[dict]:
+        """Returns a copy of the cached object, or None if it does not exist."""
+        with self._changed:
+            obj = self._objects.get(name.lower())
+        return copy.deepcopy(obj) if obj is not None else None
+
+    def list(self) -> List[dict]:
+        with self._changed:
+            objects = list(self._objects.values())
+        return copy.deepcopy(objects)
+
+    def wait_for(self, name: str, predicate: Callable[[Optional[dict]], bool],
+                 timeout_seconds: float) -> Tuple[bool, Optional[dict]]:
+        """Blocks until `predicate` holds for the cached object `name` (None
+        while it does not exist).
+
+        Returns:
+            bool, dict: Whether the predicate was satisfied before the
+                timeout, and a copy of the last observed version of the object.
+        """
+        name = name.lower()
+        deadline = time.monotonic() + timeout_seconds
+        with self._changed:
+            while True:
+                obj = copy.deepcopy(self._objects.get(name))
+                seq = self._object_seq.get(name, 0)
+                if predicate(obj):
+                    return True, obj
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or self._stopped:
+                    return False, obj
+                self._changed.wait_for(
+                    lambda: self._object_seq.get(name, 0) != seq or self._stopped,
+                    remaining)
+
+    def add_listener(self, listener: Listener):
+        """Registers a callback invoked with (event_type, object) on the
+        informer thread for every change to the cache.
+        """
+        with self._changed:
+            self._listeners.append(listener)
+
+    def remove_listener(self, listener: Listener):
+        with self._changed:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+    def _list_function(self, _api: client.CustomObjectsApi):
+        if self.namespace is None:
+            return _api.list_cluster_custom_object, (self.group, self.version, self.plural)
+        return _api.list_namespaced_custom_object, (self.group, self.version, self.namespace, self.plural)
+
+    def _apply(self, event_type: str, obj: dict):
+        """Applies an event to the cache. Must be called holding the lock."""
+        name = obj['metadata']['name']
+        if event_type == 'DELETED':
+            self._objects.pop(name, None)
+        else:
+            self._objects[name] = obj
+        self._seq += 1
+        self._object_seq[name] = self._seq
+
+    def _notify(self, events: List[Tuple[str, dict]]):
+        with self._changed:
+            listeners = list(self._listeners)
+            self._changed.notify_all()
+        for event_type, obj in events:
+            for listener in listeners:
+                try:
+                    listener(event_type, obj)
+                except Exception:
+                    logging.exception(f"Informer {self} listener failed")
+
+    def _relist(self, _api: client.CustomObjectsApi):
+        list_func, args = self._list_function(_api)
+        response = list_func(*args)
+        items = {item['metadata']['name']: item for item in response.get('items', [])}
+
+        events = []
+        with self._changed:
+            for name, obj in list(self._objects.items()):
+                if name not in items:
+                    self._apply('DELETED', obj)
+                    events.append(('DELETED', obj))
+            for name, obj in items.items():
+                cached = self._objects.get(name)
+                if cached is None:
+                    events.append(('ADDED', obj))
+                elif resource._resource_version(cached) != resource._resource_version(obj):
+                    events.append(('MODIFIED', obj))
+                else:
+                    continue
+                self._apply(events[-1][0], obj)
+            self._resource_version = response.get('metadata', {}).get('resourceVersion')
+            self._synced = True
+        self._notify(events)
+
+    def _watch_once(self, _api: client.CustomObjectsApi):
+        list_func, args = self._list_function(_api)
+        self._watch = watch.Watch()
+        stream = self._watch.stream(
+            list_func, *args,
+            resource_version=self._resource_version,
+            allow_watch_bookmarks=True,
+            timeout_seconds=WATCH_TIMEOUT_SECONDS,
+            _request_timeout=WATCH_TIMEOUT_SECONDS + resource.WATCH_CLIENT_TIMEOUT_GRACE_SECONDS,
+        )
+        for event in stream:
+            obj = event['raw_object']
+            resource_version = resource._resource_version(obj)
+            with self._changed:
+                if event['type'] in ('ADDED', 'MODIFIED', 'DELETED'):
+                    self._apply(event['type'], obj)
+                if resource_version is not None:
+                    self._resource_version = resource_version
+            if event['type'] != 'BOOKMARK':
+                self._notify([(event['type'], obj)])
+            else:
+                self._notify([])
+            if self._stopped:
+                return
+
+    def _run(self):
+        while not self._stopped:
+            _api = _metrics.instrument(client.CustomObjectsApi(resource._get_k8s_api_client()))
+            try:
+                if not self._synced or self._resource_version is None:
+                    self._relist(_api)
+                self._watch_once(_api)
+            except ApiException as ex:
+                if ex.status == HTTP_STATUS_GONE:
+                    logging.debug(f"Informer {self} watch expired, relisting")
+                    self._resource_version = None
+                    continue
+                logging.warning(f"Informer {self} watch failed ({ex.status}: {ex.reason}), retrying")
+                time.sleep(WATCH_RETRY_INTERVAL_SECONDS)
+            except Exception as ex:
+                logging.debug(f"Informer {self} watch disconnected ({ex}), resuming")
+                time.sleep(WATCH_RETRY_INTERVAL_SECONDS)
+
+
+_informers: Dict[InformerKey, Informer] = {}
+_informers_lock = threading.Lock()
+
+
+def _key(group: str, version: str, plural: str, namespace: Optional[str]) -> InformerKey:
+    return (group.lower(), version.lower(), plural.lower(),
+            namespace.lower() if namespace is not None else None)
+
+
+def get_informer(group: str, version: str, plural: str,
+                 namespace: Optional[str] = None,
+                 wait_for_sync: bool = True) -> Informer:
+    """Returns the process-wide informer for a resource kind, starting it if
+    it is not already running.
+    """
+    key = _key(group, version, plural, namespace)
+    with _informers_lock:
+        informer = _informers.get(key)
+        if informer is None:
+            informer = Informer(group, version, plural, namespace)
+            _informers[key] = informer
+            informer.start()
+    if wait_for_sync and not informer.wait_for_sync():
+        logging.warning(f"Informer {informer} did not sync within {INITIAL_SYNC_TIMEOUT_SECONDS}s")
+    return informer
+
+
+def informer_for(reference: "resource.CustomResourceReference") -> Optional[Informer]:
+    """Returns the synced informer which covers `reference`, if any.
+
+    When ``ACKTEST_K8S_INFORMERS`` is set, an informer is started for kinds
+    that do not have one yet.
+    """
+    key = _key(reference.group, reference.version, reference.plural, reference.namespace)
+    informer = _informers.get(key)
+    if informer is None and resource._env_flag(AUTO_START_ENV_VAR):
+        informer = get_informer(*key)
+    if informer is None or not informer.has_synced():
+        return None
+    return informer
+
+
+def stop_informers():
+    """Stops and forgets every running informer."""
+    with _informers_lock:
+        informers = list(_informers.values())
+        _informers.clear()
+    for informer in informers:
+        informer.stop()
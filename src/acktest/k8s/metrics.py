@@ -0,0 +1,267 @@
+# Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may
+# not use this file except in compliance with the License. A copy of the
+# License is located at
+#
+#	 http://aws.amazon.com/apache2.0/
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+"""Instrumentation of the Kubernetes API calls made by acktest.k8s.
+
+Every CustomObjectsApi and CoreV1Api call made through `instrument` is timed
+and counted. Records are keyed by verb (get, list, watch, create, patch,
+replace, delete), resource plural and the test module that issued the call
+(taken from the PYTEST_CURRENT_TEST variable set by pytest), so the load each
+controller and test module puts on the API server can be compared.
+
+When the ACKTEST_K8S_METRICS_DIR environment variable is set, the recorded
+metrics are written to that directory as JSON and Prometheus text-format files
+when the interpreter exits. Each pytest-xdist worker writes its own pair of
+files.
+
+Usage:
+    from acktest.k8s import metrics
+
+    metrics.export("/tmp/k8s-metrics")
+"""
+
+import atexit
+import functools
+import inspect
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from kubernetes.client.rest import ApiException
+
+METRICS_DIR_ENV_VAR = "ACKTEST_K8S_METRICS_DIR"
+
+# Upper bounds (in seconds) of the latency histogram buckets, matching the
+# Prometheus client defaults
+LATENCY_BUCKETS_SECONDS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+_VERBS = ("get", "list", "create", "patch", "replace", "delete")
+
+
+@dataclass
+class ApiCallStats:
+    """Aggregated timings of the calls sharing one verb, plural and test module."""
+
+    count: int = 0
+    errors: int = 0
+    total_seconds: float = 0
+    max_seconds: float = 0
+    bucket_counts: List[int] = field(default_factory=lambda: [0] * len(LATENCY_BUCKETS_SECONDS))
+
+    def observe(self, seconds: float, error: bool):
+        self.count += 1
+        if error:
+            self.errors += 1
+        self.total_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+        for i, bound in enumerate(LATENCY_BUCKETS_SECONDS):
+            if seconds <= bound:
+                self.bucket_counts[i] += 1
+                break
+
+
+# Keys are (verb, plural, test module)
+MetricKey = Tuple[str, str, str]
+
+_stats: Dict[MetricKey, ApiCallStats] = {}
+_stats_lock = threading.Lock()
+
+
+def record(verb: str, plural: str, seconds: float, error: bool = False):
+    """Records a single API call."""
+    key = (verb, plural, _current_test_module())
+    with _stats_lock:
+        stats = _stats.get(key)
+        if stats is None:
+            stats = _stats[key] = ApiCallStats()
+        stats.observe(seconds, error)
+
+
+def snapshot() -> Dict[MetricKey, ApiCallStats]:
+    """Returns a copy of the metrics recorded so far."""
+    with _stats_lock:
+        return {
+            key: ApiCallStats(s.count, s.errors, s.total_seconds, s.max_seconds, list(s.bucket_counts))
+            for key, s in _stats.items()
+        }
+
+
+def reset():
+    with _stats_lock:
+        _stats.clear()
+
+
+def _current_test_module() -> str:
+    # PYTEST_CURRENT_TEST is formatted as "path/to/test_module.py::test_name (phase)"
+    current = os.environ.get("PYTEST_CURRENT_TEST")
+    if not current:
+        return ""
+    return current.split("::", 1)[0]
+
+
+def _plural_from_method_name(name: str, verb: str) -> str:
+    # e.g. create_namespaced_secret -> secrets, delete_namespace -> namespaces
+    kind = name[len(verb) + 1:]
+    for prefix in ("namespaced_", "cluster_"):
+        if kind.startswith(prefix):
+            kind = kind[len(prefix):]
+    return kind if kind.endswith("s") else f"{kind}s"
+
+
+@functools.lru_cache(maxsize=None)
+def _signature(func: Callable) -> inspect.Signature:
+    return inspect.signature(func)
+
+
+def _instrument_method(name: str, method: Callable) -> Callable:
+    verb = next((v for v in _VERBS if name.startswith(f"{v}_")), None)
+    if verb is None:
+        return method
+
+    @functools.wraps(method)
+    def _instrumented(*args, **kwargs):
+        call_verb = "watch" if verb == "list" and kwargs.get("watch") else verb
+        try:
+            bound = _signature(method.__func__).bind_partial(method.__self__, *args, **kwargs)
+            plural = bound.arguments.get("plural") or _plural_from_method_name(name, verb)
+        except TypeError:
+            plural = _plural_from_method_name(name, verb)
+
+        error = False
+        start = time.perf_counter()
+        try:
+            return method(*args, **kwargs)
+        except ApiException:
+            error = True
+            raise
+        finally:
+            # For a watch this is the time taken to open the stream
+            record(call_verb, plural, time.perf_counter() - start, error)
+
+    return _instrumented
+
+
+class _InstrumentedApi:
+    """Proxy of a generated kubernetes API class which times its calls."""
+
+    def __init__(self, api: Any):
+        self._api = api
+
+    def __getattr__(self, name: str):
+        attr = getattr(self._api, name)
+        if name.startswith("_") or not inspect.ismethod(attr):
+            return attr
+        return _instrument_method(name, attr)
+
+
+def instrument(api: Any) -> Any:
+    """Wraps a kubernetes API object (e.g. client.CustomObjectsApi) so that
+    its calls are recorded."""
+    return _InstrumentedApi(api)
+
+
+def to_json(stats: Optional[Dict[MetricKey, ApiCallStats]] = None) -> dict:
+    if stats is None:
+        stats = snapshot()
+    calls = []
+    for (verb, plural, test_module), s in sorted(stats.items()):
+        calls.append({
+            "verb": verb,
+            "plural": plural,
+            "test_module": test_module,
+            "count": s.count,
+            "errors": s.errors,
+            "total_seconds": s.total_seconds,
+            "mean_seconds": s.total_seconds / s.count if s.count else 0,
+            "max_seconds": s.max_seconds,
+            "buckets": {str(bound): n for bound, n in zip(LATENCY_BUCKETS_SECONDS, s.bucket_counts)},
+        })
+    return {"calls": calls}
+
+
+def _labels(verb: str, plural: str, test_module: str, **extra) -> str:
+    labels = {"verb": verb, "plural": plural, "test_module": test_module, **extra}
+    escaped = (
+        f'{k}="' + str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"'
+        for k, v in labels.items()
+    )
+    return "{" + ",".join(escaped) + "}"
+
+
+def to_prometheus(stats: Optional[Dict[MetricKey, ApiCallStats]] = None) -> str:
+    """Renders the metrics in the Prometheus text exposition format."""
+    if stats is None:
+        stats = snapshot()
+    items = sorted(stats.items())
+
+    lines = [
+        "# HELP acktest_k8s_api_request_duration_seconds Latency of Kubernetes API calls made by acktest.",
+        "# TYPE acktest_k8s_api_request_duration_seconds histogram",
+    ]
+    for key, s in items:
+        cumulative = 0
+        for bound, n in zip(LATENCY_BUCKETS_SECONDS, s.bucket_counts):
+            cumulative += n
+            lines.append(f"acktest_k8s_api_request_duration_seconds_bucket{_labels(*key, le=bound)} {cumulative}")
+        lines.append(f"acktest_k8s_api_request_duration_seconds_bucket{_labels(*key, le='+Inf')} {s.count}")
+        lines.append(f"acktest_k8s_api_request_duration_seconds_sum{_labels(*key)} {s.total_seconds}")
+        lines.append(f"acktest_k8s_api_request_duration_seconds_count{_labels(*key)} {s.count}")
+
+    lines += [
+        "# HELP acktest_k8s_api_request_errors_total Kubernetes API calls made by acktest which failed.",
+        "# TYPE acktest_k8s_api_request_errors_total counter",
+    ]
+    for key, s in items:
+        lines.append(f"acktest_k8s_api_request_errors_total{_labels(*key)} {s.errors}")
+    return "\n".join(lines) + "\n"
+
+
+def export(directory: Path) -> Tuple[Path, Path]:
+    """Writes the recorded metrics to `directory`.
+
+    The file names include the pytest-xdist worker id (if any) so parallel
+    workers do not overwrite each other's files.
+
+    Returns:
+        Path, Path: the JSON and Prometheus text files written.
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    worker = os.environ.get("PYTEST_XDIST_WORKER", "main")
+
+    stats = snapshot()
+    json_path = directory / f"k8s-api-metrics-{worker}.json"
+    prometheus_path = directory / f"k8s-api-metrics-{worker}.prom"
+    with open(json_path, "w") as f:
+        json.dump(to_json(stats), f, indent=2)
+    with open(prometheus_path, "w") as f:
+        f.write(to_prometheus(stats))
+    return json_path, prometheus_path
+
+
+def _export_at_exit():
+    directory = os.environ.get(METRICS_DIR_ENV_VAR)
+    if not directory or not _stats:
+        return
+    try:
+        json_path, _ = export(Path(directory))
+        logging.info(f"Wrote Kubernetes API metrics to {json_path}")
+    except OSError as ex:
+        logging.warning(f"Could not write Kubernetes API metrics to {directory}: {ex}")
+
+
+atexit.register(_export_at_exit)
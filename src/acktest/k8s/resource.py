@@ -16,18 +16,25 @@ CustomResource APIs.
 
 import logging
 import base64
+import copy
 import os
-import distutils.util as util
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
-from time import sleep
-from typing import Dict, Optional, Union
-from dataclasses import dataclass
-from kubernetes import config, client
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from dataclasses import dataclass, field, replace
+from kubernetes import config, client, watch
 from kubernetes.client.api_client import ApiClient
 from kubernetes.client.rest import ApiException
+from kubernetes.config import kube_config
+from urllib3.exceptions import HTTPError
 
+from . import informer as _informer
+from . import metrics as _metrics
 from ..resources import load_resource_file
+from ..wait import WaitStrategy
 
 
 @dataclass
@@ -117,14 +124,123 @@ def load_and_create_resource(resource_directory: Path,
     return reference, spec, resource
 
 
-def _get_k8s_api_client() -> ApiClient:
-    # Create new client every time to avoid token refresh issues
-    # https://github.com/kubernetes-client/python/issues/741
-    # https://github.com/kubernetes-client/python-base/issues/125
-    if bool(util.strtobool(os.environ.get('LOAD_IN_CLUSTER_KUBECONFIG', 'false'))):
-        config.load_incluster_config()
-        return ApiClient()
-    return config.new_client_from_config()
+# Maximum number of pooled HTTP connections kept by the shared ApiClient. The
+# kubernetes client defaults to 5 * cpu_count, which is too small when many
+# test threads wait on resources concurrently and causes connections to be
+# discarded (and re-handshaked) instead of reused.
+K8S_CONNECTION_POOL_MAXSIZE = int(
+    os.environ.get("ACKTEST_K8S_CONNECTION_POOL_MAXSIZE", "64"))
+
+# A cached ApiClient is rebuilt this many seconds before its bearer token
+# expires, so that no request is ever sent with a stale token.
+K8S_TOKEN_REFRESH_SKEW_SECONDS = 60
+
+IN_CLUSTER_CACHE_KEY = ("in-cluster",)
+
+
+@dataclass
+class _CachedApiClient:
+    api_client: ApiClient
+    # Epoch seconds after which the client must be rebuilt. None if the
+    # credentials do not carry an expiry.
+    expires_at: Optional[float] = None
+
+    def is_expired(self) -> bool:
+        return self.expires_at is not None and time.time() >= self.expires_at
+
+
+_api_client_cache: Dict[Tuple, _CachedApiClient] = {}
+_api_client_cache_lock = threading.Lock()
+
+
+def _kubeconfig_cache_key(config_file: Optional[str], context: Optional[str]) -> Tuple:
+    """Returns a key identifying the kubeconfig file(s) and their contents.
+
+    The modification time of every file is part of the key, so rewriting the
+    kubeconfig (e.g. switching clusters between test runs) produces a new
+    client on the next call.
+    """
+    if config_file is None:
+        config_file = os.environ.get("KUBECONFIG", "~/.kube/config")
+    paths = tuple(
+        os.path.expanduser(p) for p in config_file.split(os.pathsep) if p)
+    mtimes = []
+    for path in paths:
+        try:
+            mtimes.append(os.stat(path).st_mtime_ns)
+        except OSError:
+            mtimes.append(None)
+    return (paths, context, tuple(mtimes))
+
+
+def _new_k8s_api_client(key: Tuple, context: Optional[str]) -> _CachedApiClient:
+    configuration = client.Configuration()
+    expires_at = None
+    if key == IN_CLUSTER_CACHE_KEY:
+        # The in-cluster loader installs a hook which re-reads the projected
+        # service account token before it expires.
+        config.load_incluster_config(client_configuration=configuration)
+    else:
+        paths = key[0]
+        loader = kube_config._get_kube_config_loader(
+            filename=os.pathsep.join(paths),
+            active_context=context,
+            persist_config=False,
+        )
+        loader.load_and_set(configuration)
+        expiry = getattr(loader, "expiry", None)
+        if expiry is not None:
+            expires_at = expiry.timestamp() - K8S_TOKEN_REFRESH_SKEW_SECONDS
+
+    configuration.connection_pool_maxsize = max(
+        configuration.connection_pool_maxsize or 0, K8S_CONNECTION_POOL_MAXSIZE)
+    return _CachedApiClient(ApiClient(configuration=configuration), expires_at)
+
+
+def _env_flag(name: str) -> bool:
+    """Parses a boolean environment variable (false when unset) with the rules
+    of distutils.util.strtobool, which is slow to import."""
+    value = os.environ.get(name, 'false').lower()
+    if value in ('y', 'yes', 't', 'true', 'on', '1'):
+        return True
+    if value in ('n', 'no', 'f', 'false', 'off', '0'):
+        return False
+    raise ValueError(f"Invalid truth value {value!r} for {name}")
+
+
+def _close_api_client(api_client: ApiClient):
+    # `ApiClient.close` only shuts down the thread pool of async requests
+    api_client.close()
+    api_client.rest_client.pool_manager.clear()
+
+
+def _get_k8s_api_client(config_file: Optional[str] = None,
+                        context: Optional[str] = None) -> ApiClient:
+    """Returns a process-wide ApiClient for the active kubeconfig.
+
+    Building a client re-parses the kubeconfig (and may execute a credential
+    plugin) and opens a new connection pool, so clients are cached and shared
+    across threads. A cached client is only rebuilt when the kubeconfig file
+    changes or its bearer token is about to expire, which avoids the stale
+    token issues of long-lived clients:
+    https://github.com/kubernetes-client/python/issues/741
+    https://github.com/kubernetes-client/python-base/issues/125
+    """
+    if _env_flag('LOAD_IN_CLUSTER_KUBECONFIG'):
+        key = IN_CLUSTER_CACHE_KEY
+    else:
+        key = _kubeconfig_cache_key(config_file, context)
+
+    with _api_client_cache_lock:
+        cached = _api_client_cache.get(key)
+        if cached is None or cached.is_expired():
+            cached = _new_k8s_api_client(key, context)
+            # Drop clients for previous versions of the same kubeconfig,
+            # releasing their connection and thread pools
+            for stale_key in [k for k in _api_client_cache if k[:2] == key[:2]]:
+                _close_api_client(_api_client_cache.pop(stale_key).api_client)
+            _api_client_cache[key] = cached
+        return cached.api_client
 
 
 def create_k8s_namespace(namespace_name: str, annotations: dict = {}):
@@ -133,79 +249,318 @@ def create_k8s_namespace(namespace_name: str, annotations: dict = {}):
     namespace = client.V1Namespace(metadata=client.V1ObjectMeta(
         name=namespace_name.lower(),annotations=annotations))
 
-    return client.CoreV1Api(_api_client).create_namespace(namespace)
+    return _metrics.instrument(client.CoreV1Api(_api_client)).create_namespace(namespace)
 
 
 def delete_k8s_namespace(namespace_name: str):
     _api_client = _get_k8s_api_client()
-    return client.CoreV1Api(_api_client).delete_namespace(namespace_name.lower())
+    return _metrics.instrument(client.CoreV1Api(_api_client)).delete_namespace(namespace_name.lower())
 
 
 def create_custom_resource(
         reference: CustomResourceReference, custom_resource: dict):
     _api_client = _get_k8s_api_client()
-    _api = client.CustomObjectsApi(_api_client)
+    _api = _metrics.instrument(client.CustomObjectsApi(_api_client))
 
     if reference.namespace is None:
-        return _api.create_cluster_custom_object(
+        _response = _api.create_cluster_custom_object(
             reference.group.lower(),
             reference.version.lower(),
             reference.plural.lower(),
             custom_resource
         )
-    return _api.create_namespaced_custom_object(
-        reference.group.lower(),
-        reference.version.lower(),
-        reference.namespace.lower(),
-        reference.plural.lower(),
-        custom_resource
-    )
+    else:
+        _response = _api.create_namespaced_custom_object(
+            reference.group.lower(),
+            reference.version.lower(),
+            reference.namespace.lower(),
+            reference.plural.lower(),
+            custom_resource
+        )
+    _note_write(reference, _response)
+    return _response
 
 def patch_custom_resource(
-    reference: CustomResourceReference, custom_resource: dict):
+    reference: CustomResourceReference, custom_resource: dict,
+    minimal: bool = False, field_manager: Optional[str] = None):
+    """Patches the resource with `custom_resource` as a JSON merge patch.
+
+    Args:
+        minimal: prune from the patch every field whose value matches the
+            last version of the resource read or written by this process, so
+            only the fields the test actually changed are sent.
+        field_manager: send `custom_resource` as a server-side apply request
+            owned by this field manager instead (forcing ownership of the
+            fields it sets). The apply body is never pruned, as the server
+            would release the omitted fields.
+
+    With either option, a 409 Conflict is retried once after refetching the
+    resource, rebasing any .metadata.resourceVersion in `custom_resource`
+    onto the refetched version.
+
+    Returns:
+        object: the patched resource.
+    """
+    if field_manager is not None:
+        return _write_with_conflict_retry(
+            reference, custom_resource,
+            lambda last_known, desired: desired,
+            lambda body: _apply_custom_resource(reference, body, field_manager),
+        )
+    if minimal:
+        return _write_with_conflict_retry(
+            reference, custom_resource,
+            lambda last_known, desired: _merge_patch(last_known, desired),
+            lambda body: _patch_custom_resource(reference, body),
+        )
+    return _patch_custom_resource(reference, custom_resource)
+
+
+def _patch_custom_resource(reference: CustomResourceReference, custom_resource: dict):
     _api_client = _get_k8s_api_client()
-    _api = client.CustomObjectsApi(_api_client)
+    _api = _metrics.instrument(client.CustomObjectsApi(_api_client))
 
     if reference.namespace is None:
-        return _api.patch_cluster_custom_object(
+        _response = _api.patch_cluster_custom_object(
             reference.group.lower(),
             reference.version.lower(),
             reference.plural.lower(),
             reference.name.lower(),
             custom_resource
         )
-    return _api.patch_namespaced_custom_object(
+    else:
+        _response = _api.patch_namespaced_custom_object(
+            reference.group.lower(),
+            reference.version.lower(),
+            reference.namespace.lower(),
+            reference.plural.lower(),
+            reference.name.lower(),
+            custom_resource
+        )
+    _note_write(reference, _response)
+    return _response
+
+def replace_custom_resource(
+    reference: CustomResourceReference, custom_resource: dict, minimal: bool = False):
+    """Replaces the resource with `custom_resource`.
+
+    Args:
+        minimal: instead of sending the whole object, send a JSON merge patch
+            of the differences from the last version of the resource read or
+            written by this process. Fields missing from .spec are removed;
+            .status is left to the controller. A 409 Conflict is retried once
+            after refetching the resource.
+
+    Returns:
+        object: the replaced resource.
+    """
+    if minimal:
+        return _write_with_conflict_retry(
+            reference, custom_resource,
+            _replacement_merge_patch,
+            lambda body: _patch_custom_resource(reference, body),
+        )
+
+    _api_client = _get_k8s_api_client()
+    _api = _metrics.instrument(client.CustomObjectsApi(_api_client))
+
+    if reference.namespace is None:
+        _response = _api.replace_cluster_custom_object(
+            reference.group, reference.version, reference.plural, reference.name, custom_resource)
+    else:
+        _response = _api.replace_namespaced_custom_object(
+            reference.group, reference.version, reference.namespace, reference.plural, reference.name, custom_resource)
+    _note_write(reference, _response)
+    return _response
+
+
+# Content type of server-side apply requests. JSON bodies are valid YAML.
+APPLY_PATCH_CONTENT_TYPE = "application/apply-patch+yaml"
+
+HTTP_STATUS_CONFLICT = 409
+
+# Last version of each resource read or written by this process, used as the
+# base of minimal patches
+_last_known: Dict[Tuple, dict] = {}
+_last_known_lock = threading.Lock()
+
+
+def _reference_key(reference: CustomResourceReference) -> Tuple:
+    return (
         reference.group.lower(),
         reference.version.lower(),
-        reference.namespace.lower(),
+        reference.namespace.lower() if reference.namespace is not None else None,
         reference.plural.lower(),
         reference.name.lower(),
-        custom_resource
     )
 
-def replace_custom_resource(
-    reference: CustomResourceReference, custom_resource: dict):
+
+def _remember(reference: CustomResourceReference, resource: Optional[dict]):
+    # Stored as a copy, since tests commonly edit the returned object in place
+    # and patch it back
+    if not isinstance(resource, dict) or 'metadata' not in resource:
+        return
+    with _last_known_lock:
+        _last_known[_reference_key(reference)] = copy.deepcopy(resource)
+
+
+def _forget(reference: CustomResourceReference):
+    with _last_known_lock:
+        _last_known.pop(_reference_key(reference), None)
+
+
+def _get_last_known(reference: CustomResourceReference) -> Optional[dict]:
+    with _last_known_lock:
+        return _last_known.get(_reference_key(reference))
+
+
+def _merge_patch(original: Optional[dict], patch: dict, remove_missing: bool = False) -> dict:
+    """Prunes from the JSON merge patch `patch` every value `original` already
+    has. With `remove_missing`, keys of `original` missing from `patch` are
+    set to None (i.e. removed)."""
+    original = original or {}
+    result = {}
+    if remove_missing:
+        for key in original:
+            if key not in patch:
+                result[key] = None
+    for key, value in patch.items():
+        if key not in original:
+            if value is not None:
+                result[key] = value
+            continue
+        current = original[key]
+        if isinstance(value, dict) and isinstance(current, dict):
+            nested = _merge_patch(current, value, remove_missing)
+            if nested:
+                result[key] = nested
+        elif value != current:
+            result[key] = value
+    return result
+
+
+def _replacement_merge_patch(original: Optional[dict], desired: dict) -> dict:
+    patch = _merge_patch(original, {k: v for k, v in desired.items() if k not in ('spec', 'status')})
+    spec = _merge_patch((original or {}).get('spec'), desired.get('spec') or {}, remove_missing=True)
+    if spec:
+        patch['spec'] = spec
+    return patch
+
+
+def _rebase(custom_resource: dict, resource: Optional[dict]) -> dict:
+    """Replaces the resourceVersion in `custom_resource`, if any, with the one
+    of `resource`."""
+    resource_version = _resource_version(resource)
+    if resource_version is None or 'resourceVersion' not in custom_resource.get('metadata', {}):
+        return custom_resource
+    rebased = dict(custom_resource)
+    rebased['metadata'] = {**custom_resource['metadata'], 'resourceVersion': resource_version}
+    return rebased
+
+
+def _write_with_conflict_retry(reference: CustomResourceReference,
+                               custom_resource: dict,
+                               make_body: Callable[[Optional[dict], dict], dict],
+                               send: Callable[[dict], dict]):
+    """Sends `make_body(last_known, custom_resource)`. On a 409 Conflict the
+    resource is refetched once and the body is rebuilt against it.
+
+    An empty body is not sent; the last known resource is returned instead.
+    """
+    last_known = _get_last_known(reference)
+    desired = custom_resource
+    for attempt in range(2):
+        body = make_body(last_known, desired)
+        if not body and last_known is not None:
+            logging.debug(f"Resource {reference} is unchanged, skipping write")
+            return copy.deepcopy(last_known)
+        try:
+            return send(body)
+        except ApiException as ex:
+            if ex.status != HTTP_STATUS_CONFLICT or attempt > 0:
+                raise
+            logging.debug(f"Write to resource {reference} conflicted, refetching")
+            last_known = _get_resource_or_none(reference)
+            desired = _rebase(custom_resource, last_known)
+
+
+def _apply_custom_resource(reference: CustomResourceReference, custom_resource: dict, field_manager: str):
+    """Sends `custom_resource` as a server-side apply request.
+
+    The generated CustomObjectsApi only sends merge patches, so the request is
+    made through the ApiClient directly.
+    """
     _api_client = _get_k8s_api_client()
-    _api = client.CustomObjectsApi(_api_client)
 
+    path_params = {
+        'group': reference.group.lower(),
+        'version': reference.version.lower(),
+        'plural': reference.plural.lower(),
+        'name': reference.name.lower(),
+    }
     if reference.namespace is None:
-        return _api.replace_cluster_custom_object(
-            reference.group, reference.version, reference.plural, reference.name, custom_resource)
-    return _api.replace_namespaced_custom_object(
-        reference.group, reference.version, reference.namespace, reference.plural, reference.name, custom_resource)
+        path = '/apis/{group}/{version}/{plural}/{name}'
+    else:
+        path = '/apis/{group}/{version}/namespaces/{namespace}/{plural}/{name}'
+        path_params['namespace'] = reference.namespace.lower()
+
+    start = time.perf_counter()
+    error = False
+    try:
+        _response = _api_client.call_api(
+            path, 'PATCH',
+            path_params=path_params,
+            query_params=[('fieldManager', field_manager), ('force', True)],
+            header_params={'Accept': 'application/json', 'Content-Type': APPLY_PATCH_CONTENT_TYPE},
+            body=custom_resource,
+            response_type='object',
+            auth_settings=['BearerToken'],
+            _return_http_data_only=True,
+        )
+    except ApiException:
+        error = True
+        raise
+    finally:
+        _metrics.record("apply", reference.plural.lower(), time.perf_counter() - start, error)
+    _note_write(reference, _response)
+    return _response
+
 
 def delete_custom_resource(
-    reference: CustomResourceReference, wait_periods: int = 1, period_length: int = 5):
+    reference: CustomResourceReference, wait_periods: int = 1, period_length: int = 5,
+    wait_strategy: Optional[WaitStrategy] = None):
     """Delete custom resource from cluster and wait for it to be removed by the server
     for wait_periods * period_length seconds.
 
+    Args:
+        wait_strategy: schedule of the existence checks. Defaults to
+            `WaitStrategy.from_periods(wait_periods, period_length)`, which
+            checks immediately and then backs off.
+
     Returns:
         response, bool:
         response is APIserver response for the operation.
         bool is true if resource was removed from the server and false otherwise
     """
+    if wait_strategy is None:
+        wait_strategy = WaitStrategy.from_periods(wait_periods, period_length)
+
+    tracker = _DeletionTracker(reference)
+    _response = _request_custom_resource_deletion(reference)
+
+    deleted, resource = _wait_for_resource(reference, tracker, wait_strategy)
+    result = tracker.result(deleted, resource)
+    if not result.deleted:
+        logging.error(result.diagnostic)
+    return _response, result.deleted
+
+
+def _request_custom_resource_deletion(reference: CustomResourceReference):
+    """Issues the DELETE request for a custom resource without waiting for it
+    to be removed.
+    """
     _api_client = _get_k8s_api_client()
-    _api = client.CustomObjectsApi(_api_client)
+    _api = _metrics.instrument(client.CustomObjectsApi(_api_client))
 
     _response = None
     if reference.namespace is None:
@@ -215,84 +570,571 @@ def delete_custom_resource(
             reference.plural.lower(),
             reference.name.lower()
         )
-    _response = _api.delete_namespaced_custom_object(
-        reference.group.lower(),
-        reference.version.lower(),
-        reference.namespace.lower(),
-        reference.plural.lower(),
-        reference.name.lower()
-    )
+    else:
+        _response = _api.delete_namespaced_custom_object(
+            reference.group.lower(),
+            reference.version.lower(),
+            reference.namespace.lower(),
+            reference.plural.lower(),
+            reference.name.lower()
+        )
+    _note_write(reference, _response)
+    _forget(reference)
+    return _response
 
-    for _ in range(wait_periods):
-        sleep(period_length)
-        if not get_resource_exists(reference):
-            return _response, True
 
-    logging.error(
-        f"Wait for resource {reference} to be removed by server timed out")
-    return _response, False
+def _note_write(reference: CustomResourceReference, response: Optional[dict]):
+    """Registers a write with the informer for the resource kind, if any, so
+    that later cached reads wait until the informer has observed it, and
+    records the written version as the base of later minimal patches.
+    """
+    _remember(reference, response)
+    cache = _informer.informer_for(reference)
+    if cache is not None:
+        cache.note_write(reference.name, response)
 
 
 def get_resource(reference: CustomResourceReference):
     """Get the resource from a given reference.
 
+    The resource is read from the local cache when an informer is running for
+    its kind (see acktest.k8s.informer) and has observed this process's last
+    write to it, and from the API server otherwise.
+
     Returns:
         None or object: None if the resource does not exist in server, otherwise the
             custom object.
     """
+    cache = _informer.informer_for(reference)
+    if cache is not None and cache.wait_for_own_writes(reference.name):
+        cached = cache.get(reference.name)
+        if cached is None:
+            raise ApiException(status=404, reason="Not Found")
+        _remember(reference, cached)
+        return cached
+
     _api_client = _get_k8s_api_client()
-    _api = client.CustomObjectsApi(_api_client)
+    _api = _metrics.instrument(client.CustomObjectsApi(_api_client))
 
     if reference.namespace is None:
-        return _api.get_cluster_custom_object(
+        _response = _api.get_cluster_custom_object(
+            reference.group.lower(),
+            reference.version.lower(),
+            reference.plural.lower(),
+            reference.name.lower()
+        )
+    else:
+        _response = _api.get_namespaced_custom_object(
             reference.group.lower(),
             reference.version.lower(),
+            reference.namespace.lower(),
             reference.plural.lower(),
             reference.name.lower()
         )
+    _remember(reference, _response)
+    return _response
+
+
+def get_resource_exists(reference: CustomResourceReference) -> bool:
+    return get_resource_snapshot(reference).exists
+
+
+@dataclass(frozen=True)
+class ResourceSnapshot:
+    """Stores a single read of a custom resource from the cluster.
+
+    Condition, ARN and status lookups are all evaluated against the same
+    fetched object, so inspecting several fields of a resource costs one API
+    round-trip instead of one (or more) per field.
+    """
+
+    reference: CustomResourceReference
+    resource: Optional[dict] = None
+
+    @property
+    def exists(self) -> bool:
+        return self.resource is not None
+
+    @property
+    def status(self) -> Optional[dict]:
+        if self.resource is None:
+            return None
+        return self.resource.get('status', None)
+
+    @property
+    def is_consumed_by_controller(self) -> bool:
+        return self.status is not None
+
+    @property
+    def conditions(self) -> Optional[List[dict]]:
+        """The .status.conditions list, or None if the field is not set."""
+        if self.status is None:
+            return None
+        return self.status.get('conditions', None)
+
+    @property
+    def resource_version(self) -> Optional[str]:
+        return _resource_version(self.resource)
+
+    @property
+    def arn(self) -> Optional[str]:
+        if self.status is None:
+            return None
+        return get_resource_arn(self.resource)
+
+    def get_condition(self, condition_name: str) -> Optional[dict]:
+        return _find_condition(self.resource, condition_name)
+
+
+def get_resource_snapshot(reference: CustomResourceReference) -> ResourceSnapshot:
+    """Fetches the resource once and returns it as a `ResourceSnapshot`.
+
+    A resource that cannot be read (e.g. because it does not exist) results in
+    a snapshot whose `exists` property is False.
+    """
+    try:
+        return ResourceSnapshot(reference, get_resource(reference))
+    except ApiException as ex:
+        logging.debug(f"Could not get resource {reference}: {ex.status} {ex.reason}")
+        return ResourceSnapshot(reference, None)
+
+
+# Extra client-side read timeout on top of the server-side watch timeout, so a
+# silently dropped connection cannot outlive the caller's deadline.
+WATCH_CLIENT_TIMEOUT_GRACE_SECONDS = 5
+
+# HTTP status returned when a watch resourceVersion is too old to resume from
+HTTP_STATUS_GONE = 410
+
+
+def _get_resource_or_none(reference: CustomResourceReference) -> Optional[dict]:
+    try:
+        return get_resource(reference)
+    except ApiException as ex:
+        if ex.status == 404:
+            return None
+        raise
+
+
+def _resource_version(resource: Optional[dict]) -> Optional[str]:
+    if resource is None:
+        return None
+    return resource.get('metadata', {}).get('resourceVersion')
+
+
+def _stream_resource_events(reference: CustomResourceReference,
+                            resource_version: Optional[str],
+                            timeout_seconds: float) -> Iterator[dict]:
+    """Opens a watch on the single object named by `reference`.
+
+    The watch is scoped with a metadata.name field selector so the API server
+    only sends events for this object, and ends after `timeout_seconds`.
+    """
+    _api_client = _get_k8s_api_client()
+    _api = _metrics.instrument(client.CustomObjectsApi(_api_client))
+
+    server_timeout = max(1, int(timeout_seconds))
+    kwargs = {
+        "field_selector": f"metadata.name={reference.name.lower()}",
+        "timeout_seconds": server_timeout,
+        "_request_timeout": server_timeout + WATCH_CLIENT_TIMEOUT_GRACE_SECONDS,
+    }
+    if resource_version is not None:
+        kwargs["resource_version"] = resource_version
 
-    return _api.get_namespaced_custom_object(
+    if reference.namespace is None:
+        return watch.Watch().stream(
+            _api.list_cluster_custom_object,
+            reference.group.lower(),
+            reference.version.lower(),
+            reference.plural.lower(),
+            **kwargs
+        )
+    return watch.Watch().stream(
+        _api.list_namespaced_custom_object,
         reference.group.lower(),
         reference.version.lower(),
         reference.namespace.lower(),
         reference.plural.lower(),
-        reference.name.lower()
+        **kwargs
     )
 
 
-def get_resource_exists(reference: CustomResourceReference) -> bool:
-    try:
-        return get_resource(reference) is not None
-    except ApiException:
-        return False
+def _wait_for_resource(reference: CustomResourceReference,
+                       predicate: Callable[[Optional[dict]], bool],
+                       wait_strategy: WaitStrategy,
+                       initial: Optional[dict] = None) -> Tuple[bool, Optional[dict]]:
+    """Waits until `predicate` holds for the object referenced by `reference`.
+
+    The predicate is evaluated against the current object (None once it no
+    longer exists) and then against every version delivered by a watch, so
+    the wait returns as soon as the object changes into the desired state.
+    When an informer is running for the resource kind, its shared watch is
+    used instead of opening a new one.
+    The watch is resumed from the last seen resourceVersion when the
+    connection drops, and restarted from a fresh GET when the server reports
+    that version as expired (410 Gone). If the watch cannot be opened at all,
+    the object is polled on the schedule of `wait_strategy` instead.
+    Reconnections follow the same schedule, and the connection error is
+    raised if the server is still unreachable at the deadline.
+
+    Args:
+        wait_strategy: the deadline of the wait, the delay before the first
+            check and the polling schedule used when watching fails.
+        initial: The current object, if the caller already fetched it.
+
+    Returns:
+        bool, dict: Whether the predicate was satisfied before the timeout,
+            and the last observed version of the object.
+    """
+    attempts = wait_strategy.attempts()
+    if wait_strategy.initial_delay_seconds > 0:
+        initial = None
+    next(attempts)
+
+    cache = _informer.informer_for(reference)
+    if cache is not None and cache.wait_for_own_writes(reference.name):
+        return cache.wait_for(reference.name, predicate, attempts.remaining_seconds)
+
+    resource = initial if initial is not None else _get_resource_or_none(reference)
+    if predicate(resource):
+        return True, resource
+    resource_version = _resource_version(resource)
+    # Set while the last watch failed to connect
+    disconnected: Optional[HTTPError] = None
+
+    while True:
+        remaining = attempts.remaining_seconds
+        if remaining <= 0:
+            if disconnected is not None:
+                raise disconnected
+            return False, resource
+
+        try:
+            for event in _stream_resource_events(reference, resource_version, remaining):
+                obj = event['raw_object']
+                resource_version = _resource_version(obj) or resource_version
+                if event['type'] == 'DELETED':
+                    resource = None
+                elif event['type'] in ('ADDED', 'MODIFIED'):
+                    resource = obj
+                else:
+                    continue
+
+                if predicate(resource):
+                    return True, resource
+                if attempts.remaining_seconds <= 0:
+                    break
+            disconnected = None
+        except ApiException as ex:
+            disconnected = None
+            if ex.status != HTTP_STATUS_GONE:
+                logging.warning(f"Watch on resource {reference} failed ({ex.status}: {ex.reason}), falling back to polling")
+                if next(attempts, None) is None:
+                    return False, resource
+            # Re-list the current state and resume watching from there
+            resource = _get_resource_or_none(reference)
+            if predicate(resource):
+                return True, resource
+            resource_version = _resource_version(resource)
+        except HTTPError as ex:
+            # Also raised while the API server is unreachable, so back off
+            # like a failed watch rather than reconnecting immediately
+            logging.debug(f"Watch on resource {reference} disconnected ({ex}), resuming from {resource_version}")
+            disconnected = ex
+            if next(attempts, None) is None:
+                raise
 
 
 def wait_resource_consumed_by_controller(
-        reference: CustomResourceReference, wait_periods: int = 3, period_length: int = 10):
-    if not get_resource_exists(reference):
-        logging.error(f"Resource {reference} does not exist")
-        return None
+        reference: CustomResourceReference, wait_periods: int = 3, period_length: int = 10,
+        wait_strategy: Optional[WaitStrategy] = None):
+    """Waits for the controller to set the .status field of the resource.
+
+    Args:
+        wait_strategy: schedule of the checks. Defaults to
+            `WaitStrategy.from_periods(wait_periods, period_length)`, which
+            checks immediately and then backs off.
 
-    for _ in range(wait_periods):
-        resource = get_resource(reference)
+    Returns:
+        None or object: the resource once consumed, or None if it does not
+            exist or the wait timed out.
+    """
+    if wait_strategy is None:
+        wait_strategy = WaitStrategy.from_periods(wait_periods, period_length)
 
-        if 'status' in resource:
-            return resource
+    for attempt in wait_strategy.attempts():
+        snapshot = get_resource_snapshot(reference)
+        if not snapshot.exists and attempt == 1:
+            logging.error(f"Resource {reference} does not exist")
+            return None
 
-        sleep(period_length)
+        if snapshot.is_consumed_by_controller:
+            return snapshot.resource
 
     logging.error(
         f"Wait for resource {reference} to be consumed by controller timed out")
     return None
 
 
+@dataclass
+class DeletionResult:
+    """Outcome of waiting for a custom resource to be removed from the server.
+
+    All durations are measured from the start of the wait (for
+    `delete_custom_resource`, from just before the DELETE request).
+
+    Attributes:
+        deleted: whether the resource was removed before the deadline.
+        elapsed_seconds: duration of the wait.
+        marked_for_deletion_seconds: when .metadata.deletionTimestamp was
+            first observed, or None if it never was.
+        finalizers_removed: the time at which each finalizer was observed to
+            be removed from the resource.
+        remaining_finalizers: finalizers still set on the resource when the
+            wait ended (empty once deleted).
+        resource: last observed version of the resource, None once deleted.
+    """
+
+    reference: CustomResourceReference
+    deleted: bool
+    elapsed_seconds: float
+    marked_for_deletion_seconds: Optional[float] = None
+    finalizers_removed: Dict[str, float] = field(default_factory=dict)
+    remaining_finalizers: List[str] = field(default_factory=list)
+    resource: Optional[dict] = None
+
+    @property
+    def diagnostic(self) -> str:
+        """Human readable summary of the deletion phases, intended for
+        timeout error messages."""
+        if self.deleted:
+            summary = f"Resource {self.reference} was removed by server after {self.elapsed_seconds:.1f}s"
+        else:
+            summary = f"Wait for resource {self.reference} to be removed by server timed out after {self.elapsed_seconds:.1f}s"
+
+        details = []
+        if self.marked_for_deletion_seconds is None:
+            if not self.deleted:
+                details.append("it was never marked for deletion (no deletionTimestamp observed)")
+        else:
+            details.append(f"marked for deletion after {self.marked_for_deletion_seconds:.1f}s")
+        for finalizer, seconds in self.finalizers_removed.items():
+            details.append(f"finalizer {finalizer} removed after {seconds:.1f}s")
+        if self.remaining_finalizers:
+            details.append(f"remaining finalizers: {', '.join(self.remaining_finalizers)}")
+        for condition in _resource_conditions(self.resource):
+            if condition.get('status') == 'True' and condition.get('message'):
+                details.append(f"condition {condition.get('type')}: {condition.get('message')}")
+
+        if not details:
+            return summary
+        return f"{summary}; " + "; ".join(details)
+
+
+def _resource_conditions(resource: Optional[dict]) -> List[dict]:
+    if resource is None:
+        return []
+    return resource.get('status', {}).get('conditions', None) or []
+
+
+class _DeletionTracker:
+    """Predicate for `_wait_for_resource` that holds once the resource is
+    gone, recording the deletion phases of every version it is shown."""
+
+    def __init__(self, reference: CustomResourceReference):
+        self.reference = reference
+        self.started_at = time.monotonic()
+        self.marked_for_deletion_seconds: Optional[float] = None
+        self.finalizers_removed: Dict[str, float] = {}
+        self.finalizers: List[str] = []
+
+    def __call__(self, resource: Optional[dict]) -> bool:
+        elapsed = time.monotonic() - self.started_at
+        if resource is None:
+            for finalizer in self.finalizers:
+                self.finalizers_removed.setdefault(finalizer, elapsed)
+            self.finalizers = []
+            return True
+
+        metadata = resource.get('metadata', {})
+        if metadata.get('deletionTimestamp') and self.marked_for_deletion_seconds is None:
+            self.marked_for_deletion_seconds = elapsed
+        finalizers = list(metadata.get('finalizers', None) or [])
+        for finalizer in self.finalizers:
+            if finalizer not in finalizers:
+                self.finalizers_removed.setdefault(finalizer, elapsed)
+        self.finalizers = finalizers
+        return False
+
+    def result(self, deleted: bool, resource: Optional[dict]) -> DeletionResult:
+        return DeletionResult(
+            reference=self.reference,
+            deleted=deleted,
+            elapsed_seconds=time.monotonic() - self.started_at,
+            marked_for_deletion_seconds=self.marked_for_deletion_seconds,
+            finalizers_removed=dict(self.finalizers_removed),
+            remaining_finalizers=list(self.finalizers),
+            resource=resource,
+        )
+
+
+def wait_resource_deleted(reference: CustomResourceReference,
+                          wait_periods: int = 1,
+                          period_length: int = 5,
+                          wait_strategy: Optional[WaitStrategy] = None) -> DeletionResult:
+    """Waits for the resource to be removed from the server.
+
+    The resource is watched, so this returns as soon as the DELETED event is
+    received. Every intermediate version is inspected to record when the
+    resource was marked for deletion and when each of its finalizers was
+    removed, so a slowly draining finalizer can be told apart from a stuck
+    one.
+
+    Returns:
+        DeletionResult: whether the resource was deleted, the timing of each
+            deletion phase and, on timeout, the finalizers still set.
+    """
+    if wait_strategy is None:
+        wait_strategy = WaitStrategy.from_periods(wait_periods, period_length)
+
+    tracker = _DeletionTracker(reference)
+    deleted, resource = _wait_for_resource(reference, tracker, wait_strategy)
+    return tracker.result(deleted, resource)
+
+
+# Default number of requests issued in parallel by the bulk helpers
+BULK_MAX_CONCURRENCY = 10
+
+
+@dataclass
+class BulkResult:
+    """Stores the outcome of a single item of a bulk operation."""
+
+    reference: CustomResourceReference
+    response: Any = None
+    error: Optional[Exception] = None
+    # Only set by `delete_custom_resources`: whether the resource was removed
+    # from the server before the wait timed out
+    deleted: Optional[bool] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and self.deleted is not False
+
+
+def _run_bulk(func: Callable, items: List[Tuple], max_concurrency: int) -> List[BulkResult]:
+    """Calls `func(*item)` for every item with at most `max_concurrency`
+    requests in flight, and collects a `BulkResult` per item, in order.
+    """
+    def _call(item: Tuple) -> BulkResult:
+        try:
+            return BulkResult(item[0], response=func(*item))
+        except Exception as ex:
+            logging.error(f"Bulk {func.__name__} failed for resource {item[0]}: {ex}")
+            return BulkResult(item[0], error=ex)
+
+    if not items:
+        return []
+    with ThreadPoolExecutor(max_workers=max(1, min(max_concurrency, len(items)))) as executor:
+        return list(executor.map(_call, items))
+
+
+def create_custom_resources(
+        items: Iterable[Tuple[CustomResourceReference, dict]],
+        max_concurrency: int = BULK_MAX_CONCURRENCY) -> List[BulkResult]:
+    """Creates a batch of custom resources in parallel.
+
+    Args:
+        items: (reference, custom resource body) pairs to create.
+        max_concurrency: maximum number of create requests in flight.
+
+    Returns:
+        List[BulkResult]: one result per item, in the order of `items`. Failed
+            requests are reported in `BulkResult.error` instead of raising.
+    """
+    return _run_bulk(create_custom_resource, list(items), max_concurrency)
+
+
+def patch_custom_resources(
+        items: Iterable[Tuple[CustomResourceReference, dict]],
+        max_concurrency: int = BULK_MAX_CONCURRENCY) -> List[BulkResult]:
+    """Patches a batch of custom resources in parallel.
+
+    Args:
+        items: (reference, patch body) pairs to apply.
+        max_concurrency: maximum number of patch requests in flight.
+
+    Returns:
+        List[BulkResult]: one result per item, in the order of `items`. Failed
+            requests are reported in `BulkResult.error` instead of raising.
+    """
+    return _run_bulk(patch_custom_resource, list(items), max_concurrency)
+
+
+def delete_custom_resources(
+        references: Iterable[CustomResourceReference],
+        max_concurrency: int = BULK_MAX_CONCURRENCY,
+        wait_periods: int = 1,
+        period_length: int = 5,
+        wait_strategy: Optional[WaitStrategy] = None) -> List[BulkResult]:
+    """Deletes a batch of custom resources in parallel and waits up to
+    wait_periods * period_length seconds for all of them to be removed.
+
+    Removal is observed through the running informer of the resource kind,
+    if any, rather than by polling each resource. Resources of kinds without
+    an informer are each waited for with their own watch, within the same
+    deadline.
+
+    Args:
+        wait_strategy: overrides the wait_periods * period_length deadline.
+
+    Returns:
+        List[BulkResult]: one result per reference, in order. `deleted` is
+            True for every resource removed from the server in time.
+    """
+    if wait_strategy is None:
+        wait_strategy = WaitStrategy.from_periods(wait_periods, period_length)
+    references = list(references)
+    results = _run_bulk(
+        _request_custom_resource_deletion,
+        [(reference,) for reference in references],
+        max_concurrency,
+    )
+
+    deadline = time.monotonic() + wait_strategy.timeout_seconds
+    for result in results:
+        if result.error is not None:
+            result.deleted = False
+            continue
+        remaining = max(0, deadline - time.monotonic())
+        cache = _informer.informer_for(result.reference)
+        if cache is not None:
+            result.deleted, _ = cache.wait_for(result.reference.name, lambda obj: obj is None, remaining)
+        else:
+            result.deleted, _ = _wait_for_resource(
+                result.reference,
+                lambda obj: obj is None,
+                replace(wait_strategy, timeout_seconds=remaining, initial_delay_seconds=0),
+            )
+        if not result.deleted:
+            logging.error(
+                f"Wait for resource {result.reference} to be removed by server timed out")
+
+    return results
+
+
 def get_resource_arn(resource: object) -> Union[None, str]:
     """Get the .status.ackResourceMetadata.arn value from a given resource.
 
+    `resource` may also be a ResourceSnapshot.
+
     Returns:
         None or string: None if the status field doesn't exist, otherwise the
             field value.
     """
+    if isinstance(resource, ResourceSnapshot):
+        resource = resource.resource
     if 'ackResourceMetadata' in resource['status'] and \
         'arn' in resource['status']['ackResourceMetadata']:
         return resource['status']['ackResourceMetadata']['arn']
@@ -320,7 +1162,7 @@ def create_opaque_secret(namespace: str,
     body.metadata = {'name': name}
     body.type = 'Opaque'
     body = _api_client.sanitize_for_serialization(body)
-    client.CoreV1Api(_api_client).create_namespaced_secret(namespace.lower(),body)
+    _metrics.instrument(client.CoreV1Api(_api_client)).create_namespaced_secret(namespace.lower(),body)
 
 
 def delete_secret(namespace: str,
@@ -333,7 +1175,7 @@ def delete_secret(namespace: str,
     :return: None
     """
     _api_client = _get_k8s_api_client()
-    client.CoreV1Api(_api_client).delete_namespaced_secret(name.lower(), namespace.lower())
+    _metrics.instrument(client.CoreV1Api(_api_client)).delete_namespaced_secret(name.lower(), namespace.lower())
 
 def parse_condition_last_transition_time(condition) -> Optional[datetime]:
     """Parses a condition's lastTransitionTime into a timezone-aware datetime.
@@ -349,14 +1191,31 @@ def parse_condition_last_transition_time(condition) -> Optional[datetime]:
     return datetime.fromisoformat(ts.replace("Z", "+00:00"))
 
 
+def _find_condition(resource: Optional[dict], condition_name: str) -> Optional[dict]:
+    """Returns the condition of type `condition_name` from .status.conditions
+    of an already fetched resource, or None if it is not present.
+    """
+    if resource is None:
+        return None
+    for condition in resource.get('status', {}).get('conditions', None) or []:
+        if condition['type'] == condition_name:
+            return condition
+    return None
+
+
 def wait_on_condition(reference: CustomResourceReference,
                       condition_name: str,
                       desired_condition_status: str,
                       wait_periods: int = 2,
-                      period_length: int = 60) -> bool:
+                      period_length: int = 60,
+                      wait_strategy: Optional[WaitStrategy] = None) -> bool:
     """
     Waits for the specified condition in .status.conditions to reach the desired value.
 
+    The resource is watched rather than polled, so this returns as soon as
+    the condition changes. wait_periods * period_length is the overall
+    deadline of the wait, unless a `wait_strategy` is given.
+
     Precondition:
         resource must be consumed by the controller (i.e. have a .status field)
 
@@ -364,27 +1223,15 @@ def wait_on_condition(reference: CustomResourceReference,
         False if the resource doesn't exist, have .status.conditions at all, have the requested
             condition type, or if the wait times out. True otherwise.
     """
-
-    if not get_resource_exists(reference):
-        logging.error(f"Resource {reference} does not exist")
-        return False
-
-    desired_condition = None
-    for i in range(wait_periods):
-        logging.debug(f"Waiting on condition {condition_name} to reach {desired_condition_status} for resource {reference} ({i})")
-
-        desired_condition = get_resource_condition(reference, condition_name)
-        if desired_condition is not None and desired_condition['status'] == desired_condition_status:
-            logging.info(f"Condition {condition_name} has status {desired_condition_status}, continuing...")
-            return True
-
-        sleep(period_length)
-
-    if not desired_condition:
-        logging.error(f"Resource {reference} does not have a condition of type {condition_name}.")
-    else:
-        logging.error(f"Wait for condition {condition_name} to reach status {desired_condition_status} timed out. Condition has message '{desired_condition['message']}'")
-    return False
+    return wait_on_condition_after(
+        reference,
+        condition_name,
+        desired_condition_status,
+        last_transition_after=None,
+        wait_periods=wait_periods,
+        period_length=period_length,
+        wait_strategy=wait_strategy,
+    )
 
 
 def wait_on_condition_after(reference: CustomResourceReference,
@@ -392,7 +1239,8 @@ def wait_on_condition_after(reference: CustomResourceReference,
                             desired_condition_status: str,
                             last_transition_after: Optional[datetime] = None,
                             wait_periods: int = 2,
-                            period_length: int = 60) -> bool:
+                            period_length: int = 60,
+                            wait_strategy: Optional[WaitStrategy] = None) -> bool:
     """
     Waits for the specified condition to reach the desired value via a reconcile
     that happened after `last_transition_after`.
@@ -414,65 +1262,95 @@ def wait_on_condition_after(reference: CustomResourceReference,
             patch (see condition.get_synced_last_transition_time) and pass it
             here to wait for a fresh reconcile. When None the timestamp check is
             skipped, making this behave like `wait_on_condition`.
+        wait_strategy: the deadline and initial delay of the wait. Defaults
+            to `WaitStrategy.from_periods(wait_periods, period_length)`.
 
     Returns:
         False if the resource doesn't exist, have .status.conditions at all, have the requested
             condition type, or if the wait times out. True otherwise.
     """
-
-    if not get_resource_exists(reference):
+    resource = _get_resource_or_none(reference)
+    if resource is None:
         logging.error(f"Resource {reference} does not exist")
         return False
 
-    desired_condition = None
-    for i in range(wait_periods):
-        logging.debug(f"Waiting on condition {condition_name} to reach {desired_condition_status} for resource {reference} ({i})")
+    def _condition_met(resource: Optional[dict]) -> bool:
+        desired_condition = _find_condition(resource, condition_name)
+        if desired_condition is None or desired_condition['status'] != desired_condition_status:
+            return False
+        if last_transition_after is None:
+            logging.info(f"Condition {condition_name} has status {desired_condition_status}, continuing...")
+            return True
 
-        desired_condition = get_resource_condition(reference, condition_name)
-        if desired_condition is not None and desired_condition['status'] == desired_condition_status:
-            if last_transition_after is None:
-                logging.info(f"Condition {condition_name} has status {desired_condition_status}, continuing...")
-                return True
+        last_transition = parse_condition_last_transition_time(desired_condition)
+        if last_transition is not None and last_transition > last_transition_after:
+            logging.info(f"Condition {condition_name} has status {desired_condition_status} with a fresh lastTransitionTime ({last_transition}), continuing...")
+            return True
+        return False
 
-            last_transition = parse_condition_last_transition_time(desired_condition)
-            if last_transition is not None and last_transition > last_transition_after:
-                logging.info(f"Condition {condition_name} has status {desired_condition_status} with a fresh lastTransitionTime ({last_transition}), continuing...")
-                return True
+    logging.debug(f"Waiting on condition {condition_name} to reach {desired_condition_status} for resource {reference}")
+    if wait_strategy is None:
+        wait_strategy = WaitStrategy.from_periods(wait_periods, period_length)
 
-        sleep(period_length)
+    met, resource = _wait_for_resource(
+        reference,
+        _condition_met,
+        wait_strategy,
+        initial=resource,
+    )
+    if met:
+        return True
 
+    desired_condition = _find_condition(resource, condition_name)
     if not desired_condition:
         logging.error(f"Resource {reference} does not have a condition of type {condition_name}.")
     else:
-        logging.error(f"Wait for condition {condition_name} to reach status {desired_condition_status} timed out. Condition has message '{desired_condition['message']}'")
+        logging.error(f"Wait for condition {condition_name} to reach status {desired_condition_status} timed out. Condition has message '{desired_condition.get('message')}'")
     return False
 
-def get_resource_condition(reference: CustomResourceReference, condition_name: str):
+def as_snapshot(reference: Union[CustomResourceReference, ResourceSnapshot]) -> ResourceSnapshot:
+    """Returns `reference` if it already is a snapshot, and fetches one otherwise."""
+    if isinstance(reference, ResourceSnapshot):
+        return reference
+    return get_resource_snapshot(reference)
+
+
+def get_resource_condition(reference: Union[CustomResourceReference, ResourceSnapshot],
+                           condition_name: str):
     """
     Returns the required condition from .status.conditions
 
     Precondition:
         resource must exist in the cluster
 
+    Args:
+        reference: the resource to fetch, or an already fetched snapshot of it.
+
     Returns:
         condition json if it exists. None otherwise
     """
-    if not get_resource_exists(reference):
-        logging.error(f"Resource {reference} does not exist")
-        return None
+    return get_snapshot_condition(as_snapshot(reference), condition_name)
 
-    resource = get_resource(reference)
-    if 'status' not in resource or 'conditions' not in resource['status']:
-        logging.error(f"Resource {reference} does not have a .status.conditions field.")
+
+def get_snapshot_condition(snapshot: ResourceSnapshot, condition_name: str):
+    """
+    Returns the required condition from .status.conditions of an already
+    fetched resource snapshot, logging why it could not be found.
+
+    Returns:
+        condition json if it exists. None otherwise
+    """
+    if not snapshot.exists:
+        logging.error(f"Resource {snapshot.reference} does not exist")
         return None
 
-    for condition in resource['status']['conditions']:
-        if condition['type'] == condition_name:
-            return condition
+    if snapshot.conditions is None:
+        logging.error(f"Resource {snapshot.reference} does not have a .status.conditions field.")
+        return None
 
-    return None
+    return snapshot.get_condition(condition_name)
 
-def assert_condition_state_message(reference: CustomResourceReference,
+def assert_condition_state_message(reference: Union[CustomResourceReference, ResourceSnapshot],
                                    condition_name: str,
                                    desired_condition_status: str,
                                    desired_condition_message: Union[None, str]):
@@ -483,18 +1361,34 @@ def assert_condition_state_message(reference: CustomResourceReference,
     Returns:
         bool: True if condition exists and both the status and message match the desired values
     """
-    condition = get_resource_condition(reference, condition_name)
+    failure = condition_state_message_failure(
+        as_snapshot(reference), condition_name, desired_condition_status, desired_condition_message)
+    if failure is None:
+        logging.info(f"Condition {condition_name} has status {desired_condition_status} and message {desired_condition_message}, continuing...")
+        return True
+
+    logging.error(failure)
+    return False
+
+
+def condition_state_message_failure(snapshot: ResourceSnapshot,
+                                    condition_name: str,
+                                    desired_condition_status: str,
+                                    desired_condition_message: Union[None, str]) -> Optional[str]:
+    """Checks the state and message of a condition of a snapshot.
+
+    Returns:
+        None if the condition matches, otherwise a description of the mismatch.
+    """
+    condition = get_snapshot_condition(snapshot, condition_name)
     # Ensure the status existed
     if condition is None:
-        logging.error(f"Resource {reference} does not have a condition of type {condition_name}")
-        return False
+        return f"Resource {snapshot.reference} does not have a condition of type {condition_name}"
 
     current_condition_status = condition.get('status', None)
     current_condition_message = condition.get('message', None)
     if current_condition_status == desired_condition_status and current_condition_message == desired_condition_message:
-        logging.info(f"Condition {condition_name} has status {desired_condition_status} and message {desired_condition_message}, continuing...")
-        return True
+        return None
 
-    logging.error(f"Resource {reference} has {condition_name} set {current_condition_status}, expected {desired_condition_status}; with message"
-                    f" {current_condition_message}, expected {desired_condition_message}")
-    return False
+    return (f"Resource {snapshot.reference} has {condition_name} set {current_condition_status}, expected {desired_condition_status}; with message"
+            f" {current_condition_message}, expected {desired_condition_message}")
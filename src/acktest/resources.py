@@ -16,43 +16,265 @@ PyTest resources are stored within the `resources` directory of each service
 and contain YAML files used as templates for creating test fixtures.
 """
 
+import copy
+import functools
+import hashlib
+import logging
+import os
+import re
 import string
 import random
+import threading
 import yaml
+from collections import OrderedDict
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, Iterable, List, Optional, Pattern, Tuple
+
+
+# Prefer the libyaml parser, which is an order of magnitude faster
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+# Matches placeholders left in a template after substitution
+UNREPLACED_PLACEHOLDER_PATTERN = re.compile(r"\$([A-Z][A-Z0-9_]*)")
+
+# Maximum number of parsed templates kept in memory
+PARSED_TEMPLATE_CACHE_SIZE = 256
+
+
+class UnreplacedPlaceholderError(ValueError):
+    """Raised by strict loads when a resource template still contains
+    placeholders after all replacements were applied."""
+
+    def __init__(self, path: Path, placeholders: Iterable[str]):
+        self.path = path
+        self.placeholders = sorted(set(placeholders))
+        super().__init__(
+            f"Resource file {path} has unreplaced placeholders: "
+            + ", ".join(f"${p}" for p in self.placeholders))
+
+
+@dataclass(frozen=True)
+class _Template:
+    contents: str
+    mtime_ns: int
+    size: int
+
+
+_templates: Dict[Path, _Template] = {}
+_parsed: "OrderedDict[Tuple, Any]" = OrderedDict()
+_template_cache_lock = threading.Lock()
 
-from .aws import identity
 
 def default_placeholder_values():
     """ Default placeholder values for loading any resource file.
     """
+    # Imported here, so that loading resources does not import boto3 until
+    # these values are needed
+    from .aws import identity
+
     return {
         "AWS_ACCOUNT_ID": identity.get_account_id(),
         "AWS_REGION": identity.get_region(),
     }
 
 def load_resource_file(resources_directory: Path, resource_name: str,
-                       additional_replacements: Dict[str, Any] = {}) -> dict:
-    with open(resources_directory / f"{resource_name}.yaml", "r") as stream:
-        resource_contents = stream.read()
-        injected_contents = _replace_placeholder_values(
-            resource_contents, default_placeholder_values())
-        injected_contents = _replace_placeholder_values(
-            injected_contents, additional_replacements)
-        return yaml.safe_load(injected_contents)
+                       additional_replacements: Dict[str, Any] = {},
+                       strict: bool = False) -> dict:
+    """Loads a YAML resource template, replacing each `$PLACEHOLDER` with its
+    value from `default_placeholder_values()` or `additional_replacements`
+    (the defaults take precedence).
+
+    Template files and parsed results are cached, keyed by the file's
+    modification time, so repeated loads neither re-read nor re-parse the
+    file. Every call returns a new copy of the parsed structure.
+
+    `$PLACEHOLDER` tokens without a replacement value are left in place and
+    logged as a warning, as templates may contain literal `$` tokens (e.g.
+    Lambda's `$LATEST`, shell snippets or IAM policy variables).
+
+    Args:
+        strict: raise instead of warning when placeholders remain.
+
+    Raises:
+        UnreplacedPlaceholderError: if placeholders remain after substitution
+            and `strict` is True.
+    """
+    path = resources_directory / f"{resource_name}.yaml"
+    template = _get_template(path)
+
+    replacements = {k: str(v) for k, v in additional_replacements.items()}
+    replacements.update((k, str(v)) for k, v in default_placeholder_values().items())
+    key = (path, template.mtime_ns, tuple(sorted(replacements.items())), strict)
+
+    with _template_cache_lock:
+        parsed = _parsed.get(key)
+        if parsed is not None:
+            _parsed.move_to_end(key)
+            return copy.deepcopy(parsed)
+
+    injected_contents = _substitute(template.contents, replacements)
+    unreplaced = UNREPLACED_PLACEHOLDER_PATTERN.findall(injected_contents)
+    if unreplaced:
+        error = UnreplacedPlaceholderError(path, unreplaced)
+        if strict:
+            raise error
+        logging.warning(str(error))
+    parsed = yaml.load(injected_contents, Loader=_YAML_LOADER)
+
+    with _template_cache_lock:
+        _parsed[key] = parsed
+        while len(_parsed) > PARSED_TEMPLATE_CACHE_SIZE:
+            _parsed.popitem(last=False)
+    return copy.deepcopy(parsed)
+
+
+def _get_template(path: Path) -> _Template:
+    stat = os.stat(path)
+    with _template_cache_lock:
+        template = _templates.get(path)
+    if template is not None and template.mtime_ns == stat.st_mtime_ns and template.size == stat.st_size:
+        return template
+
+    with open(path, "r") as stream:
+        template = _Template(stream.read(), stat.st_mtime_ns, stat.st_size)
+    with _template_cache_lock:
+        _templates[path] = template
+    return template
+
+
+@functools.lru_cache(maxsize=128)
+def _placeholder_pattern(placeholders: Tuple[str, ...]) -> Pattern:
+    # Longest first, so a placeholder is never replaced by a shorter one it
+    # starts with (e.g. $BUCKET_NAME by $BUCKET)
+    alternatives = sorted(placeholders, key=len, reverse=True)
+    return re.compile(r"\$(" + "|".join(re.escape(p) for p in alternatives) + ")")
+
+
+def _substitute(in_str: str, replacements: Dict[str, str]) -> str:
+    """Replaces every `$PLACEHOLDER` in a single pass over `in_str`."""
+    if not replacements:
+        return in_str
+    pattern = _placeholder_pattern(tuple(sorted(replacements)))
+    return pattern.sub(lambda m: replacements[m.group(1)], in_str)
 
 
 def _replace_placeholder_values(
-        in_str: str, replacement_dictionary: Dict[str, Any] = default_placeholder_values()) -> str:
-    for placeholder, replacement in replacement_dictionary.items():
-        in_str = in_str.replace(f"${placeholder}", replacement)
-    return in_str
+        in_str: str, replacement_dictionary: Optional[Dict[str, Any]] = None) -> str:
+    if replacement_dictionary is None:
+        replacement_dictionary = default_placeholder_values()
+    return _substitute(in_str, {k: str(v) for k, v in replacement_dictionary.items()})
+
+
+# Environment variable naming the test run. All pytest-xdist workers of a run
+# share it; defaults to the xdist test run UID, or a random ID
+RUN_ID_ENV_VAR = "ACKTEST_RUN_ID"
+
+# Length of the run ID and shard ID embedded into generated names
+RUN_ID_LENGTH = 6
+SHARD_ID_LENGTH = 2
+
+# Minimum number of random characters kept after the session tag. Names too
+# short to hold both fall back to a purely random suffix.
+MIN_RANDOM_SUFFIX_LENGTH = 4
+
+_NAME_ALPHABET = string.ascii_lowercase + string.digits
+_BASE36_DIGITS = string.digits + string.ascii_lowercase
+
+# Attempts at generating a name not issued before, after which a duplicate is
+# returned (only possible with very short random suffixes)
+MAX_NAME_ATTEMPTS = 100
+
+_issued_names: Dict[str, None] = {}
+_issued_names_lock = threading.Lock()
+
+
+def _to_base36(value: int, length: int) -> str:
+    digits = []
+    for _ in range(length):
+        value, digit = divmod(value, 36)
+        digits.append(_BASE36_DIGITS[digit])
+    return "".join(reversed(digits))
+
+
+@functools.lru_cache(maxsize=None)
+def _run_id_for(source: str) -> str:
+    digest = int.from_bytes(hashlib.sha256(source.encode()).digest(), "big")
+    return _to_base36(digest, RUN_ID_LENGTH)
+
+
+def run_id() -> str:
+    """Returns the short ID of the current test run, shared by all of its
+    pytest-xdist workers and embedded into names generated by
+    `random_suffix_name`."""
+    source = os.environ.get(RUN_ID_ENV_VAR) or os.environ.get("PYTEST_XDIST_TESTRUNUID")
+    if not source:
+        # Exported so that subprocesses started by this run share the ID
+        source = os.environ[RUN_ID_ENV_VAR] = "".join(
+            random.choice(_NAME_ALPHABET) for _ in range(16))
+    return _run_id_for(source)
+
+
+def shard_id() -> str:
+    """Returns the ID of the current pytest-xdist worker (e.g. "03" for gw3),
+    or "00" outside of xdist."""
+    worker = os.environ.get("PYTEST_XDIST_WORKER", "")
+    number = int(worker[2:]) if worker.startswith("gw") and worker[2:].isdigit() else 0
+    return _to_base36(number, SHARD_ID_LENGTH)
+
+
+def session_tag() -> str:
+    """Returns the run and shard ID embedded into generated names. Every name
+    generated by this worker contains it."""
+    return f"{run_id()}{shard_id()}"
+
+
+def session_tags() -> Dict[str, str]:
+    """Returns AWS resource tags identifying the current run and shard, for
+    resources whose names cannot hold the session tag."""
+    return {
+        "acktest.run-id": run_id(),
+        "acktest.shard-id": shard_id(),
+    }
+
+
+def issued_names() -> List[str]:
+    """Returns every name generated by `random_suffix_name` in this process,
+    in the order they were issued."""
+    with _issued_names_lock:
+        return list(_issued_names)
+
+
+def is_run_name(name: str, run: Optional[str] = None) -> bool:
+    """Returns whether `name` was generated by `random_suffix_name` during the
+    run `run` (by default, the current run)."""
+    return (run or run_id()) in name
 
 
 def random_suffix_name(resource_name: str, max_length: int,
                        delimiter: str = "-") -> str:
+    """Returns `resource_name` followed by `delimiter` and a suffix which
+    pads the name to `max_length` characters.
+
+    The suffix starts with the session tag (run ID and xdist shard ID) when
+    there is room for it, so the resources of a run can be found by name.
+    Names are unique within the process and, through the shard ID, across
+    the workers of a run.
+    """
     rand_length = max_length - len(resource_name) - len(delimiter)
-    rand = "".join(random.choice(string.ascii_lowercase + string.digits)
-                   for _ in range(rand_length))
-    return f"{resource_name}{delimiter}{rand}"
+    tag = session_tag()
+    if rand_length - len(tag) >= MIN_RANDOM_SUFFIX_LENGTH:
+        rand_length -= len(tag)
+    else:
+        tag = ""
+
+    with _issued_names_lock:
+        for _ in range(MAX_NAME_ATTEMPTS):
+            rand = "".join(random.choice(_NAME_ALPHABET) for _ in range(rand_length))
+            name = f"{resource_name}{delimiter}{tag}{rand}"
+            if name not in _issued_names:
+                break
+        else:
+            logging.warning(f"Could not generate a unique name for {resource_name} in {max_length} characters")
+        _issued_names[name] = None
+        return name
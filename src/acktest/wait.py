@@ -0,0 +1,137 @@
+# Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may
+# not use this file except in compliance with the License. A copy of the
+# License is located at
+#
+#	 http://aws.amazon.com/apache2.0/
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+"""Configurable wait strategies shared by the acktest waiters.
+
+A `WaitStrategy` describes when a waiter checks its condition: an optional
+initial delay, then exponentially growing (and jittered) intervals between
+checks, all bounded by an overall deadline.
+
+Usage:
+    from acktest.wait import WaitStrategy
+
+    strategy = WaitStrategy(timeout_seconds=300, interval_seconds=2, max_interval_seconds=30)
+    for _ in strategy.attempts():
+        if resource_is_ready():
+            break
+    else:
+        raise TimeoutError()
+"""
+
+from __future__ import annotations
+
+import random
+import time
+from dataclasses import dataclass
+from typing import Iterator, Optional
+
+
+@dataclass(frozen=True)
+class WaitStrategy:
+    """Describes the schedule of checks made by a waiter.
+
+    Attributes:
+        timeout_seconds: overall deadline, measured from the start of the wait.
+        initial_delay_seconds: time to wait before the first check.
+        interval_seconds: time between the first and second check.
+        backoff_factor: multiplier applied to the interval after every check.
+        max_interval_seconds: upper bound of the interval between checks.
+        jitter: fraction by which each interval is randomly shortened or
+            lengthened, to spread out checks made by concurrent waiters.
+    """
+
+    timeout_seconds: float
+    initial_delay_seconds: float = 0
+    interval_seconds: float = 1
+    backoff_factor: float = 2
+    max_interval_seconds: float = 30
+    jitter: float = 0.1
+
+    @classmethod
+    def from_periods(cls, wait_periods: int, period_length: float) -> WaitStrategy:
+        """Returns the strategy equivalent to the legacy `wait_periods` and
+        `period_length` waiter arguments.
+
+        The total budget (wait_periods * period_length) is unchanged, but the
+        first check is made immediately and the interval backs off from one
+        second up to `period_length`, so fast controllers are not penalized
+        by a full period per check.
+        """
+        return cls(
+            timeout_seconds=wait_periods * period_length,
+            interval_seconds=min(1, period_length),
+            max_interval_seconds=period_length,
+        )
+
+    def intervals(self) -> Iterator[float]:
+        """Yields the (unbounded) sequence of intervals between checks."""
+        interval = self.interval_seconds
+        while True:
+            if self.jitter:
+                yield max(0, interval * random.uniform(1 - self.jitter, 1 + self.jitter))
+            else:
+                yield interval
+            interval = min(interval * self.backoff_factor, self.max_interval_seconds)
+
+    def attempts(self) -> Attempts:
+        """Starts the wait. See `Attempts`."""
+        return Attempts(self)
+
+
+class Attempts:
+    """Iterator over the checks of a single wait.
+
+    Every iteration first sleeps until the next scheduled check and then
+    yields the attempt number. A final check is always made at the deadline,
+    after which iteration stops.
+    """
+
+    def __init__(self, strategy: WaitStrategy):
+        self.strategy = strategy
+        self.started_at = time.monotonic()
+        self.deadline = self.started_at + strategy.timeout_seconds
+        self.attempt = 0
+        self._intervals = strategy.intervals()
+        self._next_check: Optional[float] = min(
+            self.started_at + strategy.initial_delay_seconds, self.deadline)
+
+    @property
+    def remaining_seconds(self) -> float:
+        return max(0, self.deadline - time.monotonic())
+
+    @property
+    def elapsed_seconds(self) -> float:
+        return time.monotonic() - self.started_at
+
+    def next_delay(self) -> Optional[float]:
+        """Returns the time until the next check, or None if the wait is over."""
+        if self._next_check is None:
+            return None
+        return max(0, self._next_check - time.monotonic())
+
+    def __iter__(self) -> Attempts:
+        return self
+
+    def __next__(self) -> int:
+        delay = self.next_delay()
+        if delay is None:
+            raise StopIteration
+        if delay > 0:
+            time.sleep(delay)
+
+        self.attempt += 1
+        now = time.monotonic()
+        if now >= self.deadline:
+            self._next_check = None
+        else:
+            self._next_check = min(now + next(self._intervals), self.deadline)
+        return self.attempt
@@ -0,0 +1,61 @@
+# Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may
+# not use this file except in compliance with the License. A copy of the
+# License is located at
+#
+#	 http://aws.amazon.com/apache2.0/
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+"""Unit tests for acktest.aws.clients."""
+
+import threading
+
+import boto3
+import pytest
+
+from acktest.aws import clients, credentials
+
+
+@pytest.fixture(autouse=True)
+def session(monkeypatch):
+    monkeypatch.setattr(boto3, "DEFAULT_SESSION", None)
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "AKIDEXAMPLE")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "secret")
+    clients.clear_cache()
+    yield
+    clients.clear_cache()
+
+
+def test_clients_are_shared_across_threads():
+    shared = clients.client("sqs", region_name="us-west-2")
+    from_thread = []
+    thread = threading.Thread(target=lambda: from_thread.append(clients.client("sqs", region_name="us-west-2")))
+    thread.start()
+    thread.join()
+
+    assert from_thread == [shared]
+    assert clients.client("sqs", region_name="us-east-1") is not shared
+    assert shared.meta.config.retries["mode"] == "adaptive"
+    assert shared.meta.config.max_pool_connections == clients.MAX_POOL_CONNECTIONS
+
+
+def test_resources_are_cached_per_thread():
+    resource = clients.resource("sqs", region_name="us-west-2")
+    from_thread = []
+    thread = threading.Thread(target=lambda: from_thread.append(clients.resource("sqs", region_name="us-west-2")))
+    thread.start()
+    thread.join()
+
+    assert clients.resource("sqs", region_name="us-west-2") is resource
+    assert from_thread[0] is not resource
+
+
+def test_clients_are_recreated_when_credentials_change():
+    before = clients.client("sqs", region_name="us-west-2")
+    credentials._bump_generation()
+
+    assert clients.client("sqs", region_name="us-west-2") is not before
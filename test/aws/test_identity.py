@@ -0,0 +1,85 @@
+# Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may
+# not use this file except in compliance with the License. A copy of the
+# License is located at
+#
+#	 http://aws.amazon.com/apache2.0/
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+"""Unit tests for acktest.aws.identity."""
+
+import boto3
+import pytest
+
+from acktest.aws import credentials, identity
+
+
+class FakeSTS:
+    def __init__(self):
+        self.calls = 0
+
+    def get_caller_identity(self):
+        self.calls += 1
+        return {"Account": "111122223333"}
+
+
+@pytest.fixture
+def sts(monkeypatch):
+    fake = FakeSTS()
+    monkeypatch.setattr(boto3, "client", lambda service, *args, **kwargs: fake)
+    monkeypatch.setattr(boto3, "DEFAULT_SESSION", None)
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "AKIDEXAMPLE")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "secret")
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "eu-west-1")
+    monkeypatch.delenv(identity.IDENTITY_CACHE_FILE_ENV_VAR, raising=False)
+    identity.clear_cache()
+    yield fake
+    identity.clear_cache()
+
+
+def test_identity_is_memoized(sts):
+    assert identity.get_account_id() == "111122223333"
+    assert identity.get_account_id() == "111122223333"
+    assert identity.get_region() == "eu-west-1"
+    assert sts.calls == 1
+
+
+def test_identity_memoized_when_lookup_creates_default_session(sts, monkeypatch):
+    def _client(service, *args, **kwargs):
+        # As boto3.client does
+        boto3._get_default_session()
+        return sts
+
+    monkeypatch.setattr(boto3, "client", _client)
+
+    identity.get_account_id()
+    identity.get_account_id()
+
+    assert sts.calls == 1
+
+
+def test_identity_refetched_after_credential_rotation(sts):
+    identity.get_account_id()
+    credentials._bump_generation()
+    identity.get_account_id()
+
+    assert sts.calls == 2
+
+
+def test_account_id_shared_through_cache_file(sts, tmp_path, monkeypatch):
+    monkeypatch.setenv(identity.IDENTITY_CACHE_FILE_ENV_VAR, str(tmp_path / "identity.json"))
+
+    identity.get_account_id()
+    # Another worker process starts with an empty in-memory cache
+    identity.clear_cache()
+    assert identity.get_account_id() == "111122223333"
+    assert sts.calls == 1
+
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "AKIDOTHER")
+    monkeypatch.setattr(boto3, "DEFAULT_SESSION", None)
+    identity.get_account_id()
+    assert sts.calls == 2
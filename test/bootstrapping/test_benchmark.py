@@ -0,0 +1,74 @@
+# Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may
+# not use this file except in compliance with the License. A copy of the
+# License is located at
+#
+#	 http://aws.amazon.com/apache2.0/
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+"""Benchmarks of acktest.bootstrapping, run against the offline stand-in.
+
+They guard against regressions in the number of API calls and in the
+parallelism of bootstrap and cleanup.
+"""
+
+import json
+
+import boto3
+import pytest
+
+from acktest.bootstrapping import benchmark, iam, trace
+
+
+@pytest.fixture(autouse=True)
+def offline(monkeypatch):
+    monkeypatch.delenv("AWS_PROFILE", raising=False)
+    monkeypatch.delenv("AWS_DEFAULT_PROFILE", raising=False)
+    monkeypatch.delenv("ACKTEST_IDENTITY_CACHE_FILE", raising=False)
+    # The stand-in's roles are usable as soon as they are created
+    monkeypatch.setattr(iam, "ROLE_CREATE_SETTLE_IN_SECONDS", 0)
+
+
+@pytest.mark.parametrize("graph,bootstrap_calls,cleanup_calls", [
+    ("vpc", {"ec2.CreateSubnet": 4, "ec2.AssociateRouteTable": 4, "ec2.CreateVpc": 1}, {"ec2.DeleteSubnet": 4}),
+    ("role", {"iam.CreatePolicy": 3, "iam.AttachRolePolicy": 4, "iam.CreateRole": 1}, {"iam.DetachRolePolicy": 4}),
+    ("bucket", {"s3.PutObject": 10}, {"s3.ListObjectVersions": 1, "s3.DeleteObjects": 1}),
+])
+def test_graph_api_calls(graph, bootstrap_calls, cleanup_calls):
+    bootstrap, cleanup = benchmark.run(graph, workers=8, latency_seconds=0)
+
+    assert bootstrap.phase == trace.PHASE_BOOTSTRAP
+    assert bootstrap_calls.items() <= bootstrap.api_calls.items()
+    assert cleanup_calls.items() <= cleanup.api_calls.items()
+
+
+def test_parallel_bootstrap_overlaps_api_calls():
+    serial_bootstrap, _ = benchmark.run("all", workers=1, latency_seconds=0.01, jitter=0)
+    parallel_bootstrap, _ = benchmark.run("all", workers=8, latency_seconds=0.01, jitter=0)
+
+    assert serial_bootstrap.peak_in_flight == 1
+    assert parallel_bootstrap.peak_in_flight > 1
+    assert parallel_bootstrap.api_call_count == serial_bootstrap.api_call_count
+    # Wall times are not compared, as they depend on the load of the machine
+
+
+def test_stand_in_restores_default_session():
+    previous = boto3.DEFAULT_SESSION
+    with benchmark.StandIn(latency_seconds=0) as stand_in:
+        boto3.client("sts").get_caller_identity()
+        assert stand_in.stats.calls == {"sts.GetCallerIdentity": 1}
+    assert boto3.DEFAULT_SESSION is previous
+
+
+def test_main_writes_json(tmp_path, capsys):
+    path = tmp_path / "results.json"
+    benchmark.main(["--graph", "bucket", "--workers", "2", "--latency-ms", "0", "--json", str(path)])
+
+    assert "bucket" in capsys.readouterr().out
+    results = json.loads(path.read_text())
+    assert [r["phase"] for r in results] == [trace.PHASE_BOOTSTRAP, trace.PHASE_CLEANUP]
+    assert all(0 <= r["thread_utilization"] <= 1 for r in results)
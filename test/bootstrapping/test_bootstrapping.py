@@ -0,0 +1,142 @@
+# Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may
+# not use this file except in compliance with the License. A copy of the
+# License is located at
+#
+#	 http://aws.amazon.com/apache2.0/
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+"""Unit tests for acktest.bootstrapping."""
+
+import threading
+import time
+from dataclasses import dataclass, field
+
+import pytest
+
+from acktest import bootstrapping
+from acktest.bootstrapping import DEPENDS_ON, Bootstrappable, BootstrapFailureException, Resources
+
+_events = []
+_events_lock = threading.Lock()
+
+
+def _record(event):
+    with _events_lock:
+        _events.append(event)
+
+
+@dataclass
+class Dummy(Bootstrappable):
+    name: str
+    duration: float = 0.2
+    failures: int = 0
+    cleanup_failures: int = 0
+
+    def bootstrap(self):
+        _record(("start", self.name))
+        time.sleep(self.duration)
+        if self.failures > 0:
+            self.failures -= 1
+            raise RuntimeError(f"{self.name} failed")
+        _record(("bootstrapped", self.name))
+
+    def cleanup(self):
+        _record(("cleanup", self.name))
+        time.sleep(self.duration)
+        if self.cleanup_failures > 0:
+            self.cleanup_failures -= 1
+            raise RuntimeError(f"{self.name} cleanup failed")
+        _record(("cleaned", self.name))
+
+
+@dataclass
+class ServiceResources(Resources):
+    role: Dummy = field(default_factory=lambda: Dummy("role"))
+    bucket: Dummy = field(default_factory=lambda: Dummy("bucket"))
+    queue: Dummy = field(default_factory=lambda: Dummy("queue"), metadata={DEPENDS_ON: ("role",)})
+
+
+@pytest.fixture(autouse=True)
+def reset_events(monkeypatch):
+    _events.clear()
+    monkeypatch.delenv(bootstrapping.BOOTSTRAP_WORKERS_ENV_VAR, raising=False)
+
+
+def _index(event):
+    return _events.index(event)
+
+
+def test_independent_siblings_bootstrap_concurrently():
+    start = time.monotonic()
+    ServiceResources().bootstrap()
+
+    # role and bucket in parallel, then queue
+    assert time.monotonic() - start < 0.55
+    assert _index(("bootstrapped", "role")) < _index(("start", "queue"))
+    assert {e[1] for e in _events[:2]} == {"role", "bucket"}
+
+
+def test_single_worker_keeps_serial_order(monkeypatch):
+    monkeypatch.setenv(bootstrapping.BOOTSTRAP_WORKERS_ENV_VAR, "1")
+
+    ServiceResources().bootstrap()
+
+    assert [name for event, name in _events if event == "start"] == ["role", "bucket", "queue"]
+
+
+def test_failure_rolls_back_bootstrapped_siblings():
+    resources = ServiceResources(role=Dummy("role", duration=0.5), bucket=Dummy("bucket", duration=0, failures=3))
+
+    with pytest.raises(BootstrapFailureException, match="'Dummy'"):
+        resources.bootstrap()
+
+    # role finishes bootstrapping, is rolled back; queue is never started
+    assert ("cleanup", "role") in _events
+    assert ("start", "queue") not in _events
+
+
+def test_retry_succeeds_after_cleanup():
+    resources = ServiceResources(bucket=Dummy("bucket", duration=0, failures=1))
+
+    resources.bootstrap()
+
+    assert _index(("cleanup", "bucket")) < _index(("bootstrapped", "bucket"))
+
+
+def test_circular_dependencies_rejected():
+    @dataclass
+    class Circular(Resources):
+        a: Dummy = field(default_factory=lambda: Dummy("a"), metadata={DEPENDS_ON: ("b",)})
+        b: Dummy = field(default_factory=lambda: Dummy("b"), metadata={DEPENDS_ON: ("a",)})
+
+    with pytest.raises(ValueError, match="Circular"):
+        Circular().bootstrap()
+
+
+def test_cleanup_in_reverse_dependency_order():
+    resources = ServiceResources()
+
+    start = time.monotonic()
+    resources.cleanup()
+
+    # queue and bucket in parallel, then role
+    assert time.monotonic() - start < 0.55
+    assert _index(("cleaned", "queue")) < _index(("cleanup", "role"))
+    assert {e[1] for e in _events[:2]} == {"queue", "bucket"}
+
+
+def test_cleanup_failure_only_blocks_its_branch():
+    resources = ServiceResources(queue=Dummy("queue", duration=0, cleanup_failures=3))
+
+    dangling = resources._cleanup_subresources()
+
+    assert ("cleaned", "bucket") in _events
+    assert ("cleanup", "role") not in _events
+    assert sorted(d.details["name"] for d in dangling) == ["queue", "role"]
+    assert "RuntimeError: queue cleanup failed" in str(dangling[0])
+    assert dangling[0] in bootstrapping.dangling_resources()
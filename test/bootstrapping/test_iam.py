@@ -0,0 +1,95 @@
+# Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may
+# not use this file except in compliance with the License. A copy of the
+# License is located at
+#
+#	 http://aws.amazon.com/apache2.0/
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+"""Unit tests for acktest.bootstrapping.iam."""
+
+import datetime
+import time
+
+import boto3
+import pytest
+from botocore.stub import Stubber
+
+from acktest.bootstrapping import iam
+
+ROLE_ARN = "arn:aws:iam::123456789012:role/ack-test-role"
+
+
+@pytest.fixture
+def iam_client(monkeypatch):
+    client = boto3.client(
+        "iam", region_name="us-east-1", aws_access_key_id="testing", aws_secret_access_key="testing")
+    monkeypatch.setattr(iam.Role, "iam_client", property(lambda self: client))
+    monkeypatch.setattr(iam, "ROLE_PROBE_INTERVAL_IN_SECONDS", 0.01)
+    monkeypatch.setattr(iam, "ROLE_CREATE_SETTLE_IN_SECONDS", 0)
+    return client
+
+
+def _role_response(name):
+    return {
+        "Role": {
+            "Path": "/", "RoleName": name, "RoleId": "AROAEXAMPLEROLEID0001", "Arn": ROLE_ARN,
+            "CreateDate": datetime.datetime(2024, 1, 1),
+        },
+        # Matched by the role_exists waiter
+        "ResponseMetadata": {"HTTPStatusCode": 200},
+    }
+
+
+def test_role_bootstrap_returns_once_role_is_usable(iam_client):
+    role = iam.Role("ack-test-role", "lambda.amazonaws.com", managed_policies=["arn:aws:iam::aws:policy/P"])
+    with Stubber(iam_client) as stubber:
+        stubber.add_response("create_role", _role_response(role.name))
+        stubber.add_response("attach_role_policy", {})
+        stubber.add_response("get_role", _role_response(role.name))
+        # Not visible yet, then visible without and with its policy
+        stubber.add_client_error("get_role", "NoSuchEntity", http_status_code=404)
+        stubber.add_response("get_role", _role_response(role.name))
+        stubber.add_response("list_attached_role_policies", {"AttachedPolicies": []})
+        stubber.add_response("get_role", _role_response(role.name))
+        stubber.add_response("list_attached_role_policies", {"AttachedPolicies": [
+            {"PolicyName": "P", "PolicyArn": "arn:aws:iam::aws:policy/P"}]})
+
+        start = time.monotonic()
+        role.bootstrap()
+
+        assert time.monotonic() - start < iam.ROLE_CREATE_WAIT_IN_SECONDS / 10
+        assert role.arn == ROLE_ARN
+        stubber.assert_no_pending_responses()
+
+
+def test_role_cleanup_waits_until_role_is_gone(iam_client):
+    role = iam.Role("ack-test-role", "lambda.amazonaws.com")
+    role.arn = ROLE_ARN
+    with Stubber(iam_client) as stubber:
+        stubber.add_response("list_attached_role_policies", {"AttachedPolicies": []})
+        stubber.add_response("list_role_policies", {"PolicyNames": []})
+        stubber.add_response("list_instance_profiles_for_role", {"InstanceProfiles": []})
+        stubber.add_response("delete_role", {})
+        stubber.add_response("get_role", _role_response(role.name))
+        stubber.add_client_error("get_role", "NoSuchEntity", http_status_code=404)
+
+        role.cleanup()
+
+        stubber.assert_no_pending_responses()
+
+
+def test_wait_for_propagation_settles_after_probe_passes():
+    start = time.monotonic()
+    assert iam.wait_for_propagation(lambda: True, 1, "something", settle_seconds=0.2)
+    assert 0.2 <= time.monotonic() - start < 1
+
+
+def test_wait_for_propagation_is_capped():
+    start = time.monotonic()
+    assert not iam.wait_for_propagation(lambda: False, 0.2, "nothing")
+    assert 0.2 <= time.monotonic() - start < 1
@@ -0,0 +1,144 @@
+# Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may
+# not use this file except in compliance with the License. A copy of the
+# License is located at
+#
+#	 http://aws.amazon.com/apache2.0/
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+"""Unit tests for acktest.bootstrapping.journal."""
+
+import json
+from dataclasses import dataclass, field
+
+import pytest
+
+from acktest import bootstrapping
+from acktest.bootstrapping import Bootstrappable, BootstrapFailureException, Resources, journal
+
+_events = []
+
+
+@dataclass
+class Leaf(Bootstrappable):
+    name: str
+    fail: bool = False
+
+    # Outputs
+    arn: str = field(init=False, default=None)
+
+    def bootstrap(self):
+        _events.append(("bootstrap", self.name))
+        if self.fail:
+            raise RuntimeError(f"{self.name} failed")
+        self.arn = f"arn:{self.name}"
+
+    def cleanup(self):
+        _events.append(("cleanup", self.name, self.arn))
+
+
+@dataclass
+class Network(Bootstrappable):
+    # Subresources, created during bootstrap like `VPC.public_subnets`
+    subnet: Leaf = field(init=False, default=None)
+    gateway: Leaf = field(init=False, default=None)
+
+    # Outputs
+    network_id: str = field(init=False, default=None)
+
+    def bootstrap(self):
+        self.network_id = "net-1"
+        self.subnet = Leaf("subnet")
+        self.gateway = Leaf("gateway", fail=_fail_gateway)
+        super().bootstrap()
+
+    def cleanup(self):
+        super().cleanup()
+        _events.append(("cleanup", "network", self.network_id))
+
+
+@dataclass
+class ServiceResources(Resources):
+    role: Leaf = field(default_factory=lambda: Leaf("role"))
+    network: Network = field(default_factory=Network)
+
+
+_fail_gateway = False
+
+
+@pytest.fixture(autouse=True)
+def reset(monkeypatch):
+    global _fail_gateway
+    _events.clear()
+    _fail_gateway = False
+    monkeypatch.setattr(Bootstrappable, "bootstrap_retries", 1)
+    monkeypatch.setenv(bootstrapping.BOOTSTRAP_WORKERS_ENV_VAR, "1")
+
+
+def test_journal_records_outputs_as_versioned_json(tmp_path):
+    path = tmp_path / "journal.json"
+    journal.bootstrap(ServiceResources(), path)
+
+    document = json.loads(path.read_text())
+    assert document["version"] == journal.JOURNAL_VERSION
+    entries = document["entries"]
+    assert entries["role"]["state"] == journal.STATE_BOOTSTRAPPED
+    assert entries["role"]["outputs"] == {"name": "role", "arn": "arn:role", "fail": False}
+    assert entries["network"]["outputs"]["network_id"] == "net-1"
+    assert entries["network.subnet"]["type"] == f"{__name__}.Leaf"
+
+
+def test_resume_skips_bootstrapped_resources(tmp_path):
+    global _fail_gateway
+    path = tmp_path / "journal.json"
+    _fail_gateway = True
+    with pytest.raises(BootstrapFailureException):
+        journal.bootstrap(ServiceResources(), path)
+
+    # The network's subnet was rolled back, the role was kept
+    entries = journal.load(path)["entries"]
+    assert set(entries) == {"role", "network"}
+    assert entries["network"]["state"] == journal.STATE_BOOTSTRAPPING
+
+    _events.clear()
+    _fail_gateway = False
+    resources = journal.bootstrap(ServiceResources(), path)
+
+    assert ("bootstrap", "role") not in _events
+    assert ("bootstrap", "subnet") in _events
+    assert resources.role.arn == "arn:role"
+    assert resources.network.gateway.arn == "arn:gateway"
+
+
+def test_cleanup_from_partial_journal(tmp_path):
+    path = tmp_path / "journal.json"
+    journal.bootstrap(ServiceResources(), path)
+
+    # As left by a process killed while bootstrapping the network
+    document = journal.load(path)
+    document["entries"]["network"]["state"] = journal.STATE_BOOTSTRAPPING
+    del document["entries"]["network.gateway"]
+    path.write_text(json.dumps(document))
+
+    _events.clear()
+    first = len(bootstrapping.dangling_resources())
+    journal.cleanup(ServiceResources(), path)
+
+    assert ("cleanup", "role", "arn:role") in _events
+    assert ("cleanup", "subnet", "arn:subnet") in _events
+    # Neither the unrecorded gateway nor the network itself are cleaned up
+    assert all(event[1] not in ("gateway", "network") for event in _events)
+    assert [d.resource_name for d in bootstrapping.dangling_resources()[first:]] == ["Network"]
+    assert journal.load(path)["entries"] == {}
+
+
+def test_load_rejects_unknown_version(tmp_path):
+    path = tmp_path / "journal.json"
+    path.write_text(json.dumps({"version": 99, "entries": {}}))
+
+    with pytest.raises(journal.JournalVersionError):
+        journal.load(path)
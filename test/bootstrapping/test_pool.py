@@ -0,0 +1,214 @@
+# Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may
+# not use this file except in compliance with the License. A copy of the
+# License is located at
+#
+#	 http://aws.amazon.com/apache2.0/
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+"""Unit tests for acktest.bootstrapping.pool."""
+
+import itertools
+import threading
+from dataclasses import dataclass, field
+from typing import Union
+
+import pytest
+
+from acktest.bootstrapping import Bootstrappable
+from acktest.bootstrapping import pool as pool_module
+from acktest.bootstrapping.pool import ResourcePool
+
+_ids = itertools.count()
+_cleaned_up = []
+
+
+@dataclass
+class SlowCluster(Bootstrappable):
+    name_prefix: str
+    node_count: int = 2
+
+    name: Union[str, None] = field(default=None, init=False)
+
+    def bootstrap(self):
+        self.name = f"{self.name_prefix}-{next(_ids)}"
+
+    def cleanup(self):
+        _cleaned_up.append(self.name)
+
+
+@pytest.fixture(autouse=True)
+def reset_cleaned_up():
+    _cleaned_up.clear()
+
+
+@pytest.fixture
+def pool(tmp_path):
+    return ResourcePool(tmp_path / "pool.db", size=1, ttl_seconds=3600)
+
+
+def test_released_instance_is_leased_again(pool):
+    with pool.lease(SlowCluster("cluster")) as first:
+        pass
+    with pool.lease(SlowCluster("cluster")) as second:
+        pass
+
+    assert second.name == first.name
+    assert _cleaned_up == []
+
+
+def test_leases_are_exclusive_and_keyed_by_spec(pool):
+    first = pool.lease(SlowCluster("cluster"))
+    second = pool.lease(SlowCluster("cluster"))
+    other = pool.lease(SlowCluster("cluster", node_count=3))
+
+    assert len({first.resource.name, second.resource.name, other.resource.name}) == 3
+
+    first.release()
+    second.release()
+    other.release()
+    # Only one instance per spec is kept
+    assert _cleaned_up == [second.resource.name]
+    assert [i["state"] for i in pool.instances()] == ["available", "available"]
+
+
+def test_expired_instances_are_recycled(pool, monkeypatch):
+    with pool.lease(SlowCluster("cluster")) as old:
+        pass
+
+    now = pool_module.time.time()
+    monkeypatch.setattr(pool_module.time, "time", lambda: now + 7200)
+    assert pool.replenish(SlowCluster("cluster")) == 1
+
+    assert _cleaned_up == [old.name]
+    with pool.lease(SlowCluster("cluster")) as new:
+        assert new.name != old.name
+
+
+def test_replenish_bootstraps_up_to_size(tmp_path):
+    pool = ResourcePool(tmp_path / "pool.db", size=3, ttl_seconds=3600)
+    with pool.lease(SlowCluster("cluster")) as existing:
+        pass
+
+    assert pool.replenish(SlowCluster("cluster")) == 2
+
+    instances = pool.instances()
+    assert [i["state"] for i in instances] == ["available"] * 3
+    leases = [pool.lease(SlowCluster("cluster")) for _ in range(3)]
+    assert len({lease.resource.name for lease in leases} - {existing.name}) == 2
+    assert _cleaned_up == []
+
+
+def test_abandoned_lease_is_revoked(tmp_path, monkeypatch):
+    crashed = ResourcePool(tmp_path / "pool.db", lease_timeout_seconds=60, owner="crashed")
+    abandoned = crashed.lease(SlowCluster("cluster")).resource
+
+    pool = ResourcePool(tmp_path / "pool.db", lease_timeout_seconds=60)
+    now = pool_module.time.time()
+    monkeypatch.setattr(pool_module.time, "time", lambda: now + 120)
+
+    assert pool.lease(SlowCluster("cluster")).resource.name == abandoned.name
+
+
+def test_failed_bootstrap_is_not_pooled(pool):
+    class Broken(SlowCluster):
+        def bootstrap(self):
+            raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        pool.lease(Broken("cluster"))
+    assert pool.instances() == []
+
+
+def test_instance_revoked_while_bootstrapping_is_cleaned_up(pool, monkeypatch):
+    bootstrap = SlowCluster.bootstrap
+
+    def _outlast_lease(self):
+        bootstrap(self)
+        # Meanwhile, the lease timed out and another run dropped the reservation
+        now = pool_module.time.time()
+        monkeypatch.setattr(pool_module.time, "time", lambda: now + pool.lease_timeout_seconds + 1)
+        pool.recycle_expired()
+
+    monkeypatch.setattr(SlowCluster, "bootstrap", _outlast_lease)
+
+    with pytest.raises(pool_module.LeaseRevokedError):
+        pool.lease(SlowCluster("cluster"))
+
+    assert len(_cleaned_up) == 1
+    assert pool.instances() == []
+
+
+def test_revoked_lease_cannot_release_or_discard(tmp_path, monkeypatch):
+    crashed = ResourcePool(tmp_path / "pool.db", lease_timeout_seconds=60, owner="crashed")
+    stale = crashed.lease(SlowCluster("cluster"))
+
+    pool = ResourcePool(tmp_path / "pool.db", lease_timeout_seconds=60)
+    now = pool_module.time.time()
+    monkeypatch.setattr(pool_module.time, "time", lambda: now + 120)
+    current = pool.lease(SlowCluster("cluster"))
+    assert current.instance_id == stale.instance_id
+
+    stale.release()
+    stale.discard()
+
+    assert _cleaned_up == []
+    assert [(i["state"], i["lease_owner"]) for i in pool.instances()] == [("leased", current.owner)]
+
+
+@dataclass
+class StickyCluster(SlowCluster):
+    """Fails to clean up `cleanup_failures` times."""
+
+    cleanup_failures: int = 0
+
+    def cleanup(self):
+        if self.cleanup_failures:
+            self.cleanup_failures -= 1
+            raise RuntimeError("DependencyViolation")
+        super().cleanup()
+
+
+def test_failed_cleanup_is_kept_and_retried(pool):
+    healthy = pool.lease(SlowCluster("healthy"))
+    lease = pool.lease(StickyCluster("sticky", cleanup_failures=1))
+    with pytest.raises(RuntimeError):
+        lease.discard()
+    assert [i["state"] for i in pool.instances()] == ["leased", "failed"]
+
+    healthy.release()
+    assert pool.recycle_expired() == 1
+    assert _cleaned_up == [lease.resource.name]
+    assert [i["state"] for i in pool.instances()] == ["available"]
+
+
+def test_recycle_continues_past_failed_cleanup(pool, monkeypatch):
+    with pool.lease(StickyCluster("broken", cleanup_failures=2)):
+        pass
+    with pool.lease(SlowCluster("cluster")) as expired:
+        pass
+
+    now = pool_module.time.time()
+    monkeypatch.setattr(pool_module.time, "time", lambda: now + 7200)
+    assert pool.recycle_expired() == 1
+
+    assert _cleaned_up == [expired.name]
+    assert [(i["resource_type"], i["state"]) for i in pool.instances()] == [("StickyCluster", "failed")]
+
+
+def test_concurrent_releases_keep_pool_size(pool, tmp_path):
+    pool = ResourcePool(tmp_path / "sized.db", size=2)
+    leases = [pool.lease(SlowCluster("cluster")) for _ in range(6)]
+
+    threads = [threading.Thread(target=lease.release) for lease in leases]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert [i["state"] for i in pool.instances()] == ["available", "available"]
+    assert len(_cleaned_up) == 4
@@ -0,0 +1,152 @@
+# Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may
+# not use this file except in compliance with the License. A copy of the
+# License is located at
+#
+#	 http://aws.amazon.com/apache2.0/
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+"""Unit tests for acktest.bootstrapping.retry."""
+
+from dataclasses import dataclass, field, replace
+from typing import List
+
+import pytest
+from botocore.exceptions import ClientError, ParamValidationError
+
+from acktest.bootstrapping import Bootstrappable, BootstrapFailureException, Resources, dangling_resources, retry
+from acktest.wait import WaitStrategy
+
+
+def _client_error(code: str, message: str = "") -> ClientError:
+    return ClientError({"Error": {"Code": code, "Message": message or code}}, "Operation")
+
+
+@pytest.mark.parametrize("exception, error_class", [
+    (_client_error("ThrottlingException"), retry.ERROR_CLASS_THROTTLING),
+    (_client_error("RequestLimitExceeded"), retry.ERROR_CLASS_THROTTLING),
+    (_client_error("InvalidVpcID.NotFound"), retry.ERROR_CLASS_NOT_FOUND),
+    (_client_error("NoSuchEntity"), retry.ERROR_CLASS_NOT_FOUND),
+    (_client_error("DependencyViolation"), retry.ERROR_CLASS_DEPENDENCY_VIOLATION),
+    (_client_error("ValidationError"), retry.ERROR_CLASS_NON_RETRYABLE),
+    (ParamValidationError(report="missing"), retry.ERROR_CLASS_NON_RETRYABLE),
+    (_client_error("InvalidParameterValueException", "The role defined for the function cannot be assumed by Lambda."),
+     retry.ERROR_CLASS_PROPAGATION),
+    (_client_error("InvalidParameterException", "Role could not be assumed"), retry.ERROR_CLASS_PROPAGATION),
+    (_client_error("MalformedPolicyDocumentException", "Policy contains invalid principals"),
+     retry.ERROR_CLASS_PROPAGATION),
+    (_client_error("AccessDeniedException"), retry.ERROR_CLASS_PROPAGATION),
+    (_client_error("InternalFailure"), retry.ERROR_CLASS_OTHER),
+    (RuntimeError("boom"), retry.ERROR_CLASS_OTHER),
+])
+def test_classify(exception, error_class):
+    assert retry.classify(exception) == error_class
+
+
+def test_retries_follow_backoff_of_error_class():
+    policy = replace(retry.DEFAULT_RETRY_POLICY, throttling=retry.Backoff(3, WaitStrategy(
+        timeout_seconds=60, interval_seconds=1, backoff_factor=2, jitter=0)))
+    retries = retry.Retries(policy, other=retry.Backoff.fixed(2, 0.5))
+
+    throttled = _client_error("Throttling")
+    assert retries.next_delay(throttled) == 1
+    assert retries.next_delay(throttled) == 2
+    assert retries.next_delay(throttled) is None
+
+    # Counted separately from throttling errors
+    assert retries.next_delay(RuntimeError()) == 0.5
+    assert retries.next_delay(RuntimeError()) is None
+    assert retries.next_delay(_client_error("ValidationError")) is None
+
+
+_attempts: List[str] = []
+
+FAST_POLICY = replace(retry.DEFAULT_RETRY_POLICY, throttling=retry.Backoff(5, WaitStrategy(
+    timeout_seconds=5, interval_seconds=0.01, jitter=0)))
+
+
+@dataclass
+class Failing(Bootstrappable):
+    name: str
+    errors: List[Exception] = field(default_factory=list)
+
+    @property
+    def retry_policy(self):
+        return FAST_POLICY
+
+    def bootstrap(self):
+        _attempts.append(self.name)
+        if self.errors:
+            raise self.errors.pop(0)
+
+    def cleanup(self):
+        pass
+
+
+@pytest.fixture(autouse=True)
+def reset_attempts():
+    _attempts.clear()
+
+
+def test_throttling_retried_beyond_bootstrap_retries():
+    @dataclass
+    class ServiceResources(Resources):
+        queue: Failing = field(default_factory=lambda: Failing("queue", [_client_error("Throttling")] * 4))
+
+    ServiceResources().bootstrap()
+    assert _attempts == ["queue"] * 5
+
+
+def test_propagation_error_retried_with_bounded_budget():
+    policy = replace(retry.DEFAULT_RETRY_POLICY, propagation=retry.Backoff(3, WaitStrategy(
+        timeout_seconds=60, interval_seconds=5, jitter=0)))
+    retries = retry.Retries(policy, other=retry.Backoff.fixed(1, 0))
+
+    denied = _client_error("AccessDenied")
+    assert retries.next_delay(denied) == 5
+    assert retries.next_delay(denied) is not None
+    assert retries.next_delay(denied) is None
+
+
+def test_non_retryable_error_fails_immediately():
+    @dataclass
+    class ServiceResources(Resources):
+        queue: Failing = field(default_factory=lambda: Failing("queue", [_client_error("ValidationError")]))
+
+    with pytest.raises(BootstrapFailureException):
+        ServiceResources().bootstrap()
+    assert _attempts == ["queue"]
+
+
+@dataclass
+class AlreadyDeleted(Bootstrappable):
+    name: str
+
+    def bootstrap(self):
+        pass
+
+    def cleanup(self):
+        _attempts.append(self.name)
+        raise _client_error("NoSuchEntity")
+
+
+@dataclass
+class DeletedParent(AlreadyDeleted):
+    # Not cleaned up by `cleanup`, which fails first
+    child: AlreadyDeleted = field(default_factory=lambda: AlreadyDeleted("child"))
+
+
+def test_not_found_during_cleanup_counts_as_cleaned_up():
+    @dataclass
+    class ServiceResources(Resources):
+        parent: DeletedParent = field(default_factory=lambda: DeletedParent("parent"))
+
+    first = len(dangling_resources())
+    ServiceResources().cleanup()
+
+    assert _attempts == ["parent", "child"]
+    assert dangling_resources()[first:] == []
@@ -0,0 +1,146 @@
+# Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may
+# not use this file except in compliance with the License. A copy of the
+# License is located at
+#
+#	 http://aws.amazon.com/apache2.0/
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+"""Unit tests for acktest.bootstrapping.trace."""
+
+import json
+import time
+from dataclasses import dataclass, field
+
+import boto3
+import pytest
+from botocore.stub import Stubber
+
+from acktest.aws import clients
+from acktest.bootstrapping import Bootstrappable, Resources, trace
+
+
+@dataclass
+class Queue(Bootstrappable):
+    name: str
+    failures: int = 0
+
+    def bootstrap(self):
+        time.sleep(0.05)
+        if self.failures > 0:
+            self.failures -= 1
+            raise RuntimeError(f"{self.name} failed")
+        clients.client("sqs", region_name="us-west-2").create_queue(QueueName=self.name)
+
+    def cleanup(self):
+        pass
+
+
+@dataclass
+class Network(Bootstrappable):
+    queue: Queue = field(default_factory=lambda: Queue("nested"))
+
+    def bootstrap(self):
+        time.sleep(0.1)
+        super().bootstrap()
+
+    def cleanup(self):
+        super().cleanup()
+
+
+@dataclass
+class ServiceResources(Resources):
+    queue: Queue = field(default_factory=lambda: Queue("flaky", failures=1))
+    network: Network = field(default_factory=Network)
+
+
+@dataclass
+class QueueResources(Resources):
+    queue: Queue
+
+
+@pytest.fixture
+def sqs(monkeypatch):
+    monkeypatch.setattr(boto3, "DEFAULT_SESSION", None)
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "AKIDEXAMPLE")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "secret")
+    clients.clear_cache()
+    client = clients.client("sqs", region_name="us-west-2")
+    yield client
+    clients.clear_cache()
+
+
+def test_spans_record_attempts_and_api_calls(sqs):
+    with trace.tracing() as tracer, Stubber(sqs) as stubber:
+        for _ in range(2):
+            stubber.add_response("create_queue", {"QueueUrl": "https://sqs.us-west-2.amazonaws.com/1/q"})
+        ServiceResources().bootstrap()
+
+    spans = {s.path: s for s in tracer.spans}
+    assert set(spans) == {"queue", "network", "network.queue"}
+
+    flaky = spans["queue"]
+    assert flaky.outcome == trace.OUTCOME_SUCCEEDED
+    assert flaky.attempts == 2
+    assert flaky.errors == ["RuntimeError: flaky failed"]
+    assert flaky.api_calls == {"sqs.CreateQueue": 1}
+
+    # Calls are attributed to the innermost span only
+    assert spans["network"].api_call_count == 0
+    assert spans["network.queue"].api_call_count == 1
+    assert spans["network.queue"].parent is spans["network"]
+
+    assert [s.path for s in tracer.critical_path()] == ["network", "network.queue"]
+    summary = tracer.summary()
+    assert "Critical path: Network" in summary
+
+
+def test_chrome_trace_export(sqs, tmp_path):
+    with trace.tracing() as tracer, Stubber(sqs) as stubber:
+        for _ in range(2):
+            stubber.add_response("create_queue", {"QueueUrl": "https://sqs.us-west-2.amazonaws.com/1/q"})
+        resources = ServiceResources()
+        resources.bootstrap()
+        resources.cleanup()
+
+    path = tmp_path / "trace.json"
+    tracer.write_chrome_trace(path)
+    events = json.loads(path.read_text())["traceEvents"]
+
+    complete = [e for e in events if e["ph"] == "X"]
+    assert {e["cat"] for e in complete} == {trace.PHASE_BOOTSTRAP, trace.PHASE_CLEANUP}
+    assert all(e["dur"] >= 0 and e["ts"] >= 0 for e in complete)
+    # One metadata event naming each thread
+    assert {e["tid"] for e in events if e["ph"] == "M"} == {e["tid"] for e in complete}
+
+
+def _api_call_handler_registered():
+    return any(h[:2] == (trace.API_CALL_EVENT, trace._count_api_call) for h in clients._event_handlers)
+
+
+def test_nested_tracing_counts_calls_once_and_unregisters(sqs):
+    with trace.tracing() as outer, Stubber(sqs) as stubber:
+        for _ in range(3):
+            stubber.add_response("create_queue", {"QueueUrl": "https://sqs.us-west-2.amazonaws.com/1/q"})
+        with trace.tracing() as inner:
+            QueueResources(Queue("inner")).bootstrap()
+        # Still counted by the outer block once the inner one has ended
+        QueueResources(Queue("outer")).bootstrap()
+        with trace.tracing():
+            pass
+        QueueResources(Queue("again")).bootstrap()
+        assert _api_call_handler_registered()
+
+    assert [s.api_calls for s in inner.spans] == [{"sqs.CreateQueue": 1}]
+    assert [s.api_calls for s in outer.spans] == [{"sqs.CreateQueue": 1}] * 2
+    assert not _api_call_handler_registered()
+
+
+def test_no_spans_without_tracer():
+    with trace.span("Queue", "queue", trace.PHASE_BOOTSTRAP) as span:
+        span.attempts += 1
+    assert span.end is None
@@ -0,0 +1,60 @@
+# Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may
+# not use this file except in compliance with the License. A copy of the
+# License is located at
+#
+#	 http://aws.amazon.com/apache2.0/
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+import boto3
+import pytest
+from botocore.exceptions import ClientError
+from botocore.stub import Stubber
+
+from acktest.bootstrapping import vpc
+
+
+@pytest.fixture
+def ec2_client(monkeypatch):
+    client = boto3.client(
+        "ec2", region_name="us-west-2", aws_access_key_id="testing", aws_secret_access_key="testing")
+    for cls in (vpc.RouteTable, vpc.Subnets, vpc.SecurityGroup):
+        monkeypatch.setattr(cls, "ec2_client", property(lambda self: client))
+    return client
+
+
+def test_subnets_cleanup_skips_deleted_resources(ec2_client):
+    subnets = vpc.Subnets("vpc-1", ["10.0.0.0/24", "10.0.1.0/24"], is_public=False, num_subnets=2)
+    subnets.subnet_ids = ["subnet-1", "subnet-2"]
+    subnets.route_table.route_table_id = "rtb-1"
+    with Stubber(ec2_client) as stubber:
+        # Deleted by an earlier attempt
+        stubber.add_client_error("delete_subnet", "InvalidSubnetID.NotFound", expected_params={"SubnetId": "subnet-1"})
+        stubber.add_response("delete_subnet", {}, {"SubnetId": "subnet-2"})
+        stubber.add_client_error("delete_route_table", "InvalidRouteTableID.NotFound")
+
+        subnets.cleanup()
+
+        stubber.assert_no_pending_responses()
+
+
+def test_security_group_cleanup_raises_other_errors(ec2_client):
+    group = vpc.SecurityGroup("vpc-1")
+    group.group_id = "sg-1"
+    with Stubber(ec2_client) as stubber:
+        stubber.add_client_error("delete_security_group", "DependencyViolation")
+        with pytest.raises(ClientError):
+            group.cleanup()
+
+        stubber.add_client_error("delete_security_group", "InvalidGroup.NotFound")
+        group.cleanup()
+
+
+def test_vpc_subresources_share_vpc_retry_policy():
+    assert vpc.Subnets("vpc-1", ["10.0.0.0/24"]).retry_policy is vpc.VPC_RETRY_POLICY
+    assert vpc.SecurityGroup("vpc-1").retry_policy is vpc.VPC_RETRY_POLICY
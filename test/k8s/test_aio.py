@@ -0,0 +1,112 @@
+# Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may
+# not use this file except in compliance with the License. A copy of the
+# License is located at
+#
+#	 http://aws.amazon.com/apache2.0/
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+"""Unit tests for acktest.k8s.aio."""
+
+import asyncio
+import threading
+
+import pytest
+
+from acktest.k8s import aio, informer, resource
+
+
+def _obj(name, resource_version, synced="False"):
+    return {
+        "metadata": {"name": name, "resourceVersion": resource_version},
+        "status": {"conditions": [{"type": "ACK.ResourceSynced", "status": synced}]},
+    }
+
+
+class FakeCustomObjectsApi:
+    def __init__(self, items):
+        self.items = items
+
+    def list_namespaced_custom_object(self, group, version, namespace, plural, **kwargs):
+        return {"metadata": {"resourceVersion": "10"}, "items": self.items}
+
+
+@pytest.fixture
+def examples(monkeypatch):
+    inf = informer.Informer("services.k8s.aws", "v1alpha1", "examples", "default")
+    inf._relist(FakeCustomObjectsApi([_obj(f"ex-{i}", "5") for i in range(50)]))
+    monkeypatch.setitem(informer._informers, inf.key, inf)
+    monkeypatch.setattr(resource, "_get_k8s_api_client", lambda: pytest.fail("unexpected API call"))
+    yield inf
+    inf.stop()
+
+
+def _deliver(inf, event_type, obj):
+    with inf._changed:
+        inf._apply(event_type, obj)
+    inf._notify([(event_type, obj)])
+
+
+def _ref(name):
+    return resource.CustomResourceReference(
+        "services.k8s.aws", "v1alpha1", "examples", name, namespace="default")
+
+
+def test_many_concurrent_waits_share_informer(examples):
+    def _sync_all():
+        for i in range(50):
+            _deliver(examples, "MODIFIED", _obj(f"ex-{i}", str(11 + i), synced="True"))
+
+    async def _wait_all():
+        threading.Timer(0.05, _sync_all).start()
+        return await asyncio.gather(*(
+            aio.wait_on_condition(_ref(f"ex-{i}"), "ACK.ResourceSynced", "True",
+                                  wait_periods=1, period_length=5)
+            for i in range(50)))
+
+    threads_before = threading.active_count()
+    assert all(asyncio.run(_wait_all()))
+    assert threading.active_count() <= threads_before + 1
+
+
+def test_wait_on_condition_times_out(examples):
+    assert not asyncio.run(aio.wait_on_condition(
+        _ref("ex-0"), "ACK.ResourceSynced", "True", wait_periods=1, period_length=0.05))
+
+
+def test_wait_resource_consumed_by_missing_resource(examples):
+    assert asyncio.run(aio.wait_resource_consumed_by_controller(
+        _ref("missing"), wait_periods=1, period_length=0.05)) is None
+
+
+def test_delete_waits_for_deleted_event(monkeypatch, examples):
+    def _delete(reference):
+        threading.Timer(0.05, _deliver, (examples, "DELETED", _obj("ex-1", "90"))).start()
+        return {"kind": "Status"}
+
+    monkeypatch.setattr(resource, "_request_custom_resource_deletion", _delete)
+
+    response, deleted = asyncio.run(aio.delete_custom_resource(_ref("ex-1"), period_length=5))
+    assert deleted
+    assert response == {"kind": "Status"}
+
+
+def test_waits_without_informer_fall_back_to_blocking_waiter(monkeypatch):
+    monkeypatch.delenv(informer.AUTO_START_ENV_VAR, raising=False)
+    monkeypatch.setattr(resource, "get_resource_exists", lambda reference: True)
+    monkeypatch.setattr(informer, "get_informer", lambda *args, **kwargs: pytest.fail("unexpected informer"))
+    waited = []
+
+    def _wait_for_resource(reference, predicate, wait_strategy):
+        waited.append(reference.name)
+        obj = _obj(reference.name, "7", synced="True")
+        return predicate(obj), obj
+
+    monkeypatch.setattr(resource, "_wait_for_resource", _wait_for_resource)
+
+    assert asyncio.run(aio.wait_on_condition(_ref("ex-0"), "ACK.ResourceSynced", "True", period_length=1))
+    assert waited == ["ex-0"]
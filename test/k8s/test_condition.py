@@ -0,0 +1,143 @@
+# Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may
+# not use this file except in compliance with the License. A copy of the
+# License is located at
+#
+#	 http://aws.amazon.com/apache2.0/
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+"""Unit tests for acktest.k8s.condition."""
+
+import time
+
+import pytest
+
+from acktest.k8s import condition, resource
+
+REFERENCE = resource.CustomResourceReference(
+    "services.k8s.aws", "v1alpha1", "examples", "example", namespace="default")
+
+
+def _resource(resource_version, **statuses):
+    return {
+        "metadata": {"name": "example", "resourceVersion": resource_version},
+        "status": {
+            "conditions": [
+                {"type": cond_type, "status": status, "message": f"{cond_type} message"}
+                for cond_type, status in statuses.items()
+            ],
+        },
+    }
+
+
+@pytest.fixture
+def events(monkeypatch):
+    """Serves the first item as the current resource and the rest as watch
+    events; the watch then idles until its timeout."""
+    versions = []
+    monkeypatch.setattr(resource, "_get_resource_or_none", lambda ref: versions[0])
+
+    def _stream(ref, resource_version, timeout_seconds):
+        for obj in versions[1:]:
+            yield {"type": "MODIFIED", "raw_object": obj}
+        time.sleep(timeout_seconds)
+
+    monkeypatch.setattr(resource, "_stream_resource_events", _stream)
+    return versions
+
+
+def _synced(conds):
+    return condition.has_status(conds, condition.CONDITION_TYPE_RESOURCE_SYNCED, True)
+
+
+def test_wait_for_conditions_evaluates_every_version(events):
+    events += [
+        _resource("1", **{"ACK.ResourceSynced": "False"}),
+        _resource("2", **{"ACK.ResourceSynced": "True", "ACK.Advisory": "True"}),
+    ]
+
+    got = condition.wait_for_conditions(
+        REFERENCE, lambda conds: _synced(conds) and "ACK.Advisory" in conds)
+
+    assert got["metadata"]["resourceVersion"] == "2"
+
+
+def test_wait_for_conditions_fails_fast_on_terminal(events):
+    events += [
+        _resource("1", **{"ACK.ResourceSynced": "False"}),
+        _resource("2", **{"ACK.ResourceSynced": "False", "ACK.Terminal": "True"}),
+    ]
+
+    start = time.monotonic()
+    with pytest.raises(pytest.fail.Exception, match="ACK.Terminal=True with message 'ACK.Terminal message'"):
+        condition.wait_for_conditions(REFERENCE, _synced, wait_periods=10, period_length=60)
+    assert time.monotonic() - start < 1
+
+
+def test_wait_for_conditions_fails_fast_on_missing_resource(events):
+    events += [None]
+
+    start = time.monotonic()
+    with pytest.raises(pytest.fail.Exception, match="not found"):
+        condition.wait_for_conditions(REFERENCE, _synced, wait_periods=10, period_length=60)
+    assert time.monotonic() - start < 1
+
+
+def test_wait_for_conditions_fails_fast_on_deletion(events, monkeypatch):
+    events += [_resource("1", **{"ACK.ResourceSynced": "False"})]
+
+    def _stream(ref, resource_version, timeout_seconds):
+        yield {"type": "DELETED", "raw_object": events[0]}
+        time.sleep(timeout_seconds)
+
+    monkeypatch.setattr(resource, "_stream_resource_events", _stream)
+
+    start = time.monotonic()
+    with pytest.raises(pytest.fail.Exception, match="not found"):
+        condition.wait_for_conditions(REFERENCE, _synced, wait_periods=10, period_length=60)
+    assert time.monotonic() - start < 1
+
+
+def test_wait_for_conditions_recoverable_is_opt_in(events):
+    events += [_resource("1", **{"ACK.ResourceSynced": "False", "ACK.Recoverable": "True"})]
+
+    with pytest.raises(pytest.fail.Exception, match="timed out"):
+        condition.wait_until_synced(REFERENCE, wait_periods=1, period_length=0.1)
+
+    with pytest.raises(pytest.fail.Exception, match="ACK.Recoverable=True"):
+        condition.wait_until_synced(
+            REFERENCE, wait_periods=10, period_length=60,
+            fail_on=(condition.CONDITION_TYPE_TERMINAL, condition.CONDITION_TYPE_RECOVERABLE))
+
+
+def test_snapshot_reports_every_failure_from_one_fetch(monkeypatch):
+    fetched = _resource("1", **{"ACK.ResourceSynced": "False", "ACK.Terminal": "True"})
+    fetched["status"]["ackResourceMetadata"] = {"arn": "arn:aws:example"}
+    calls = []
+    monkeypatch.setattr(resource, "get_resource", lambda ref: calls.append(ref) or fetched)
+
+    with pytest.raises(pytest.fail.Exception) as failed:
+        with condition.snapshot(REFERENCE) as snap:
+            assert not snap.assert_synced()
+            assert not snap.assert_type_status(condition.CONDITION_TYPE_TERMINAL, False)
+            assert snap.assert_condition_state_message(
+                condition.CONDITION_TYPE_TERMINAL, "True", "ACK.Terminal message")
+            assert snap.assert_arn("arn:aws:example")
+            assert not snap.assert_type_status(condition.CONDITION_TYPE_ADOPTED)
+
+    assert calls == [REFERENCE]
+    assert "3 assertion(s) failed" in str(failed.value)
+    assert resource.get_resource_arn(snap.snapshot) == "arn:aws:example"
+
+
+def test_assertion_helpers_accept_snapshot(monkeypatch):
+    monkeypatch.setattr(resource, "get_resource", lambda ref: pytest.fail("unexpected fetch"))
+    snap = resource.ResourceSnapshot(REFERENCE, _resource("1", **{"ACK.ResourceSynced": "True"}))
+
+    condition.assert_synced(snap)
+    assert resource.assert_condition_state_message(
+        snap, "ACK.ResourceSynced", "True", "ACK.ResourceSynced message")
@@ -0,0 +1,167 @@
+# Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may
+# not use this file except in compliance with the License. A copy of the
+# License is located at
+#
+#	 http://aws.amazon.com/apache2.0/
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+"""Unit tests for acktest.k8s.informer."""
+
+import threading
+
+import pytest
+
+from acktest.k8s import informer, resource
+
+
+def _obj(name, resource_version, synced="True"):
+    return {
+        "metadata": {"name": name, "resourceVersion": resource_version},
+        "status": {"conditions": [{"type": "ACK.ResourceSynced", "status": synced}]},
+    }
+
+
+class FakeCustomObjectsApi:
+    def __init__(self, lists):
+        self.lists = lists
+
+    def list_namespaced_custom_object(self, group, version, namespace, plural, **kwargs):
+        return self.lists.pop(0)
+
+
+class FakeWatch:
+    """Replays a scripted list of watch sessions, one per `stream` call."""
+
+    sessions = []
+    resource_versions = []
+
+    def stream(self, func, *args, **kwargs):
+        FakeWatch.resource_versions.append(kwargs.get("resource_version"))
+        session = FakeWatch.sessions.pop(0)
+        if isinstance(session, Exception):
+            raise session
+        for event in session:
+            yield event
+
+    def stop(self):
+        pass
+
+
+@pytest.fixture
+def fake_watch(monkeypatch):
+    FakeWatch.sessions = []
+    FakeWatch.resource_versions = []
+    monkeypatch.setattr(informer.watch, "Watch", FakeWatch)
+    return FakeWatch
+
+
+@pytest.fixture
+def examples():
+    inf = informer.Informer("services.k8s.aws", "v1alpha1", "examples", "default")
+    yield inf
+    inf.stop()
+
+
+def test_relist_and_watch_events(fake_watch, examples):
+    api = FakeCustomObjectsApi([
+        {"metadata": {"resourceVersion": "10"}, "items": [_obj("a", "8"), _obj("b", "9")]},
+    ])
+    examples._relist(api)
+    assert examples.has_synced()
+    assert examples.resource_version == "10"
+    assert {o["metadata"]["name"] for o in examples.list()} == {"a", "b"}
+
+    fake_watch.sessions = [[
+        {"type": "MODIFIED", "raw_object": _obj("a", "11", synced="False")},
+        {"type": "DELETED", "raw_object": _obj("b", "12")},
+        {"type": "BOOKMARK", "raw_object": {"metadata": {"resourceVersion": "15"}}},
+    ]]
+    examples._watch_once(api)
+
+    assert fake_watch.resource_versions == ["10"]
+    assert examples.get("a")["status"]["conditions"][0]["status"] == "False"
+    assert examples.get("b") is None
+    assert examples.resource_version == "15"
+
+
+def test_relist_after_gone_synthesizes_events(fake_watch, examples):
+    api = FakeCustomObjectsApi([
+        {"metadata": {"resourceVersion": "10"}, "items": [_obj("a", "8"), _obj("b", "9")]},
+        {"metadata": {"resourceVersion": "30"}, "items": [_obj("a", "20"), _obj("c", "25")]},
+    ])
+    seen = []
+    examples.add_listener(lambda event_type, obj: seen.append((event_type, obj["metadata"]["name"])))
+
+    examples._relist(api)
+    seen.clear()
+    fake_watch.sessions = [resource.ApiException(status=informer.HTTP_STATUS_GONE)]
+    with pytest.raises(resource.ApiException):
+        examples._watch_once(api)
+    examples._relist(api)
+
+    assert sorted(seen) == [("ADDED", "c"), ("DELETED", "b"), ("MODIFIED", "a")]
+    assert examples.resource_version == "30"
+
+
+def test_sync_barrier_waits_for_own_write(examples):
+    api = FakeCustomObjectsApi([
+        {"metadata": {"resourceVersion": "10"}, "items": [_obj("a", "8")]},
+    ])
+    examples._relist(api)
+
+    examples.note_write("a", _obj("a", "12", synced="False"))
+    assert not examples.wait_for_own_writes("a", timeout_seconds=0.05)
+
+    def _deliver():
+        with examples._changed:
+            examples._apply("MODIFIED", _obj("a", "12", synced="False"))
+            examples._resource_version = "12"
+        examples._notify([])
+
+    threading.Timer(0.05, _deliver).start()
+    assert examples.wait_for_own_writes("a", timeout_seconds=5)
+    assert examples.get("a")["metadata"]["resourceVersion"] == "12"
+
+
+def test_wait_for_predicate(examples):
+    api = FakeCustomObjectsApi([
+        {"metadata": {"resourceVersion": "10"}, "items": [_obj("a", "8", synced="False")]},
+    ])
+    examples._relist(api)
+
+    def _deliver():
+        with examples._changed:
+            examples._apply("MODIFIED", _obj("a", "11"))
+        examples._notify([])
+
+    threading.Timer(0.05, _deliver).start()
+    synced = lambda obj: obj is not None and obj["status"]["conditions"][0]["status"] == "True"
+    met, obj = examples.wait_for("a", synced, timeout_seconds=5)
+    assert met
+    assert obj["metadata"]["resourceVersion"] == "11"
+
+    met, _ = examples.wait_for("a", lambda obj: obj is None, timeout_seconds=0.05)
+    assert not met
+
+
+def test_get_resource_served_from_informer(monkeypatch, examples):
+    api = FakeCustomObjectsApi([
+        {"metadata": {"resourceVersion": "10"}, "items": [_obj("a", "8")]},
+    ])
+    examples._relist(api)
+    monkeypatch.setitem(informer._informers, examples.key, examples)
+    monkeypatch.setattr(resource, "_get_k8s_api_client", lambda: pytest.fail("unexpected API call"))
+
+    ref = resource.CustomResourceReference(
+        "services.k8s.aws", "v1alpha1", "examples", "a", namespace="default")
+    assert resource.get_resource(ref)["metadata"]["resourceVersion"] == "8"
+    assert resource.get_resource_condition(ref, "ACK.ResourceSynced")["status"] == "True"
+
+    missing = resource.CustomResourceReference(
+        "services.k8s.aws", "v1alpha1", "examples", "missing", namespace="default")
+    assert not resource.get_resource_exists(missing)
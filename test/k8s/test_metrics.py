@@ -0,0 +1,84 @@
+# Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may
+# not use this file except in compliance with the License. A copy of the
+# License is located at
+#
+#	 http://aws.amazon.com/apache2.0/
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+"""Unit tests for acktest.k8s.metrics."""
+
+import json
+
+import pytest
+from kubernetes import client, watch
+
+from acktest.k8s import metrics
+
+
+class FakeApi:
+    def get_namespaced_custom_object(self, group, version, namespace, plural, name, **kwargs):
+        """Returns: object"""
+        if name == "missing":
+            raise client.ApiException(status=404, reason="Not Found")
+        return {"metadata": {"name": name}}
+
+    def list_namespaced_custom_object(self, group, version, namespace, plural, **kwargs):
+        """Returns: object"""
+        return {"items": []}
+
+    def delete_namespaced_secret(self, name, namespace, **kwargs):
+        return None
+
+
+@pytest.fixture(autouse=True)
+def clean_metrics():
+    metrics.reset()
+    yield
+    metrics.reset()
+
+
+def test_calls_keyed_by_verb_and_plural():
+    api = metrics.instrument(FakeApi())
+
+    api.get_namespaced_custom_object("s3.services.k8s.aws", "v1alpha1", "default", "buckets", "b")
+    api.get_namespaced_custom_object("s3.services.k8s.aws", "v1alpha1", "default", plural="buckets", name="b")
+    with pytest.raises(client.ApiException):
+        api.get_namespaced_custom_object("s3.services.k8s.aws", "v1alpha1", "default", "buckets", "missing")
+    api.list_namespaced_custom_object("s3.services.k8s.aws", "v1alpha1", "default", "buckets", watch=True)
+    api.delete_namespaced_secret("s", "default")
+
+    stats = metrics.snapshot()
+    module = "test/k8s/test_metrics.py"
+    assert stats[("get", "buckets", module)].count == 3
+    assert stats[("get", "buckets", module)].errors == 1
+    assert stats[("watch", "buckets", module)].count == 1
+    assert stats[("delete", "secrets", module)].count == 1
+
+
+def test_instrumented_method_usable_by_watch():
+    api = metrics.instrument(client.CustomObjectsApi(client.ApiClient()))
+
+    assert watch.Watch().get_return_type(api.list_namespaced_custom_object) == "object"
+
+
+def test_export(tmp_path, monkeypatch):
+    monkeypatch.setenv("PYTEST_XDIST_WORKER", "gw1")
+    metrics.record("patch", "buckets", 0.02)
+    metrics.record("patch", "buckets", 20)
+
+    json_path, prometheus_path = metrics.export(tmp_path)
+
+    assert json_path.name == "k8s-api-metrics-gw1.json"
+    (call,) = json.loads(json_path.read_text())["calls"]
+    assert call["verb"] == "patch" and call["count"] == 2 and call["max_seconds"] == 20
+
+    text = prometheus_path.read_text()
+    labels = 'verb="patch",plural="buckets",test_module="test/k8s/test_metrics.py"'
+    assert f'acktest_k8s_api_request_duration_seconds_bucket{{{labels},le="0.025"}} 1' in text
+    assert f'acktest_k8s_api_request_duration_seconds_bucket{{{labels},le="+Inf"}} 2' in text
+    assert f"acktest_k8s_api_request_duration_seconds_count{{{labels}}} 2" in text
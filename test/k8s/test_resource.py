@@ -0,0 +1,427 @@
+# Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may
+# not use this file except in compliance with the License. A copy of the
+# License is located at
+#
+#	 http://aws.amazon.com/apache2.0/
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+"""Unit tests for acktest.k8s.resource."""
+
+import os
+import threading
+import time
+
+import pytest
+import yaml
+
+from acktest.k8s import informer, resource
+
+
+def _write_kubeconfig(path, server, token):
+    kubeconfig = {
+        "apiVersion": "v1",
+        "kind": "Config",
+        "clusters": [{"name": "test", "cluster": {"server": server}}],
+        "users": [{"name": "test", "user": {"token": token}}],
+        "contexts": [{"name": "test", "context": {"cluster": "test", "user": "test"}}],
+        "current-context": "test",
+    }
+    with open(path, "w") as f:
+        yaml.safe_dump(kubeconfig, f)
+
+
+@pytest.fixture(autouse=True)
+def reset_client_cache(monkeypatch):
+    monkeypatch.setattr(resource, "_api_client_cache", {})
+    monkeypatch.setattr(resource, "_last_known", {})
+    monkeypatch.delenv("LOAD_IN_CLUSTER_KUBECONFIG", raising=False)
+    yield
+
+
+@pytest.fixture
+def kubeconfig(tmp_path, monkeypatch):
+    path = tmp_path / "kubeconfig"
+    _write_kubeconfig(path, "http://cluster-a:8080", "token_v1")
+    monkeypatch.setenv("KUBECONFIG", str(path))
+    return path
+
+
+def test_client_is_reused(kubeconfig):
+    first = resource._get_k8s_api_client()
+    second = resource._get_k8s_api_client()
+
+    assert first is second
+    assert first.configuration.host == "http://cluster-a:8080"
+    assert first.configuration.connection_pool_maxsize >= resource.K8S_CONNECTION_POOL_MAXSIZE
+
+
+@pytest.fixture
+def closed_clients(monkeypatch):
+    closed = []
+    monkeypatch.setattr(resource, "_close_api_client", closed.append)
+    return closed
+
+
+def test_client_rebuilt_when_kubeconfig_changes(kubeconfig, closed_clients):
+    first = resource._get_k8s_api_client()
+
+    _write_kubeconfig(kubeconfig, "http://cluster-b:8080", "token_v2")
+    # Make sure the modification time moves even on coarse filesystems.
+    stat = os.stat(kubeconfig)
+    os.utime(kubeconfig, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    second = resource._get_k8s_api_client()
+    assert second is not first
+    assert second.configuration.host == "http://cluster-b:8080"
+    assert second.configuration.api_key["authorization"] == "Bearer token_v2"
+    # The client for the previous version of the file is evicted and closed.
+    assert len(resource._api_client_cache) == 1
+    assert closed_clients == [first]
+
+
+def test_client_rebuilt_when_token_expires(kubeconfig, closed_clients):
+    first = resource._get_k8s_api_client()
+
+    (cached,) = resource._api_client_cache.values()
+    cached.expires_at = time.time() - 1
+
+    assert resource._get_k8s_api_client() is not first
+    assert closed_clients == [first]
+
+
+def _synced_resource(status, resource_version, name="example"):
+    return {
+        "metadata": {"name": name, "resourceVersion": resource_version},
+        "status": {
+            "conditions": [{"type": "ACK.ResourceSynced", "status": status}],
+        },
+    }
+
+
+REFERENCE = resource.CustomResourceReference(
+    "services.k8s.aws", "v1alpha1", "examples", "example", namespace="default")
+
+
+def test_wait_on_condition_returns_on_watch_event(monkeypatch):
+    monkeypatch.setattr(
+        resource, "_get_resource_or_none", lambda ref: _synced_resource("False", "1"))
+
+    watched_from = []
+
+    def _stream(ref, resource_version, timeout_seconds):
+        watched_from.append(resource_version)
+        yield {"type": "MODIFIED", "raw_object": _synced_resource("False", "2")}
+        yield {"type": "MODIFIED", "raw_object": _synced_resource("True", "3")}
+        pytest.fail("watch should stop once the condition matches")
+
+    monkeypatch.setattr(resource, "_stream_resource_events", _stream)
+
+    assert resource.wait_on_condition(
+        REFERENCE, "ACK.ResourceSynced", "True", wait_periods=1, period_length=10)
+    assert watched_from == ["1"]
+
+
+def test_wait_on_condition_resumes_after_disconnect(monkeypatch):
+    monkeypatch.setattr(
+        resource, "_get_resource_or_none", lambda ref: _synced_resource("False", "1"))
+
+    watched_from = []
+
+    def _stream(ref, resource_version, timeout_seconds):
+        watched_from.append(resource_version)
+        if len(watched_from) == 1:
+            yield {"type": "MODIFIED", "raw_object": _synced_resource("False", "5")}
+            raise resource.HTTPError("connection reset")
+        yield {"type": "MODIFIED", "raw_object": _synced_resource("True", "6")}
+
+    monkeypatch.setattr(resource, "_stream_resource_events", _stream)
+
+    assert resource.wait_on_condition(
+        REFERENCE, "ACK.ResourceSynced", "True", wait_periods=100, period_length=0.1)
+    assert watched_from == ["1", "5"]
+
+
+def test_wait_on_condition_backs_off_while_unreachable(monkeypatch):
+    monkeypatch.setattr(
+        resource, "_get_resource_or_none", lambda ref: _synced_resource("False", "1"))
+
+    connections = []
+
+    def _stream(ref, resource_version, timeout_seconds):
+        connections.append(resource_version)
+        raise resource.HTTPError("Max retries exceeded")
+        yield
+
+    monkeypatch.setattr(resource, "_stream_resource_events", _stream)
+
+    with pytest.raises(resource.HTTPError):
+        resource.wait_on_condition(
+            REFERENCE, "ACK.ResourceSynced", "True", wait_periods=5, period_length=0.1)
+    # One connection per scheduled check, not a tight reconnect loop
+    assert 1 < len(connections) <= 7
+
+
+def test_wait_on_condition_relists_on_gone(monkeypatch):
+    gets = [_synced_resource("False", "1"), _synced_resource("True", "9")]
+    monkeypatch.setattr(resource, "_get_resource_or_none", lambda ref: gets.pop(0))
+
+    def _stream(ref, resource_version, timeout_seconds):
+        raise resource.ApiException(status=resource.HTTP_STATUS_GONE, reason="Gone")
+        yield
+
+    monkeypatch.setattr(resource, "_stream_resource_events", _stream)
+
+    assert resource.wait_on_condition(
+        REFERENCE, "ACK.ResourceSynced", "True", wait_periods=1, period_length=10)
+    assert gets == []
+
+
+def test_wait_on_condition_times_out(monkeypatch):
+    monkeypatch.setattr(
+        resource, "_get_resource_or_none", lambda ref: _synced_resource("False", "1"))
+
+    def _stream(ref, resource_version, timeout_seconds):
+        time.sleep(timeout_seconds)
+        return iter(())
+
+    monkeypatch.setattr(resource, "_stream_resource_events", _stream)
+
+    start = time.monotonic()
+    assert not resource.wait_on_condition(
+        REFERENCE, "ACK.ResourceSynced", "True", wait_periods=2, period_length=0.1)
+    assert time.monotonic() - start < 1
+
+
+def _terminating_resource(finalizers, resource_version):
+    return {
+        "metadata": {
+            "name": "example",
+            "resourceVersion": resource_version,
+            "deletionTimestamp": "2024-01-01T00:00:00Z",
+            "finalizers": finalizers,
+        },
+        "status": {
+            "conditions": [{
+                "type": "ACK.Recoverable",
+                "status": "True",
+                "message": "DependencyViolation",
+            }],
+        },
+    }
+
+
+def test_wait_resource_deleted_returns_on_deleted_event(monkeypatch):
+    monkeypatch.setattr(
+        resource, "_get_resource_or_none",
+        lambda ref: _terminating_resource(["a.k8s.aws", "b.k8s.aws"], "1"))
+
+    def _stream(ref, resource_version, timeout_seconds):
+        yield {"type": "MODIFIED", "raw_object": _terminating_resource(["b.k8s.aws"], "2")}
+        yield {"type": "DELETED", "raw_object": _terminating_resource([], "3")}
+        pytest.fail("watch should stop once the resource is deleted")
+
+    monkeypatch.setattr(resource, "_stream_resource_events", _stream)
+
+    result = resource.wait_resource_deleted(REFERENCE, wait_periods=1, period_length=10)
+
+    assert result.deleted
+    assert result.marked_for_deletion_seconds is not None
+    assert list(result.finalizers_removed) == ["a.k8s.aws", "b.k8s.aws"]
+    assert result.remaining_finalizers == []
+
+
+def test_wait_resource_deleted_reports_stuck_finalizer(monkeypatch):
+    monkeypatch.setattr(
+        resource, "_get_resource_or_none",
+        lambda ref: _terminating_resource(["a.k8s.aws"], "1"))
+
+    def _stream(ref, resource_version, timeout_seconds):
+        time.sleep(timeout_seconds)
+        return iter(())
+
+    monkeypatch.setattr(resource, "_stream_resource_events", _stream)
+
+    result = resource.wait_resource_deleted(REFERENCE, wait_periods=1, period_length=0.1)
+
+    assert not result.deleted
+    assert result.remaining_finalizers == ["a.k8s.aws"]
+    assert "remaining finalizers: a.k8s.aws" in result.diagnostic
+    assert "ACK.Recoverable: DependencyViolation" in result.diagnostic
+
+
+class FakeCustomObjectsApi:
+    def __init__(self, items):
+        self.items = items
+
+    def list_namespaced_custom_object(self, group, version, namespace, plural, **kwargs):
+        return {"metadata": {"resourceVersion": "10"}, "items": self.items}
+
+
+@pytest.fixture
+def examples(monkeypatch):
+    inf = informer.Informer("services.k8s.aws", "v1alpha1", "examples", "default")
+    inf._relist(FakeCustomObjectsApi([_synced_resource("True", "8", f"ex-{i}") for i in range(5)]))
+    monkeypatch.setitem(informer._informers, inf.key, inf)
+    yield inf
+    inf.stop()
+
+
+def test_delete_custom_resources_waits_on_shared_informer(monkeypatch, examples):
+
+    def _delete(reference):
+        if reference.name == "ex-4":
+            raise resource.ApiException(status=403, reason="Forbidden")
+        obj = _synced_resource("True", "20", reference.name)
+
+        def _deliver():
+            with examples._changed:
+                examples._apply("DELETED", obj)
+            examples._notify([])
+
+        if reference.name != "ex-3":
+            threading.Timer(0.05, _deliver).start()
+        return {"kind": "Status"}
+
+    monkeypatch.setattr(resource, "_request_custom_resource_deletion", _delete)
+
+    refs = [
+        resource.CustomResourceReference(
+            "services.k8s.aws", "v1alpha1", "examples", f"ex-{i}", namespace="default")
+        for i in range(5)
+    ]
+    results = resource.delete_custom_resources(refs, max_concurrency=2, period_length=0.5)
+
+    assert [r.reference for r in results] == refs
+    assert [r.deleted for r in results] == [True, True, True, False, False]
+    assert results[4].error.status == 403
+    assert not results[3].ok
+    assert all(r.ok for r in results[:3])
+
+
+def test_delete_custom_resources_waits_per_resource_without_informer(monkeypatch):
+    monkeypatch.setattr(resource, "_request_custom_resource_deletion", lambda reference: {"kind": "Status"})
+    # No watch of the whole namespace is started for a single bulk call
+    monkeypatch.setattr(informer.Informer, "start", lambda self: pytest.fail("informer started"))
+    waits = []
+
+    def _wait_for_resource(reference, predicate, wait_strategy):
+        waits.append((reference.name, wait_strategy.timeout_seconds))
+        return predicate(None), None
+
+    monkeypatch.setattr(resource, "_wait_for_resource", _wait_for_resource)
+
+    refs = [
+        resource.CustomResourceReference(
+            "services.k8s.aws", "v1alpha1", "examples", f"ex-{i}", namespace="default")
+        for i in range(2)
+    ]
+    results = resource.delete_custom_resources(refs, period_length=5)
+
+    assert [r.deleted for r in results] == [True, True]
+    # Each resource is waited for within the remaining budget
+    assert [name for name, _ in waits] == ["ex-0", "ex-1"]
+    assert all(0 < timeout <= 5 for _, timeout in waits)
+
+def test_snapshot_evaluates_single_fetch(monkeypatch):
+    fetched = _synced_resource("True", "4")
+    fetched["status"]["ackResourceMetadata"] = {"arn": "arn:aws:example"}
+    calls = []
+
+    def _get_resource(ref):
+        calls.append(ref)
+        return fetched
+
+    monkeypatch.setattr(resource, "get_resource", _get_resource)
+
+    snapshot = resource.get_resource_snapshot(REFERENCE)
+    assert snapshot.exists
+    assert snapshot.is_consumed_by_controller
+    assert snapshot.arn == "arn:aws:example"
+    assert snapshot.resource_version == "4"
+    assert snapshot.get_condition("ACK.ResourceSynced")["status"] == "True"
+    assert snapshot.get_condition("ACK.Terminal") is None
+    assert len(calls) == 1
+
+    assert resource.get_resource_condition(REFERENCE, "ACK.ResourceSynced")["status"] == "True"
+    assert len(calls) == 2
+
+
+def test_snapshot_of_missing_resource(monkeypatch):
+    def _get_resource(ref):
+        raise resource.ApiException(status=404, reason="Not Found")
+
+    monkeypatch.setattr(resource, "get_resource", _get_resource)
+
+    snapshot = resource.get_resource_snapshot(REFERENCE)
+    assert not snapshot.exists
+    assert snapshot.arn is None
+    assert snapshot.conditions is None
+    assert resource.get_resource_condition(REFERENCE, "ACK.ResourceSynced") is None
+
+
+def _bucket(resource_version, **spec):
+    return {
+        "apiVersion": "s3.services.k8s.aws/v1alpha1",
+        "kind": "Bucket",
+        "metadata": {"name": "example", "namespace": "default", "resourceVersion": resource_version},
+        "spec": {"name": "example", **spec},
+        "status": {"conditions": []},
+    }
+
+
+def test_minimal_patch_sends_only_changed_fields(monkeypatch):
+    sent = []
+    monkeypatch.setattr(resource, "_patch_custom_resource", lambda ref, body: sent.append(body) or body)
+    fetched = _bucket("3", versioning="Suspended", tags=[{"key": "a"}])
+    resource._remember(REFERENCE, fetched)
+
+    fetched["spec"]["versioning"] = "Enabled"
+    resource.patch_custom_resource(REFERENCE, fetched, minimal=True)
+
+    assert sent == [{"spec": {"versioning": "Enabled"}}]
+
+
+def test_minimal_patch_of_unchanged_resource_is_skipped(monkeypatch):
+    monkeypatch.setattr(resource, "_patch_custom_resource", lambda ref, body: pytest.fail("unexpected patch"))
+    resource._remember(REFERENCE, _bucket("3"))
+
+    assert resource.patch_custom_resource(REFERENCE, _bucket("3"), minimal=True) == _bucket("3")
+
+
+def test_minimal_patch_retries_conflict_once(monkeypatch):
+    sent = []
+
+    def _patch(ref, body):
+        sent.append(body)
+        if len(sent) == 1:
+            raise resource.ApiException(status=resource.HTTP_STATUS_CONFLICT, reason="Conflict")
+        return body
+
+    monkeypatch.setattr(resource, "_patch_custom_resource", _patch)
+    monkeypatch.setattr(resource, "_get_resource_or_none", lambda ref: _bucket("7", versioning="Suspended"))
+    resource._remember(REFERENCE, _bucket("3", versioning="Suspended"))
+
+    resource.patch_custom_resource(REFERENCE, _bucket("2", versioning="Enabled"), minimal=True)
+
+    assert sent == [
+        {"metadata": {"resourceVersion": "2"}, "spec": {"versioning": "Enabled"}},
+        {"spec": {"versioning": "Enabled"}},
+    ]
+
+
+def test_minimal_replace_removes_missing_spec_fields(monkeypatch):
+    sent = []
+    monkeypatch.setattr(resource, "_patch_custom_resource", lambda ref, body: sent.append(body) or body)
+    resource._remember(REFERENCE, _bucket("3", versioning="Suspended", acl="private"))
+
+    desired = _bucket("3", versioning="Suspended")
+    del desired["status"]
+    resource.replace_custom_resource(REFERENCE, desired, minimal=True)
+
+    assert sent == [{"spec": {"acl": None}}]
+
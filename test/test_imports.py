@@ -0,0 +1,63 @@
+# Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may
+# not use this file except in compliance with the License. A copy of the
+# License is located at
+#
+#	 http://aws.amazon.com/apache2.0/
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+"""Import regression tests for the acktest package.
+
+Every module is imported in a fresh interpreter, which reports the heavy
+dependencies left in `sys.modules`. Import times are not asserted, as they
+depend on the load of the machine.
+"""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+HEAVY_MODULES = ("boto3", "botocore", "kubernetes", "pytest", "distutils")
+
+
+def _loaded_heavy_modules(module: str):
+    """Imports `module` in a fresh interpreter, returning the heavy modules
+    it loaded."""
+    code = f"import sys, {module}; print(' '.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return result.stdout.split()
+
+
+@pytest.mark.parametrize("module, allowed", [
+    ("acktest", ()),
+    ("acktest.wait", ()),
+    ("acktest.resources", ()),
+    ("acktest.bootstrapping", ()),
+    ("acktest.bootstrapping.journal", ()),
+    ("acktest.k8s.condition", ("kubernetes",)),
+])
+def test_import_does_not_load_heavy_dependencies(module, allowed):
+    assert set(_loaded_heavy_modules(module)) <= set(allowed)
+
+
+@pytest.mark.parametrize("imports", [
+    "import acktest, boto3",
+    "import boto3, acktest",
+    "import acktest.resources, boto3",
+])
+def test_boto3_uses_rotating_credentials(imports, tmp_path):
+    credentials_file = tmp_path / "credentials"
+    credentials_file.write_text("[default]\naws_access_key_id = AKIDEXAMPLE\naws_secret_access_key = secret\n")
+    env = {k: v for k, v in os.environ.items() if not k.startswith(("AWS_", "ACKTEST_"))}
+    env["AWS_SHARED_CREDENTIALS_FILE"] = str(credentials_file)
+
+    # boto3 is used directly, before anything imports acktest.aws
+    code = f"{imports}; print(boto3.DEFAULT_SESSION.get_credentials().method)"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True, env=env)
+    assert result.stdout.strip() == "acktest-rotating-shared-credentials"
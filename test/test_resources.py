@@ -0,0 +1,121 @@
+# Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may
+# not use this file except in compliance with the License. A copy of the
+# License is located at
+#
+#	 http://aws.amazon.com/apache2.0/
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+"""Unit tests for acktest.resources."""
+
+import os
+
+import pytest
+
+from acktest import resources
+
+TEMPLATE = """\
+apiVersion: s3.services.k8s.aws/v1alpha1
+kind: Bucket
+metadata:
+  name: $BUCKET_NAME
+spec:
+  name: $BUCKET_NAME
+  region: $AWS_REGION
+  tagging:
+    tagSet:
+      - key: $BUCKET
+        value: $AWS_ACCOUNT_ID
+"""
+
+
+@pytest.fixture(autouse=True)
+def identity(monkeypatch):
+    monkeypatch.setattr(resources, "default_placeholder_values",
+                        lambda: {"AWS_ACCOUNT_ID": "111122223333", "AWS_REGION": "us-west-2"})
+    monkeypatch.setattr(resources, "_templates", {})
+    monkeypatch.setattr(resources, "_parsed", resources.OrderedDict())
+
+
+@pytest.fixture
+def template(tmp_path):
+    (tmp_path / "bucket.yaml").write_text(TEMPLATE)
+    return tmp_path
+
+
+def test_single_pass_substitution(template):
+    got = resources.load_resource_file(
+        template, "bucket", {"BUCKET": "short", "BUCKET_NAME": "my-bucket", "AWS_REGION": "ignored"})
+
+    assert got["metadata"]["name"] == "my-bucket"
+    assert got["spec"]["region"] == "us-west-2"
+    assert got["spec"]["tagging"]["tagSet"] == [{"key": "short", "value": 111122223333}]
+
+
+def test_cached_result_is_copied(template, monkeypatch):
+    replacements = {"BUCKET": "b", "BUCKET_NAME": "my-bucket"}
+    first = resources.load_resource_file(template, "bucket", replacements)
+    first["spec"]["name"] = "changed"
+
+    monkeypatch.setattr(resources.yaml, "load", lambda *args, **kwargs: pytest.fail("unexpected parse"))
+    second = resources.load_resource_file(template, "bucket", replacements)
+    assert second["spec"]["name"] == "my-bucket"
+
+
+def test_template_reloaded_when_modified(template):
+    replacements = {"BUCKET": "b", "BUCKET_NAME": "my-bucket"}
+    resources.load_resource_file(template, "bucket", replacements)
+
+    path = template / "bucket.yaml"
+    path.write_text(TEMPLATE.replace("kind: Bucket", "kind: Other"))
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    assert resources.load_resource_file(template, "bucket", replacements)["kind"] == "Other"
+
+
+def test_unreplaced_placeholders_warn(template, caplog):
+    got = resources.load_resource_file(template, "bucket")
+
+    assert got["metadata"]["name"] == "$BUCKET_NAME"
+    assert "unreplaced placeholders: $BUCKET, $BUCKET_NAME" in caplog.text
+
+
+def test_unreplaced_placeholders_raise_when_strict(template):
+    with pytest.raises(resources.UnreplacedPlaceholderError, match=r"\$BUCKET, \$BUCKET_NAME"):
+        resources.load_resource_file(template, "bucket", strict=True)
+
+
+def test_random_suffix_name_embeds_session_tag(monkeypatch):
+    monkeypatch.setenv("PYTEST_XDIST_TESTRUNUID", "0123456789abcdef")
+    monkeypatch.delenv(resources.RUN_ID_ENV_VAR, raising=False)
+    monkeypatch.setenv("PYTEST_XDIST_WORKER", "gw37")
+
+    name = resources.random_suffix_name("bucket", 24)
+
+    assert len(name) == 24
+    assert name.startswith(f"bucket-{resources.run_id()}11")
+    assert resources.is_run_name(name)
+    assert name in resources.issued_names()
+
+    monkeypatch.setenv("PYTEST_XDIST_WORKER", "gw1")
+    assert resources.random_suffix_name("bucket", 24).startswith(f"bucket-{resources.run_id()}01")
+
+
+def test_random_suffix_name_too_short_for_tag():
+    name = resources.random_suffix_name("a-rather-long-name", 24, delimiter="_")
+
+    assert len(name) == 24
+    assert name.startswith("a-rather-long-name_")
+    assert not resources.is_run_name(name)
+
+
+def test_random_suffix_names_are_unique(monkeypatch):
+    monkeypatch.setattr(resources, "MIN_RANDOM_SUFFIX_LENGTH", 1)
+    names = {resources.random_suffix_name("x", 2 + len(resources.session_tag()) + 1) for _ in range(20)}
+
+    assert len(names) == 20
@@ -0,0 +1,96 @@
+# Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may
+# not use this file except in compliance with the License. A copy of the
+# License is located at
+#
+#	 http://aws.amazon.com/apache2.0/
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+"""Unit tests for acktest.wait."""
+
+import itertools
+
+import pytest
+
+from acktest import wait
+from acktest.k8s import resource
+from acktest.wait import WaitStrategy
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(wait.time, "monotonic", clock.monotonic)
+    monkeypatch.setattr(wait.time, "sleep", clock.sleep)
+    return clock
+
+
+def test_first_check_is_immediate(clock):
+    attempts = WaitStrategy(timeout_seconds=10).attempts()
+
+    assert next(attempts) == 1
+    assert clock.sleeps == []
+
+
+def test_initial_delay(clock):
+    attempts = WaitStrategy(timeout_seconds=10, initial_delay_seconds=3).attempts()
+
+    next(attempts)
+    assert clock.sleeps == [3]
+
+
+def test_intervals_back_off_up_to_max():
+    strategy = WaitStrategy(timeout_seconds=60, interval_seconds=1, max_interval_seconds=5, jitter=0)
+
+    assert list(itertools.islice(strategy.intervals(), 5)) == [1, 2, 4, 5, 5]
+
+
+def test_jitter_stays_within_bounds():
+    strategy = WaitStrategy(timeout_seconds=60, interval_seconds=10, backoff_factor=1, jitter=0.1)
+
+    for interval in itertools.islice(strategy.intervals(), 100):
+        assert 9 <= interval <= 11
+
+
+def test_final_check_at_deadline(clock):
+    strategy = WaitStrategy(timeout_seconds=10, interval_seconds=4, backoff_factor=1, jitter=0)
+
+    assert list(strategy.attempts()) == [1, 2, 3, 4]
+    assert clock.sleeps == [4, 4, 2]
+    assert clock.now == 1010
+
+
+def test_from_periods_keeps_budget():
+    strategy = WaitStrategy.from_periods(wait_periods=3, period_length=10)
+
+    assert strategy.timeout_seconds == 30
+    assert strategy.initial_delay_seconds == 0
+    assert strategy.max_interval_seconds == 10
+
+
+def test_delete_checks_immediately(monkeypatch, clock):
+    monkeypatch.setattr(resource, "_request_custom_resource_deletion", lambda ref: {"status": "Success"})
+    monkeypatch.setattr(resource, "_get_resource_or_none", lambda ref: None)
+    reference = resource.CustomResourceReference("services.k8s.aws", "v1alpha1", "buckets", "b", "default")
+
+    _, deleted = resource.delete_custom_resource(reference, wait_periods=1, period_length=5)
+
+    assert deleted
+    assert clock.sleeps == []